@@ -1,16 +1,17 @@
 #!/usr/bin/env python3
-"""Effect Parameter Analysis Tool"""
-import aaf2
+"""Effect Parameter Analysis Tool (AAF files or graph snapshots, see src/aaf_snapshot.py)"""
 import argparse
 from collections import defaultdict, Counter
 import json
 
+from src.aaf_snapshot import open_aaf_or_snapshot
+
 def inventory_all_parameters(aaf_path):
     """Catalog all parameters across all OperationGroups"""
     param_catalog = defaultdict(lambda: {'count': 0, 'values': [], 'types': set()})
     effect_types = defaultdict(int)
     
-    with aaf2.open(aaf_path, 'r') as f:
+    with open_aaf_or_snapshot(aaf_path) as f:
         comp_mobs = [mob for mob in f.content.mobs if 'CompositionMob' in str(type(mob).__name__)]
         comp = comp_mobs[0]
         
@@ -39,7 +40,7 @@ def inventory_all_parameters(aaf_path):
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
-    parser.add_argument('--aaf', default='tests/fixtures/aaf/candidate.aaf')
+    parser.add_argument('--aaf', default='tests/fixtures/aaf/candidate.aaf', help='AAF file or .aafsnap snapshot')
     parser.add_argument('--mode', choices=['inventory', 'values', 'compare'], default='inventory')
     args = parser.parse_args()
     
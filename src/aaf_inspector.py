@@ -0,0 +1,536 @@
+#!/usr/bin/env python3
+"""
+aaf_inspector.py — Headless lazy AAF inspector (REPL + JSON-RPC)
+
+The inspector core described in docs/in_memory_pipeline.md (Layer A) without the Qt
+tree: operators browse a huge AAF node by node and run the probe actions on demand.
+Nothing is loaded up front:
+- children are enumerated per strong-reference property, one page at a time; only the
+  objects of the requested page are read from the compound file
+- every node gets a session id on first sight; expanded pages, descriptions and probe
+  results are cached per node
+- probes reuse the builder's machinery: the memoized chain resolver of legacy_export,
+  effect extraction under a session ParameterSetCache, and _process_component for
+  canonical fragments (the mob map is only built the first time a preview needs it)
+
+Probe actions:
+    resolve_chain(id)      "Resolve Source Chain" for a SourceClip
+    extract_effect(id)     "Extract Effect Params/Keyframes" for an OperationGroup
+    decode_path(id, prop)  "Decode Possible Path (UTF-16LE, URL, bytes)" of a property
+    preview_fragment(id)   "Preview Canonical Fragment" of a component
+    build_timeline()       "Build Canonical Timeline" (full builder run)
+
+Usage:
+    python src/aaf_inspector.py big.aaf            # interactive REPL (type "help")
+    python src/aaf_inspector.py big.aaf --rpc      # JSON-RPC 2.0, one request per stdin line
+
+    {"jsonrpc": "2.0", "id": 1, "method": "children", "params": {"node": 0, "offset": 0, "limit": 50}}
+"""
+
+from __future__ import annotations
+
+import argparse
+import cmd
+import json
+import logging
+import shlex
+import sys
+from itertools import islice
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from . import build_canonical as bc
+    from .legacy_export import SourceResolver
+    from .string_pool import StringPool
+except ImportError:  # executed as a script: python src/aaf_inspector.py
+    import build_canonical as bc
+    from legacy_export import SourceResolver
+    from string_pool import StringPool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 50
+
+# File extensions accepted by decode_path() when a decoded string has no URL scheme
+_PATH_EXTENSIONS = (".jpg", ".jpeg", ".png", ".tif", ".tiff", ".psd", ".bmp", ".tga", ".dpx", ".exr",
+                    ".mov", ".mxf", ".mp4", ".wav", ".aif", ".aiff")
+
+
+class InspectorError(Exception):
+    """A request the inspector cannot answer (unknown node, wrong node kind, ...)."""
+
+
+def _class_name(obj) -> str:
+    classdef = getattr(obj, "classdef", None)
+    return str(classdef.class_name) if classdef is not None else type(obj).__name__
+
+
+def _is_a(obj, cls: str) -> bool:
+    """True when obj's AAF class or one of its superclasses is `cls`."""
+    classdef = getattr(obj, "classdef", None)
+    while classdef is not None:
+        if classdef.class_name == cls:
+            return True
+        if classdef.parent is classdef:
+            break
+        classdef = classdef.parent
+    return type(obj).__name__ == cls
+
+
+def _plain(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if hasattr(value, "numerator") and hasattr(value, "denominator"):
+        return float(value)
+    if isinstance(value, (bytes, bytearray)):
+        return list(value)
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return str(value)
+
+
+def decode_possible_path(value: Any) -> List[Dict[str, str]]:
+    """Candidate paths hidden in a property value (UTF-16LE or ASCII byte arrays, URLs)."""
+    if isinstance(value, str):
+        texts = [("text", value)]
+    elif isinstance(value, (list, tuple, bytes, bytearray)) and all(isinstance(b, int) for b in value):
+        raw = bytes(b & 0xFF for b in value)
+        texts = [
+            ("utf-16le", raw.decode("utf-16le", errors="ignore").replace("\x00", "")),
+            ("ascii", bytes(b for b in raw if b).decode("ascii", errors="ignore")),
+        ]
+    else:
+        return []
+    found: List[Dict[str, str]] = []
+    for encoding, text in texts:
+        text = text.strip()
+        lowered = text.lower()
+        if "://" in text:
+            kind = "url"
+        elif lowered.endswith(_PATH_EXTENSIONS) and ("/" in text or "\\" in text or ":" in text):
+            kind = "path"
+        else:
+            continue
+        if not any(c["path"] == text for c in found):
+            found.append({"encoding": encoding, "kind": kind, "path": text})
+    return found
+
+
+class _NodeState:
+    """Per-node cache: the object, its parent id and everything expanded so far."""
+
+    __slots__ = ("obj", "parent", "label", "properties", "pages", "probes")
+
+    def __init__(self, obj, parent: Optional[int], label: str):
+        self.obj = obj
+        self.parent = parent
+        self.label = label
+        self.properties: Optional[List[Tuple[str, Any]]] = None  # strong-ref properties
+        self.pages: Dict[Tuple[int, int], Dict[str, Any]] = {}
+        self.probes: Dict[str, Any] = {}
+
+
+class Inspector:
+    """Lazy, paginated view of one open AAF with cached per-node expansions."""
+
+    def __init__(self, aaf_path: str, page_size: int = DEFAULT_PAGE_SIZE):
+        if not bc.HAS_AAF2:
+            raise ImportError("aaf2 is required. Install with: pip install pyaaf2")
+        self.aaf_path = str(aaf_path)
+        self.page_size = page_size
+        self.file = bc.aaf2.open(self.aaf_path, "r")
+        self._nodes: List[_NodeState] = [_NodeState(self.file.content, None, "ContentStorage")]
+        self._ids: Dict[int, int] = {id(self.file.content): 0}
+        self._resolver = SourceResolver()
+        self._strings = StringPool()
+        self._param_sets = bc.ParameterSetCache()
+        self._mob_map: Optional[Dict[str, Any]] = None
+
+    def close(self) -> None:
+        self.file.close()
+
+    def __enter__(self) -> "Inspector":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -- nodes --------------------------------------------------------------
+
+    def _state(self, node: int) -> _NodeState:
+        try:
+            return self._nodes[int(node)]
+        except (IndexError, ValueError, TypeError):
+            raise InspectorError(f"Unknown node {node!r}") from None
+
+    def _register(self, obj, parent: int, label: str) -> int:
+        key = id(obj)
+        if key in self._ids:
+            return self._ids[key]
+        self._nodes.append(_NodeState(obj, parent, label))
+        node = self._ids[key] = len(self._nodes) - 1
+        return node
+
+    def _strong_properties(self, state: _NodeState) -> List[Tuple[str, Any]]:
+        if state.properties is None:
+            from aaf2.properties import StrongRefProperty, StrongRefSetProperty, StrongRefVectorProperty
+
+            strong = (StrongRefProperty, StrongRefSetProperty, StrongRefVectorProperty)
+            try:
+                props = list(state.obj.properties())
+            except Exception:
+                props = []
+            state.properties = [(str(p.name), p) for p in props if isinstance(p, strong)]
+        return state.properties
+
+    @staticmethod
+    def _property_size(prop) -> int:
+        from aaf2.properties import StrongRefProperty
+
+        if isinstance(prop, StrongRefProperty):
+            return 1 if prop.value is not None else 0
+        return len(prop)
+
+    def summary(self, node: int) -> Dict[str, Any]:
+        """Cheap one-line view of a node (no children loaded)."""
+        state = self._state(node)
+        obj = state.obj
+        out: Dict[str, Any] = {"id": int(node), "class": _class_name(obj), "label": state.label}
+        for attr, prop in (("name", "Name"), ("length", "Length"), ("slot_id", "SlotID")):
+            try:
+                value = obj[prop].value if prop in obj.keys() else None
+            except Exception:
+                value = None
+            if value is not None and value != "":
+                out[attr] = _plain(value)
+        out["child_properties"] = {name: self._property_size(p) for name, p in self._strong_properties(state)}
+        return out
+
+    def root(self) -> Dict[str, Any]:
+        return self.summary(0)
+
+    def parent(self, node: int) -> Optional[int]:
+        return self._state(node).parent
+
+    def path(self, node: int) -> str:
+        parts = []
+        state = self._state(node)
+        while state.parent is not None:
+            parts.append(state.label)
+            state = self._nodes[state.parent]
+        return "/" + "/".join(reversed(parts))
+
+    def children(self, node: int, prop: Optional[str] = None, offset: int = 0, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        One page of a node's children. Without `prop` the strong-ref properties are
+        concatenated in declaration order; only objects on the page are read.
+        """
+        state = self._state(node)
+        limit = limit or self.page_size
+        key = (prop or "", offset, limit)
+        if key in state.pages:
+            return state.pages[key]
+
+        from aaf2.properties import StrongRefProperty, StrongRefVectorProperty
+
+        props = [(n, p) for n, p in self._strong_properties(state) if prop is None or n == prop]
+        if prop is not None and not props:
+            raise InspectorError(f"{_class_name(state.obj)} has no strong-reference property {prop!r}")
+
+        items: List[Dict[str, Any]] = []
+        total = 0
+        start, stop = offset, offset + limit
+        for name, p in props:
+            size = self._property_size(p)
+            lo, hi = max(start - total, 0), min(stop - total, size)
+            for i in range(lo, hi):
+                if isinstance(p, StrongRefProperty):
+                    obj = p.value
+                elif isinstance(p, StrongRefVectorProperty):
+                    obj = p.get(i)
+                else:
+                    obj = p.read_object(next(islice(p.references, i, None)))
+                label = f"{name}[{i}]" if not isinstance(p, StrongRefProperty) else name
+                items.append(self.summary(self._register(obj, int(node), label)))
+            total += size
+
+        page = {"node": int(node), "property": prop, "offset": offset, "limit": limit, "total": total, "items": items}
+        state.pages[key] = page
+        return page
+
+    def describe(self, node: int) -> Dict[str, Any]:
+        """All scalar properties of a node plus its child property sizes."""
+        state = self._state(node)
+        if "describe" in state.probes:
+            return state.probes["describe"]
+        strong = {name for name, _ in self._strong_properties(state)}
+        values: Dict[str, Any] = {}
+        try:
+            props = list(state.obj.properties())
+        except Exception:
+            props = []
+        for p in props:
+            name = str(p.name)
+            if name in strong:
+                continue
+            try:
+                values[name] = _plain(p.value)
+            except Exception as e:
+                values[name] = f"<unreadable: {e}>"
+        result = {**self.summary(node), "path": self.path(node), "properties": values}
+        state.probes["describe"] = result
+        return result
+
+    # -- probes -------------------------------------------------------------
+
+    def _probe(self, node: int, name: str, fn):
+        state = self._state(node)
+        if name not in state.probes:
+            with bc._build_state(None, None, self._strings, self._param_sets):
+                state.probes[name] = fn(state)
+        return state.probes[name]
+
+    def _require(self, state: _NodeState, cls: str) -> None:
+        if not _is_a(state.obj, cls):
+            raise InspectorError(f"Node is a {_class_name(state.obj)}, not a {cls}")
+
+    def resolve_chain(self, node: int) -> Dict[str, Any]:
+        """Resolve Source Chain: end-of-chain source data for a SourceClip."""
+
+        def run(state):
+            self._require(state, "SourceClip")
+            return {
+                "source_id": str(getattr(state.obj, "mob_id", "") or ""),
+                "resolved": self._resolver.resolve(state.obj),
+            }
+
+        return self._probe(node, "resolve_chain", run)
+
+    def extract_effect(self, node: int) -> Dict[str, Any]:
+        """Extract Effect Params/Keyframes of an OperationGroup (builder decoding)."""
+
+        def run(state):
+            self._require(state, "OperationGroup")
+            decoded = bc.decode_operation_group(state.obj)
+            return {
+                "operation": decoded.effect_name,
+                "parameters": dict(decoded.parameters),
+                "external_refs": decoded.external_refs,
+            }
+
+        return self._probe(node, "extract_effect", run)
+
+    def decode_path(self, node: int, prop: str) -> List[Dict[str, str]]:
+        """Decode Possible Path from one property value."""
+
+        def run(state):
+            try:
+                value = state.obj[prop].value
+            except Exception:
+                raise InspectorError(f"{_class_name(state.obj)} has no readable property {prop!r}") from None
+            return decode_possible_path(value)
+
+        return self._probe(node, f"decode_path:{prop}", run)
+
+    def _edit_rate(self, node: int) -> float:
+        state: Optional[_NodeState] = self._state(node)
+        while state is not None:
+            rate = getattr(state.obj, "edit_rate", None)
+            if rate is not None and _is_a(state.obj, "MobSlot"):
+                return float(rate)
+            state = self._nodes[state.parent] if state.parent is not None else None
+        return 25.0
+
+    def preview_fragment(self, node: int) -> List[Dict[str, Any]]:
+        """Preview Canonical Fragment: builder events for one component, placed at offset 0."""
+
+        def run(state):
+            if self._mob_map is None:
+                self._mob_map = bc.build_mob_map(self.file)
+            clips: List[bc.Event] = []
+            bc._process_component(state.obj, clips, self._mob_map, 0, self._edit_rate(node), set(), bc.NestedCompositionCache())
+            return [event.to_canonical() for event in clips]
+
+        return self._probe(node, "preview_fragment", run)
+
+    def build_timeline(self) -> Dict[str, Any]:
+        """Build Canonical Timeline for the whole file (cached on the root node)."""
+        state = self._nodes[0]
+        if "build_timeline" not in state.probes:
+            state.probes["build_timeline"] = bc.build_canonical_from_aaf(self.aaf_path)
+        return state.probes["build_timeline"]
+
+
+# ---------------------------------------------------------------------------
+# JSON-RPC
+# ---------------------------------------------------------------------------
+
+RPC_METHODS = (
+    "root", "summary", "children", "describe", "parent", "path",
+    "resolve_chain", "extract_effect", "decode_path", "preview_fragment", "build_timeline",
+)
+
+
+class InspectorRPC:
+    """JSON-RPC 2.0 dispatcher over an Inspector (by-name or positional params)."""
+
+    def __init__(self, inspector: Inspector):
+        self.inspector = inspector
+
+    def handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        req_id = request.get("id") if isinstance(request, dict) else None
+        if not isinstance(request, dict) or request.get("method") not in RPC_METHODS:
+            method = request.get("method") if isinstance(request, dict) else None
+            return {"jsonrpc": "2.0", "id": req_id, "error": {"code": -32601, "message": f"Method not found: {method}"}}
+        params = request.get("params") or {}
+        fn = getattr(self.inspector, request["method"])
+        try:
+            result = fn(**params) if isinstance(params, dict) else fn(*params)
+        except TypeError as e:
+            return {"jsonrpc": "2.0", "id": req_id, "error": {"code": -32602, "message": str(e)}}
+        except InspectorError as e:
+            return {"jsonrpc": "2.0", "id": req_id, "error": {"code": -32000, "message": str(e)}}
+        except Exception as e:
+            logger.exception("RPC %s failed", request["method"])
+            return {"jsonrpc": "2.0", "id": req_id, "error": {"code": -32603, "message": str(e)}}
+        return {"jsonrpc": "2.0", "id": req_id, "result": result}
+
+    def handle_line(self, line: str) -> str:
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return json.dumps({"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": f"Parse error: {e}"}})
+        return json.dumps(self.handle(request), default=str)
+
+    def serve(self, stdin=None, stdout=None) -> None:
+        """Line-delimited JSON-RPC until EOF."""
+        stdin = stdin or sys.stdin
+        stdout = stdout or sys.stdout
+        for line in stdin:
+            if line.strip():
+                stdout.write(self.handle_line(line) + "\n")
+                stdout.flush()
+
+
+# ---------------------------------------------------------------------------
+# REPL
+# ---------------------------------------------------------------------------
+
+
+class InspectorShell(cmd.Cmd):
+    """Interactive browser: ls / cd / info and the probe actions on the current node."""
+
+    intro = "AAF inspector. Type help or ? to list commands."
+
+    def __init__(self, inspector: Inspector, stdout=None):
+        super().__init__(stdout=stdout)
+        self.inspector = inspector
+        self.node = 0
+        self.listing: Optional[Tuple[int, Optional[str], int]] = None  # node, property, offset
+        self._update_prompt()
+
+    def _update_prompt(self) -> None:
+        self.prompt = f"{self.inspector.path(self.node) or '/'}> "
+
+    def _print(self, value: Any) -> None:
+        self.stdout.write((value if isinstance(value, str) else json.dumps(value, indent=2, default=str)) + "\n")
+
+    def onecmd(self, line: str) -> bool:
+        try:
+            return super().onecmd(line)
+        except InspectorError as e:
+            self._print(f"error: {e}")
+            return False
+
+    def _target(self, arg: str) -> int:
+        return int(arg) if arg.strip() else self.node
+
+    def do_ls(self, arg: str) -> None:
+        """ls [PROPERTY] — first page of the current node's children (optionally of one property)"""
+        self._list(arg.strip() or None, 0)
+
+    def do_more(self, arg: str) -> None:
+        """more — next page of the last listing"""
+        if self.listing is None or self.listing[0] != self.node:
+            self._print("nothing listed here yet (use ls)")
+            return
+        _, prop, offset = self.listing
+        self._list(prop, offset + self.inspector.page_size)
+
+    def _list(self, prop: Optional[str], offset: int) -> None:
+        page = self.inspector.children(self.node, prop=prop, offset=offset)
+        if offset and offset >= page["total"]:
+            self._print("  (no more children)")
+            return
+        self.listing = (self.node, prop, offset)
+        for item in page["items"]:
+            extra = "  ".join(f"{k}={item[k]}" for k in ("name", "length") if k in item)
+            self._print(f"  [{item['id']}] {item['label']:24} {item['class']:20} {extra}".rstrip())
+        shown = offset + len(page["items"])
+        self._print(f"  ({shown} of {page['total']}{'; more' if shown < page['total'] else ''})")
+
+    def do_cd(self, arg: str) -> None:
+        """cd ID | cd .. | cd / — move to a listed node, the parent or the root"""
+        arg = arg.strip()
+        if arg == "..":
+            self.node = self.inspector.parent(self.node) or 0
+        elif arg in ("", "/"):
+            self.node = 0
+        else:
+            self.inspector.summary(int(arg))
+            self.node = int(arg)
+        self._update_prompt()
+
+    def do_info(self, arg: str) -> None:
+        """info [ID] — scalar properties of a node"""
+        self._print(self.inspector.describe(self._target(arg)))
+
+    def do_chain(self, arg: str) -> None:
+        """chain [ID] — resolve a SourceClip's source chain"""
+        self._print(self.inspector.resolve_chain(self._target(arg)))
+
+    def do_effect(self, arg: str) -> None:
+        """effect [ID] — effect name and parameters of an OperationGroup"""
+        self._print(self.inspector.extract_effect(self._target(arg)))
+
+    def do_decode(self, arg: str) -> None:
+        """decode PROPERTY [ID] — possible paths encoded in a property value"""
+        args = shlex.split(arg)
+        if not args:
+            self._print("usage: decode PROPERTY [ID]")
+            return
+        self._print(self.inspector.decode_path(self._target(" ".join(args[1:])), args[0]))
+
+    def do_preview(self, arg: str) -> None:
+        """preview [ID] — canonical events the builder emits for a component"""
+        self._print(self.inspector.preview_fragment(self._target(arg)))
+
+    def do_build(self, arg: str) -> None:
+        """build — canonical timeline for the whole file"""
+        self._print(self.inspector.build_timeline())
+
+    def do_quit(self, arg: str) -> bool:
+        """quit — leave the inspector"""
+        return True
+
+    do_EOF = do_quit
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Headless lazy AAF inspector")
+    parser.add_argument("aaf", help="Input AAF")
+    parser.add_argument("--rpc", action="store_true", help="Serve line-delimited JSON-RPC 2.0 on stdin/stdout")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE, help=f"Children per page (default: {DEFAULT_PAGE_SIZE})")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s: %(message)s", stream=sys.stderr)
+    with Inspector(args.aaf, page_size=args.page_size) as inspector:
+        if args.rpc:
+            InspectorRPC(inspector).serve()
+        else:
+            InspectorShell(inspector).cmdloop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+aaf_pool.py — LRU pool of open read-only AAF handles
+
+Every aaf2.open() re-parses the compound-file directory and the metadictionary, and
+every build then walks all mobs again for the mob map. A long-lived process (MCP
+server, inspector, daemon) answering many queries against the same few AAFs can keep
+those files open instead:
+
+    pool = AAFHandlePool(max_open=4)
+    with pool.open("timeline.aaf") as handle:
+        comps = list_composition_mobs(handle.file)
+        mob = handle.mob_map[umid]
+
+    build_canonical_from_aaf("timeline.aaf", handle_pool=pool)  # reuses file + mob map
+
+Key principles:
+- Handles are keyed by real path and validated against (size, mtime_ns) on every
+  acquire; a file changed on disk is reopened, never served stale
+- At most `max_open` handles stay open; the least recently used idle handle is closed
+  first. Evicted or stale handles still in use are closed when their last user releases
+- One user at a time per handle (pyaaf2 file objects are not thread-safe); different
+  files are used concurrently
+- aaf2.open() runs outside the pool lock, under the handle's own lock, so a slow open
+  only holds up users of that file
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+try:
+    from .build_canonical import HAS_AAF2, aaf2, build_mob_map
+except ImportError:  # executed as a script from src/
+    from build_canonical import HAS_AAF2, aaf2, build_mob_map
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_OPEN = 4
+
+
+class AAFHandle:
+    """One read-only AAF, opened by its first user, with its lazily built mob map."""
+
+    def __init__(self, path: str, size: int, mtime_ns: int):
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.file: Any = None
+        self.lock = threading.RLock()
+        self.users = 0
+        self.retired = False
+        self._mob_map: Optional[Dict[str, Any]] = None
+
+    @property
+    def mob_map(self) -> Dict[str, Any]:
+        """build_mob_map() of this file, built on first use and kept with the handle."""
+        if self._mob_map is None:
+            self._mob_map = build_mob_map(self.file)
+        return self._mob_map
+
+    def ensure_open(self) -> None:
+        """Open the file if no earlier user has; call with self.lock held."""
+        if self.file is None:
+            self.file = aaf2.open(self.path, "r")
+
+    def matches(self, size: int, mtime_ns: int) -> bool:
+        return self.size == size and self.mtime_ns == mtime_ns
+
+    def close(self) -> None:
+        if self.file is not None:
+            try:
+                self.file.close()
+            except Exception as e:
+                logger.warning(f"Closing {self.path} failed: {e}")
+        self.file = None
+        self._mob_map = None
+
+
+class AAFHandlePool:
+    """LRU pool of AAFHandle objects keyed by real path."""
+
+    def __init__(self, max_open: int = DEFAULT_MAX_OPEN):
+        if not HAS_AAF2:
+            raise ImportError("aaf2 is required. Install with: pip install pyaaf2")
+        self.max_open = max(1, max_open)
+        self._handles: "OrderedDict[str, AAFHandle]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reopens = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    def __contains__(self, path: str) -> bool:
+        return os.path.realpath(path) in self._handles
+
+    @staticmethod
+    def _stat(path: str) -> Tuple[str, int, int]:
+        st = os.stat(path)
+        return os.path.realpath(path), st.st_size, st.st_mtime_ns
+
+    def _retire(self, handle: AAFHandle) -> None:
+        """Drop a handle from the pool; close it now or when its last user releases it."""
+        handle.retired = True
+        if handle.users == 0:
+            handle.close()
+
+    def _acquire(self, path: str) -> AAFHandle:
+        real, size, mtime_ns = self._stat(path)
+        with self._lock:
+            handle = self._handles.get(real)
+            if handle is not None and not handle.matches(size, mtime_ns):
+                logger.info(f"{real} changed on disk; reopening")
+                del self._handles[real]
+                self._retire(handle)
+                self.reopens += 1
+                handle = None
+            if handle is not None:
+                self._handles.move_to_end(real)
+                self.hits += 1
+            else:
+                # Published unopened; the first user opens it outside the pool lock
+                handle = AAFHandle(real, size, mtime_ns)
+                self._handles[real] = handle
+                self.misses += 1
+                self._evict()
+            handle.users += 1
+            return handle
+
+    def _evict(self) -> None:
+        """Close least recently used handles beyond max_open (in-use ones close on release)."""
+        while len(self._handles) > self.max_open:
+            _, handle = self._handles.popitem(last=False)
+            self._retire(handle)
+            self.evictions += 1
+
+    def _release(self, handle: AAFHandle) -> None:
+        with self._lock:
+            handle.users -= 1
+            if handle.retired and handle.users == 0:
+                handle.close()
+
+    @contextmanager
+    def open(self, path: str) -> Iterator[AAFHandle]:
+        """Exclusive use of the pooled handle for path, opening (or reopening) it if needed."""
+        handle = self._acquire(str(path))
+        try:
+            with handle.lock:
+                try:
+                    handle.ensure_open()
+                except Exception:
+                    self._discard(handle)
+                    raise
+                yield handle
+        finally:
+            self._release(handle)
+
+    def _discard(self, handle: AAFHandle) -> None:
+        """Drop a handle whose open failed, so the next acquire tries again."""
+        with self._lock:
+            if self._handles.get(handle.path) is handle:
+                del self._handles[handle.path]
+                handle.retired = True
+
+    def invalidate(self, path: str) -> None:
+        """Forget path's handle (closed once no longer in use)."""
+        with self._lock:
+            handle = self._handles.pop(os.path.realpath(path), None)
+            if handle is not None:
+                self._retire(handle)
+
+    def close(self) -> None:
+        """Close every idle handle; handles in use close when released."""
+        with self._lock:
+            while self._handles:
+                _, handle = self._handles.popitem(last=False)
+                self._retire(handle)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "open": len(self._handles),
+            "hits": self.hits,
+            "misses": self.misses,
+            "reopens": self.reopens,
+            "evictions": self.evictions,
+        }
+
+    def __enter__(self) -> "AAFHandlePool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+_default_pool: Optional[AAFHandlePool] = None
+
+
+def get_handle_pool(max_open: Optional[int] = None) -> AAFHandlePool:
+    """Return the process-wide handle pool, creating it on first use."""
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = AAFHandlePool(max_open or DEFAULT_MAX_OPEN)
+    return _default_pool
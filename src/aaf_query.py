@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+"""
+aaf_query.py — XPath-like selectors over the pyaaf2 object graph
+
+Replaces throwaway investigation scripts (analyze_effect_params.py and friends) that
+each walk the whole file:
+
+    //OperationGroup[@AvidEffectID="EFF2_PAN_SCAN"]
+    //SourceClip[not @chain.path]                    chain ends without a Locator URL
+    /CompositionMob[@Name~="Exported"]//OperationGroup[@param.Level > 0.5]
+    //CompositionMob/TimelineMobSlot/Sequence/*      top-level components only
+
+Grammar:
+    query     := step+
+    step      := ("/" | "//") (CLASS | "*") ("[" expr "]")*
+    expr      := term ("or" term)* ;  term := factor ("and" factor)*
+    factor    := "not" factor | "(" expr ")" | "@" ATTR (OP literal)?
+    OP        := = != ~= (regex search) < <= > >=
+    literal   := "string" | 'string' | number | true | false | null
+
+CLASS matches the AAF class or any of its superclasses (Segment, Mob, ...). ATTR is an
+AAF property name (@Name, @Length, @SlotID, ...) or a derived attribute:
+    @class, @AvidEffectID, @effect, @param.<Name>, @chain.<field>
+where chain fields (path, clip_name, umid, tape_id, disk_label, src_rate_fps, ...)
+come from the memoized UMID-chain resolver of src/legacy_export.py.
+
+Selectors compile once (compile_query) into a list of steps. The graph is walked once
+per file into a GraphIndex (pre-order intervals plus class and AvidEffectID indexes,
+built on first query), so every further query is answered from the indexes: each step
+starts from the indexed candidates of its class and keeps those inside the context
+intervals, never re-walking the file.
+
+Usage:
+    python src/aaf_query.py timeline.aaf '//OperationGroup[@AvidEffectID="EFF2_PAN_SCAN"]'
+    python src/aaf_query.py timeline.aaf '//SourceClip[not @chain.path]' '//Filler' --json
+
+    with aaf2.open(path) as f:
+        index = GraphIndex(f)
+        for node in select(index, '//SourceClip[@Length > 100]'):
+            print(node.path, node.obj)
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    from .build_canonical import HAS_AAF2, aaf2, decode_avid_effect_id, extract_effect_name_from_operation_group, param_name
+    from .legacy_export import SourceResolver
+except ImportError:  # executed as a script: python src/aaf_query.py
+    from build_canonical import HAS_AAF2, aaf2, decode_avid_effect_id, extract_effect_name_from_operation_group, param_name
+    from legacy_export import SourceResolver
+
+
+class QuerySyntaxError(ValueError):
+    """Selector text that does not match the grammar."""
+
+
+# ---------------------------------------------------------------------------
+# Compilation
+# ---------------------------------------------------------------------------
+
+_TOKEN = re.compile(
+    r"""\s*(?:
+        (?P<axis>//|/)
+      | (?P<op>!=|~=|<=|>=|=|<|>)
+      | (?P<punct>[\[\]()@*])
+      | (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+      | (?P<number>-?\d+(?:\.\d+)?)
+      | (?P<name>[A-Za-z_][\w.:-]*)
+    )""",
+    re.VERBOSE,
+)
+_LITERALS = {"true": True, "false": False, "null": None}
+_ESCAPE = re.compile(r"""\\([\\"'])""")
+
+
+def _tokenize(text: str) -> List[Tuple[str, Any]]:
+    tokens: List[Tuple[str, Any]] = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        m = _TOKEN.match(text, pos)
+        if not m or m.end() == pos:
+            raise QuerySyntaxError(f"Unexpected {text[pos:pos + 10]!r} at {pos} in {text!r}")
+        kind = m.lastgroup
+        value = m.group(kind)
+        if kind == "string":
+            value = _ESCAPE.sub(r"\1", value[1:-1])
+        elif kind == "number":
+            value = float(value) if "." in value else int(value)
+        tokens.append((kind, value))
+        pos = m.end()
+    return tokens
+
+
+class _Parser:
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.pos = 0
+
+    def peek(self, kind: str, value: Any = None) -> bool:
+        if self.pos >= len(self.tokens):
+            return False
+        k, v = self.tokens[self.pos]
+        return k == kind and (value is None or v == value)
+
+    def take(self, kind: str, value: Any = None) -> Any:
+        if not self.peek(kind, value):
+            found = self.tokens[self.pos][1] if self.pos < len(self.tokens) else "end of query"
+            raise QuerySyntaxError(f"Expected {value or kind}, found {found!r} in {self.text!r}")
+        self.pos += 1
+        return self.tokens[self.pos - 1][1]
+
+    def query(self) -> List["Step"]:
+        steps = []
+        while self.peek("axis"):
+            axis = self.take("axis")
+            test = "*" if self.peek("punct", "*") and self.take("punct") else self.take("name")
+            predicates = []
+            while self.peek("punct", "["):
+                self.take("punct", "[")
+                predicates.append(self.expr())
+                self.take("punct", "]")
+            steps.append(Step(axis == "//", test, predicates))
+        if not steps or self.pos != len(self.tokens):
+            raise QuerySyntaxError(f"Selector must be a sequence of /step or //step: {self.text!r}")
+        return steps
+
+    def expr(self):
+        node = self.term()
+        while self.peek("name", "or"):
+            self.take("name")
+            node = ("or", node, self.term())
+        return node
+
+    def term(self):
+        node = self.factor()
+        while self.peek("name", "and"):
+            self.take("name")
+            node = ("and", node, self.factor())
+        return node
+
+    def factor(self):
+        if self.peek("name", "not"):
+            self.take("name")
+            return ("not", self.factor())
+        if self.peek("punct", "("):
+            self.take("punct")
+            node = self.expr()
+            self.take("punct", ")")
+            return node
+        self.take("punct", "@")
+        attr = self.take("name")
+        if not self.peek("op"):
+            return ("has", attr)
+        op = self.take("op")
+        if self.peek("string") or self.peek("number"):
+            literal = self.take(self.tokens[self.pos][0])
+        else:
+            word = self.take("name")
+            if word not in _LITERALS:
+                raise QuerySyntaxError(f"Expected a literal after {op}, found {word!r} in {self.text!r}")
+            literal = _LITERALS[word]
+        if op == "~=":
+            literal = re.compile(str(literal))
+        return ("cmp", attr, op, literal)
+
+
+class Step:
+    """One location step: axis (child or descendant), class test and predicates."""
+
+    __slots__ = ("descendant", "test", "predicates")
+
+    def __init__(self, descendant: bool, test: str, predicates: List[Any]):
+        self.descendant = descendant
+        self.test = test
+        self.predicates = predicates
+
+    def effect_id(self) -> Optional[str]:
+        """AvidEffectID the step is pinned to by a top-level equality predicate, if any."""
+        for predicate in self.predicates:
+            if predicate[0] == "cmp" and predicate[1] == "AvidEffectID" and predicate[2] == "=":
+                return str(predicate[3])
+        return None
+
+
+class Query:
+    """A compiled selector; evaluate with select(index) or .select(index)."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.steps = _Parser(text).query()
+
+    def __repr__(self) -> str:
+        return f"Query({self.text!r})"
+
+    def select(self, index: "GraphIndex") -> List["Node"]:
+        return index.evaluate(self)
+
+
+def compile_query(text: Union[str, Query]) -> Query:
+    return text if isinstance(text, Query) else Query(text)
+
+
+# ---------------------------------------------------------------------------
+# Graph index
+# ---------------------------------------------------------------------------
+
+
+class Node:
+    """One indexed object: pre-order position, subtree end, parent position and label."""
+
+    __slots__ = ("index", "pos", "end", "parent", "obj", "label", "classes")
+
+    def __init__(self, index: "GraphIndex", pos: int, parent: int, obj: Any, label: str, classes: Tuple[str, ...]):
+        self.index = index
+        self.pos = pos
+        self.end = pos
+        self.parent = parent
+        self.obj = obj
+        self.label = label
+        self.classes = classes
+
+    @property
+    def cls(self) -> str:
+        return self.classes[0]
+
+    @property
+    def path(self) -> str:
+        """Readable location, e.g. /CompositionMob[top]/TimelineMobSlot[1]/Sequence/SourceClip[3]."""
+        parts = []
+        node: Optional[Node] = self
+        while node is not None and node.pos > 0:
+            parts.append(node.label)
+            node = self.index.nodes[node.parent] if node.parent >= 0 else None
+        return "/" + "/".join(reversed(parts))
+
+    def get(self, attr: str) -> Any:
+        return self.index.attribute(self, attr)
+
+    def __repr__(self) -> str:
+        return f"<Node {self.path}>"
+
+
+def _class_names(obj) -> Tuple[str, ...]:
+    names = []
+    classdef = getattr(obj, "classdef", None)
+    while classdef is not None and len(names) < 16:
+        names.append(str(classdef.class_name))
+        parent = classdef.parent
+        if parent is classdef:
+            break
+        classdef = parent
+    return tuple(names) or (type(obj).__name__,)
+
+
+def _strong_children(obj) -> Iterator[Any]:
+    """Objects owned by obj through strong references, in property order."""
+    from aaf2.properties import StrongRefProperty, StrongRefSetProperty, StrongRefVectorProperty
+
+    try:
+        props = list(obj.properties())
+    except Exception:
+        return
+    for prop in props:
+        try:
+            if isinstance(prop, StrongRefProperty):
+                child = prop.value
+                if child is not None:
+                    yield child
+            elif isinstance(prop, StrongRefVectorProperty):
+                yield from prop.value or []
+            elif isinstance(prop, StrongRefSetProperty):
+                yield from prop.values()
+        except Exception:
+            continue
+
+
+def _effect_id(obj) -> Optional[str]:
+    for param in getattr(obj, "parameters", None) or []:
+        try:
+            if str(param_name(param)) == "AvidEffectID":
+                return decode_avid_effect_id(param.value)
+        except Exception:
+            continue
+    return None
+
+
+class GraphIndex:
+    """
+    Single pre-order walk of the strong-reference graph under ContentStorage, built on
+    first query and shared by every query after it.
+    """
+
+    def __init__(self, aaf):
+        self.aaf = aaf
+        self.nodes: List[Node] = []
+        self.by_class: Dict[str, List[int]] = {}
+        self.by_effect_id: Dict[str, List[int]] = {}
+        self._resolver = SourceResolver()
+        self._built = False
+        self.walks = 0
+
+    def build(self) -> "GraphIndex":
+        if self._built:
+            return self
+        by_class: Dict[str, List[int]] = defaultdict(list)
+        by_effect: Dict[str, List[int]] = defaultdict(list)
+        root = Node(self, 0, -1, self.aaf.content, "", ("ContentStorage",))
+        self.nodes = [root]
+        # Explicit stack of (node, child iterator, per-class sibling counters)
+        stack = [(root, _strong_children(root.obj), defaultdict(int))]
+        while stack:
+            parent, children, counters = stack[-1]
+            child = next(children, None)
+            if child is None:
+                parent.end = len(self.nodes) - 1
+                stack.pop()
+                continue
+            classes = _class_names(child)
+            counters[classes[0]] += 1
+            name = getattr(child, "name", None) if "Mob" in classes else None
+            slot_id = getattr(child, "slot_id", None) if "MobSlot" in classes else None
+            tag = name if name else slot_id if slot_id is not None else counters[classes[0]]
+            node = Node(self, len(self.nodes), parent.pos, child, f"{classes[0]}[{tag}]", classes)
+            self.nodes.append(node)
+            for cls in classes:
+                by_class[cls].append(node.pos)
+            if "OperationGroup" in classes:
+                effect_id = _effect_id(child)
+                if effect_id:
+                    by_effect[effect_id].append(node.pos)
+            stack.append((node, _strong_children(child), defaultdict(int)))
+        self.by_class = dict(by_class)
+        self.by_effect_id = dict(by_effect)
+        self._built = True
+        self.walks += 1
+        return self
+
+    # -- evaluation ---------------------------------------------------------
+
+    def _candidates(self, step: Step) -> List[int]:
+        if step.test == "*":
+            positions = range(1, len(self.nodes))
+        else:
+            positions = self.by_class.get(step.test, [])
+        effect_id = step.effect_id()
+        if effect_id is not None:
+            pinned = set(self.by_effect_id.get(effect_id, []))
+            positions = [p for p in positions if p in pinned]
+        return list(positions)
+
+    def evaluate(self, query: Union[str, Query]) -> List[Node]:
+        """Nodes matching query, in document (pre-order) order."""
+        query = compile_query(query)
+        self.build()
+        context = [0]
+        for step in query.steps:
+            candidates = self._candidates(step)
+            if step.descendant:
+                matched = self._within(context, candidates)
+            else:
+                parents = set(context)
+                matched = [p for p in candidates if self.nodes[p].parent in parents]
+            context = [p for p in matched if all(self._test(self.nodes[p], pred) for pred in step.predicates)]
+            if not context:
+                break
+        return [self.nodes[p] for p in context]
+
+    def _within(self, context: List[int], candidates: List[int]) -> List[int]:
+        """Candidates strictly inside any context subtree; pruned by interval bisection."""
+        matched: List[int] = []
+        last_end = -1
+        for pos in context:  # pre-order, so nested contexts follow their ancestors
+            node = self.nodes[pos]
+            lo = bisect_right(candidates, max(pos, last_end))
+            hi = bisect_right(candidates, node.end)
+            if lo < hi:
+                matched.extend(candidates[lo:hi])
+            last_end = max(last_end, node.end)
+        return matched
+
+    def _test(self, node: Node, predicate) -> bool:
+        kind = predicate[0]
+        if kind == "and":
+            return self._test(node, predicate[1]) and self._test(node, predicate[2])
+        if kind == "or":
+            return self._test(node, predicate[1]) or self._test(node, predicate[2])
+        if kind == "not":
+            return not self._test(node, predicate[1])
+        value = self.attribute(node, predicate[1])
+        if kind == "has":
+            return value is not None and value != "" and value != []
+        return _compare(value, predicate[2], predicate[3])
+
+    # -- attributes ---------------------------------------------------------
+
+    def attribute(self, node: Node, attr: str) -> Any:
+        obj = node.obj
+        if attr == "class":
+            return node.cls
+        if attr == "AvidEffectID":
+            return _effect_id(obj) if "OperationGroup" in node.classes else None
+        if attr == "effect":
+            return extract_effect_name_from_operation_group(obj) if "OperationGroup" in node.classes else None
+        if attr.startswith("param."):
+            wanted = attr[len("param."):]
+            for param in getattr(obj, "parameters", None) or []:
+                if str(param_name(param)) == wanted:
+                    return _plain(getattr(param, "value", None))
+            return None
+        if attr.startswith("chain."):
+            if "SourceClip" not in node.classes:
+                return None
+            resolved = self._resolver.resolve(obj) or {}
+            return resolved.get(attr[len("chain."):])
+        try:
+            if attr in obj.keys():
+                return _plain(obj[attr].value)
+        except Exception:
+            pass
+        return _plain(getattr(obj, attr, None)) if not attr.startswith("_") else None
+
+
+def _plain(value: Any) -> Any:
+    """Comparable/JSON-friendly form of a pyaaf2 property value."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if hasattr(value, "numerator") and hasattr(value, "denominator"):
+        return float(value)
+    if isinstance(value, (list, tuple)) and all(isinstance(v, (int, float, str)) for v in value):
+        return list(value)
+    return str(value)
+
+
+def _compare(value: Any, op: str, literal: Any) -> bool:
+    if op == "~=":
+        return value is not None and literal.search(str(value)) is not None
+    if op in ("=", "!="):
+        if isinstance(literal, (int, float)) and not isinstance(literal, bool) and value is not None:
+            try:
+                equal = float(value) == float(literal)
+            except (TypeError, ValueError):
+                equal = False
+        elif isinstance(literal, str) and value is not None:
+            equal = str(value) == literal
+        else:
+            equal = value == literal
+        return equal if op == "=" else not equal
+    try:
+        a, b = float(value), float(literal)
+    except (TypeError, ValueError):
+        return False
+    return {"<": a < b, "<=": a <= b, ">": a > b, ">=": a >= b}[op]
+
+
+def select(source: Union[GraphIndex, Any], query: Union[str, Query]) -> List[Node]:
+    """Evaluate query against a GraphIndex or an open aaf2 file (indexed for this call)."""
+    index = source if isinstance(source, GraphIndex) else GraphIndex(source)
+    return index.evaluate(query)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+_ROW_ATTRS = ("Name", "Length", "AvidEffectID", "effect", "chain.path")
+
+
+def _row(node: Node) -> Dict[str, Any]:
+    row: Dict[str, Any] = {"path": node.path, "class": node.cls}
+    for attr in _ROW_ATTRS:
+        value = node.get(attr)
+        if value is not None:
+            row[attr] = value
+    return row
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run XPath-like selectors over an AAF object graph")
+    parser.add_argument("aaf", help="Input AAF")
+    parser.add_argument("queries", nargs="+", help="Selectors, e.g. '//OperationGroup[@AvidEffectID=\"EFF2_PAN_SCAN\"]'")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--limit", type=int, default=50, help="Rows printed per query in text mode (default: 50)")
+    args = parser.parse_args(argv)
+
+    if not HAS_AAF2:
+        raise ImportError("aaf2 is required. Install with: pip install pyaaf2")
+    try:
+        queries = [compile_query(q) for q in args.queries]
+    except QuerySyntaxError as e:
+        parser.error(str(e))
+
+    with aaf2.open(args.aaf, "r") as f:
+        index = GraphIndex(f)
+        results = {q.text: [_row(node) for node in index.evaluate(q)] for q in queries}
+
+    if args.json:
+        print(json.dumps(results, indent=2, default=str))
+        return 0
+    for text, rows in results.items():
+        print(f"{text}  ({len(rows)} match{'es' if len(rows) != 1 else ''})")
+        for row in rows[: args.limit]:
+            extra = "  ".join(f"{k}={v}" for k, v in row.items() if k not in ("path", "class"))
+            print(f"  {row['path']}  {extra}".rstrip())
+        if len(rows) > args.limit:
+            print(f"  ... {len(rows) - args.limit} more")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
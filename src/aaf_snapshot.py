@@ -0,0 +1,692 @@
+#!/usr/bin/env python3
+"""
+aaf_snapshot.py — Offline AAF object-graph snapshots (SQLite)
+
+Rule development and analytics reopen the same AAFs again and again just to walk their
+object graphs, paying the compound-file (CFB) and metadictionary parse every time. A
+snapshot exports the metadata graph once into a single SQLite file and serves it back
+through a read API shaped like the subset of pyaaf2 the builder uses:
+
+    export_snapshot("timeline.aaf", "timeline.aafsnap")
+    with open_snapshot("timeline.aafsnap") as f:
+        for mob in f.content.compositionmobs():
+            seq = mob.slots[0].segment          # type(seq).__name__ == "Sequence"
+            clip.mob.descriptor["Locator"].value
+    build_canonical_from_aaf("timeline.aafsnap")   # snapshots are detected by header
+
+What is stored, per object reachable by strong references from the Header:
+- its AAF class (with the class ancestry, for classdef-style checks)
+- every property in file order: kind (value / strongref / strongref_vector /
+  strongref_set / weakref / weakref_vector / stream) and decoded value, with object
+  references stored as snapshot ids (weak references resolved to their target)
+- the pyaaf2 convenience accessors (name, mob_id, slots, segment, components, start,
+  length, parameters, parameterdef, mob, descriptor, ...) evaluated at export time;
+  accessors pyaaf2 does not define on that class stay undefined, so hasattr() agrees
+
+Stream payloads (essence) are never read, only their size is recorded. Objects are
+loaded lazily by id, one row each.
+
+Usage:
+    python src/aaf_snapshot.py export corpus/ --out-dir snapshots/   # skips up-to-date ones
+    python src/aaf_snapshot.py export a.aaf -o a.aafsnap
+    python src/aaf_snapshot.py info a.aafsnap
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import logging
+import os
+import sqlite3
+import sys
+from fractions import Fraction
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import aaf2
+    from aaf2.core import AAFObject
+    from aaf2.misc import TaggedValueHelper
+    from aaf2.rational import AAFRational
+    from aaf2.properties import (
+        StreamProperty,
+        StrongRefProperty,
+        StrongRefSetProperty,
+        StrongRefVectorProperty,
+        WeakRefArrayProperty,
+        WeakRefProperty,
+    )
+    HAS_AAF2 = True
+except ImportError:
+    aaf2 = None
+    AAFRational = Fraction
+    HAS_AAF2 = False
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = "aaf-graph-snapshot"
+SNAPSHOT_VERSION = 2
+SNAPSHOT_SUFFIX = ".aafsnap"
+
+_SQLITE_MAGIC = b"SQLite format 3\x00"
+
+# pyaaf2 convenience accessors recorded per object (those the builder, the legacy
+# exporters and analyze_effect_params.py read); evaluated with getattr at export time
+ACCESSORS = (
+    "name", "mob_id", "slot_id", "slots", "segment", "components", "length", "start",
+    "edit_rate", "descriptor", "parameters", "segments", "fps", "drop", "value",
+    "pointlist", "time", "mob", "slot", "parameterdef", "operation", "interpolation",
+    "locator", "usage", "comments", "media_kind", "datadef", "auid", "unique_key",
+    "mobs", "essencedata", "tangents",
+)
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE classes (name TEXT PRIMARY KEY, parents TEXT NOT NULL);
+CREATE TABLE objects (
+    id INTEGER PRIMARY KEY,
+    class TEXT NOT NULL,
+    parent INTEGER,
+    props TEXT NOT NULL,
+    attrs TEXT NOT NULL
+);
+CREATE INDEX objects_class ON objects (class);
+"""
+
+
+class SnapshotError(Exception):
+    """Not a snapshot, an incompatible snapshot version, or a missing object."""
+
+
+# --------------------------- Export ---------------------------
+
+
+def _object_key(obj) -> Any:
+    """Identity of a pyaaf2 object across accesses (its CFB directory path when attached)."""
+    directory = getattr(obj, "dir", None)
+    if directory is not None:
+        return directory.path()
+    return id(obj)
+
+
+def _class_name(obj) -> str:
+    classdef = getattr(obj, "classdef", None)
+    return str(getattr(classdef, "class_name", None) or type(obj).__name__)
+
+
+def _class_parents(obj) -> List[str]:
+    parents = []
+    classdef = getattr(getattr(obj, "classdef", None), "parent", None)
+    while classdef is not None and len(parents) < 32:
+        parents.append(str(classdef.class_name))
+        next_def = classdef.parent
+        if next_def is classdef:
+            break
+        classdef = next_def
+    return parents
+
+
+class _Encoder:
+    """Encodes pyaaf2 values as JSON-able values with tagged non-JSON types."""
+
+    def __init__(self, ids: Dict[Any, int]):
+        self.ids = ids
+
+    def ref(self, obj) -> Any:
+        oid = self.ids.get(_object_key(obj))
+        if oid is not None:
+            return {"$ref": oid}
+        # Outside the Header graph (metadictionary definitions): keep class and name only
+        return {"$ext": _class_name(obj), "name": _safe_str(getattr(obj, "name", None))}
+
+    def value(self, value) -> Any:
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, AAFObject):
+            return self.ref(value)
+        if isinstance(value, StrongRefSetProperty):
+            return {"$set": [[str(key), self.ref(obj)] for key, obj in value.items()]}
+        if isinstance(value, (StrongRefVectorProperty, WeakRefArrayProperty)):
+            return {"$vec": [self.value(obj) for obj in value]}
+        if isinstance(value, StreamProperty):
+            return {"$stream": _stream_size(value)}
+        if isinstance(value, TaggedValueHelper):
+            return self.value(value.p)
+        if hasattr(value, "value") and hasattr(value, "pid"):  # any other Property
+            return self.value(value.value)
+        if isinstance(value, Fraction):
+            return {"$r": [value.numerator, value.denominator]}
+        if isinstance(value, (bytes, bytearray)):
+            return {"$b": bytes(value).hex()}
+        if isinstance(value, (list, tuple)):
+            return [self.value(v) for v in value]
+        if isinstance(value, dict):
+            return {"$d": [[self.value(k), self.value(v)] for k, v in value.items()]}
+        # MobID, AUID, UUID and other identifier types: their string form
+        return _safe_str(value)
+
+    def prop(self, prop) -> Tuple[str, str, Any]:
+        name = str(getattr(prop, "name", None) or getattr(getattr(prop, "propertydef", None), "property_name", "?"))
+        if isinstance(prop, StreamProperty):
+            return name, "stream", {"$stream": _stream_size(prop)}
+        if isinstance(prop, StrongRefSetProperty):
+            return name, "strongref_set", self.value(prop)
+        if isinstance(prop, StrongRefVectorProperty):
+            return name, "strongref_vector", self.value(prop)
+        if isinstance(prop, WeakRefArrayProperty):
+            return name, "weakref_vector", {"$vec": [self.value(obj) for obj in _safe_value(prop) or []]}
+        if isinstance(prop, StrongRefProperty):
+            return name, "strongref", self.value(_safe_value(prop))
+        if isinstance(prop, WeakRefProperty):
+            return name, "weakref", self.value(_safe_value(prop))
+        return name, "value", self.value(_safe_value(prop))
+
+
+def _safe_value(prop) -> Any:
+    try:
+        return prop.value
+    except Exception as e:
+        logger.debug(f"Undecodable property {getattr(prop, 'name', '?')}: {e}")
+        return None
+
+
+def _safe_str(value) -> Optional[str]:
+    if value is None:
+        return None
+    try:
+        return str(value)
+    except Exception:
+        return repr(value)
+
+
+def _stream_size(prop) -> Optional[int]:
+    """Byte size of a stream property from its directory entry (the payload is not read)."""
+    try:
+        entry = prop.parent.dir.get(prop.stream_name) if prop.attached else prop.dir
+        return int(entry.byte_size) if entry is not None else None
+    except Exception:
+        return None
+
+
+def _strong_children(obj) -> Iterator[Any]:
+    for prop in obj.properties():
+        if isinstance(prop, StrongRefSetProperty):
+            yield from prop.values()
+        elif isinstance(prop, StrongRefVectorProperty):
+            yield from prop
+        elif isinstance(prop, StrongRefProperty):
+            child = _safe_value(prop)
+            if child is not None:
+                yield child
+
+
+def _collect(header) -> List[Tuple[Any, Optional[int]]]:
+    """(object, parent index) for every object strongly reachable from the Header, depth-first."""
+    found = [(header, None)]
+    seen = {_object_key(header)}
+    stack = [0]
+    while stack:
+        index = stack.pop()
+        children = []
+        for child in _strong_children(found[index][0]):
+            key = _object_key(child)
+            if key in seen:
+                continue
+            seen.add(key)
+            found.append((child, index))
+            children.append(len(found) - 1)
+        stack.extend(reversed(children))
+    return found
+
+
+def _accessors(obj, encoder: _Encoder) -> Dict[str, Any]:
+    attrs = {}
+    for name in ACCESSORS:
+        try:
+            value = getattr(obj, name)
+        except Exception:
+            continue  # undefined (or failing) in pyaaf2: undefined in the snapshot too
+        try:
+            attrs[name] = encoder.value(value)
+        except Exception as e:
+            logger.debug(f"Accessor {name} of {_class_name(obj)} not encodable: {e}")
+    return attrs
+
+
+def export_snapshot(aaf_path: str, snapshot_path: Optional[str] = None) -> str:
+    """Write the metadata graph of aaf_path to a SQLite snapshot; returns the snapshot path."""
+    if not HAS_AAF2:
+        raise ImportError("aaf2 is required. Install with: pip install pyaaf2")
+    snapshot_path = snapshot_path or default_snapshot_path(aaf_path)
+    st = os.stat(aaf_path)
+    tmp_path = snapshot_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    with aaf2.open(str(aaf_path), "r") as f:
+        objects = _collect(f.header)
+        ids = {_object_key(obj): i + 1 for i, (obj, _) in enumerate(objects)}
+        encoder = _Encoder(ids)
+        classes: Dict[str, List[str]] = {}
+
+        db = sqlite3.connect(tmp_path)
+        try:
+            db.executescript(_SCHEMA)
+            rows = []
+            for i, (obj, parent) in enumerate(objects):
+                class_name = _class_name(obj)
+                if class_name not in classes:
+                    classes[class_name] = _class_parents(obj)
+                props = [encoder.prop(p) for p in obj.properties()]
+                rows.append((
+                    i + 1,
+                    class_name,
+                    parent + 1 if parent is not None else None,
+                    json.dumps(props, separators=(",", ":")),
+                    json.dumps(_accessors(obj, encoder), separators=(",", ":")),
+                ))
+            db.executemany("INSERT INTO objects VALUES (?, ?, ?, ?, ?)", rows)
+            db.executemany("INSERT INTO classes VALUES (?, ?)", [(k, json.dumps(v)) for k, v in classes.items()])
+            meta = {
+                "format": SNAPSHOT_FORMAT,
+                "version": str(SNAPSHOT_VERSION),
+                "source": os.path.abspath(aaf_path),
+                "source_size": str(st.st_size),
+                "source_mtime_ns": str(st.st_mtime_ns),
+                "objects": str(len(rows)),
+            }
+            db.executemany("INSERT INTO meta VALUES (?, ?)", meta.items())
+            db.commit()
+        finally:
+            db.close()
+
+    os.replace(tmp_path, snapshot_path)
+    logger.info(f"Snapshot of {aaf_path}: {len(objects)} objects -> {snapshot_path}")
+    return snapshot_path
+
+
+def default_snapshot_path(aaf_path: str) -> str:
+    return os.path.splitext(str(aaf_path))[0] + SNAPSHOT_SUFFIX
+
+
+def snapshot_is_current(snapshot_path: str, aaf_path: str) -> bool:
+    """True when snapshot_path exists and was exported from aaf_path at its current size/mtime."""
+    if not os.path.exists(snapshot_path):
+        return False
+    try:
+        with open_snapshot(snapshot_path) as snap:
+            meta = snap.meta
+    except SnapshotError:
+        return False
+    st = os.stat(aaf_path)
+    return meta.get("source_size") == str(st.st_size) and meta.get("source_mtime_ns") == str(st.st_mtime_ns)
+
+
+# --------------------------- Read API ---------------------------
+
+
+def is_snapshot(path: str) -> bool:
+    """True when path is a SQLite file (checked by header, not suffix)."""
+    try:
+        with open(path, "rb") as fh:
+            return fh.read(len(_SQLITE_MAGIC)) == _SQLITE_MAGIC
+    except OSError:
+        return False
+
+
+class SnapshotRefList(list):
+    """Decoded strong/weak reference vector or set (pyaaf2 property stand-in)."""
+
+    def __init__(self, items, keys: Optional[List[str]] = None):
+        super().__init__(items)
+        self._keys = keys
+
+    @property
+    def value(self) -> list:
+        return list(self)
+
+    def get(self, key, default=None):
+        """Set lookup by unique key (e.g. content.mobs.get(mob_id)), or vector lookup by index."""
+        if self._keys is None:
+            return self[key] if isinstance(key, int) and -len(self) <= key < len(self) else default
+        try:
+            return self[self._keys.index(str(key))]
+        except ValueError:
+            return default
+
+
+class SnapshotExternal:
+    """An object outside the snapshot graph (e.g. a metadictionary TypeDef): class and name only."""
+
+    __slots__ = ("class_name", "name")
+
+    def __init__(self, class_name: str, name: Optional[str]):
+        self.class_name = class_name
+        self.name = name
+
+    def __repr__(self) -> str:
+        return f"<{self.class_name} {self.name}>"
+
+
+class SnapshotClassDef:
+    """classdef stand-in: class_name plus the parent chain."""
+
+    __slots__ = ("class_name", "parent")
+
+    def __init__(self, class_name: str, parent: Optional["SnapshotClassDef"]):
+        self.class_name = class_name
+        self.parent = parent
+
+
+class SnapshotProperty:
+    """One stored property: name, kind and lazily decoded value."""
+
+    __slots__ = ("name", "kind", "_raw", "_file", "_value", "_decoded")
+
+    def __init__(self, name: str, kind: str, raw: Any, file: "SnapshotFile"):
+        self.name = name
+        self.kind = kind
+        self._raw = raw
+        self._file = file
+        self._decoded = False
+        self._value = None
+
+    @property
+    def value(self) -> Any:
+        if not self._decoded:
+            self._value = self._file._decode(self._raw)
+            self._decoded = True
+        return self._value
+
+    @property
+    def propertydef(self) -> "SnapshotProperty":
+        return self  # .propertydef.name reads the property name, as in pyaaf2
+
+    @property
+    def property_name(self) -> str:
+        return self.name
+
+    def __iter__(self):
+        value = self.value
+        return iter(value if isinstance(value, list) else [])
+
+    def __len__(self) -> int:
+        value = self.value
+        return len(value) if isinstance(value, list) else 0
+
+    def get(self, index: int, default=None):
+        """Vector element by index (pyaaf2 StrongRefVectorProperty.get)."""
+        value = self.value
+        if isinstance(value, list) and -len(value) <= index < len(value):
+            return value[index]
+        return default
+
+    def __repr__(self) -> str:
+        return f"<SnapshotProperty {self.name} ({self.kind})>"
+
+
+class SnapshotObject:
+    """
+    One AAF object of a snapshot. Instances get a per-class subclass named after the
+    AAF class, so type(obj).__name__ checks behave as with pyaaf2 objects.
+    """
+
+    __slots__ = ("_file", "snapshot_id", "_class", "_parent", "_props", "_attrs", "_cache")
+
+    def __init__(self, file: "SnapshotFile", snapshot_id: int, class_name: str, parent: Optional[int], props, attrs):
+        self._file = file
+        self.snapshot_id = snapshot_id
+        self._class = class_name
+        self._parent = parent
+        self._props = props
+        self._attrs = attrs
+        self._cache: Dict[str, Any] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        cache = self._cache
+        if name in cache:
+            return cache[name]
+        if name not in self._attrs:
+            raise AttributeError(f"{self._class} has no attribute {name!r}")
+        value = cache[name] = self._file._decode(self._attrs[name])
+        return value
+
+    @property
+    def classdef(self) -> SnapshotClassDef:
+        return self._file.classdef(self._class)
+
+    @property
+    def parent(self) -> Optional["SnapshotObject"]:
+        return self._file.object(self._parent) if self._parent else None
+
+    def properties(self) -> List[SnapshotProperty]:
+        return [SnapshotProperty(name, kind, raw, self._file) for name, kind, raw in self._props]
+
+    def get(self, key: str, default=None):
+        for name, kind, raw in self._props:
+            if name == key:
+                return SnapshotProperty(name, kind, raw, self._file)
+        return default
+
+    def __getitem__(self, key: str) -> SnapshotProperty:
+        prop = self.get(key)
+        if prop is None:
+            raise KeyError(key)
+        return prop
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __repr__(self) -> str:
+        return f"<snapshot {self._class} #{self.snapshot_id}>"
+
+
+class SnapshotContentStorage(SnapshotObject):
+    """ContentStorage with pyaaf2's mob filters."""
+
+    __slots__ = ()
+
+    def _mobs_of(self, class_name: str) -> Iterator[SnapshotObject]:
+        return (mob for mob in self.mobs if type(mob).__name__ == class_name)
+
+    def compositionmobs(self) -> Iterator[SnapshotObject]:
+        return self._mobs_of("CompositionMob")
+
+    def mastermobs(self) -> Iterator[SnapshotObject]:
+        return self._mobs_of("MasterMob")
+
+    def sourcemobs(self) -> Iterator[SnapshotObject]:
+        return self._mobs_of("SourceMob")
+
+
+_snapshot_classes: Dict[str, type] = {}
+
+
+def _snapshot_class(class_name: str) -> type:
+    cls = _snapshot_classes.get(class_name)
+    if cls is None:
+        base = SnapshotContentStorage if class_name == "ContentStorage" else SnapshotObject
+        cls = _snapshot_classes[class_name] = type(class_name, (base,), {"__slots__": ()})
+    return cls
+
+
+class SnapshotFile:
+    """Read-only snapshot opened like an AAF: f.header, f.content, f.dictionary."""
+
+    def __init__(self, path: str):
+        if not is_snapshot(path):
+            raise SnapshotError(f"{path} is not an AAF graph snapshot")
+        self.path = str(path)
+        self._db = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+        try:
+            self.meta = dict(self._db.execute("SELECT key, value FROM meta"))
+        except sqlite3.DatabaseError as e:
+            self._db.close()
+            raise SnapshotError(f"{path} is not an AAF graph snapshot: {e}") from None
+        if self.meta.get("format") != SNAPSHOT_FORMAT or self.meta.get("version") != str(SNAPSHOT_VERSION):
+            self._db.close()
+            raise SnapshotError(f"{path}: unsupported snapshot {self.meta.get('format')} v{self.meta.get('version')}")
+        self._objects: Dict[int, SnapshotObject] = {}
+        self._classdefs: Dict[str, SnapshotClassDef] = {}
+        self._parents = {name: json.loads(parents) for name, parents in self._db.execute("SELECT name, parents FROM classes")}
+
+    def object(self, snapshot_id: int) -> SnapshotObject:
+        obj = self._objects.get(snapshot_id)
+        if obj is None:
+            row = self._db.execute(
+                "SELECT class, parent, props, attrs FROM objects WHERE id = ?", (snapshot_id,)
+            ).fetchone()
+            if row is None:
+                raise SnapshotError(f"{self.path}: no object #{snapshot_id}")
+            class_name, parent, props, attrs = row
+            obj = _snapshot_class(class_name)(self, snapshot_id, class_name, parent, json.loads(props), json.loads(attrs))
+            self._objects[snapshot_id] = obj
+        return obj
+
+    def objects_of_class(self, class_name: str) -> Iterator[SnapshotObject]:
+        """Every object of exactly this AAF class, in graph order."""
+        for (snapshot_id,) in self._db.execute("SELECT id FROM objects WHERE class = ? ORDER BY id", (class_name,)):
+            yield self.object(snapshot_id)
+
+    def classdef(self, class_name: str) -> SnapshotClassDef:
+        classdef = self._classdefs.get(class_name)
+        if classdef is None:
+            chain = [class_name] + self._parents.get(class_name, [])
+            classdef = None
+            for name in reversed(chain):
+                classdef = SnapshotClassDef(name, classdef)
+            self._classdefs[class_name] = classdef
+        return classdef
+
+    def _decode(self, raw: Any) -> Any:
+        if isinstance(raw, list):
+            return [self._decode(v) for v in raw]
+        if not isinstance(raw, dict):
+            return raw
+        if "$ref" in raw:
+            return self.object(raw["$ref"])
+        if "$vec" in raw:
+            return SnapshotRefList([self._decode(v) for v in raw["$vec"]])
+        if "$set" in raw:
+            pairs = raw["$set"]
+            return SnapshotRefList([self._decode(ref) for _, ref in pairs], [key for key, _ in pairs])
+        if "$r" in raw:
+            return AAFRational(*raw["$r"])
+        if "$b" in raw:
+            return bytes.fromhex(raw["$b"])
+        if "$d" in raw:
+            return {self._decode(k): self._decode(v) for k, v in raw["$d"]}
+        if "$ext" in raw:
+            return SnapshotExternal(raw["$ext"], raw.get("name"))
+        if "$stream" in raw:
+            return None  # payload not snapshotted
+        return raw
+
+    @property
+    def header(self) -> SnapshotObject:
+        return self.object(1)
+
+    @property
+    def content(self) -> SnapshotObject:
+        return self.header["Content"].value
+
+    @property
+    def dictionary(self) -> SnapshotObject:
+        return self.header["Dictionary"].value
+
+    def stats(self) -> Dict[str, Any]:
+        classes = dict(self._db.execute("SELECT class, COUNT(*) FROM objects GROUP BY class ORDER BY 2 DESC"))
+        return {**self.meta, "objects": sum(classes.values()), "classes": classes}
+
+    def close(self) -> None:
+        self._db.close()
+        self._objects.clear()
+
+    def __enter__(self) -> "SnapshotFile":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def open_snapshot(path: str) -> SnapshotFile:
+    return SnapshotFile(path)
+
+
+def open_aaf_or_snapshot(path: str):
+    """A snapshot when path is one, else aaf2.open(path, "r"); both are context managers."""
+    if is_snapshot(path):
+        return open_snapshot(path)
+    if not HAS_AAF2:
+        raise ImportError("aaf2 is required. Install with: pip install pyaaf2")
+    return aaf2.open(str(path), "r")
+
+
+# --------------------------- CLI ---------------------------
+
+
+def _expand(inputs: List[str]) -> List[Tuple[str, str]]:
+    """(path, snapshot name) per AAF: directories are searched for *.aaf, names keep their subdirectories."""
+    entries = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for path in sorted(glob.glob(os.path.join(item, "**", "*.aaf"), recursive=True)):
+                entries.append((path, os.path.splitext(os.path.relpath(path, item))[0]))
+        else:
+            entries.append((item, os.path.splitext(os.path.basename(item))[0]))
+    return entries
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export AAF object graphs to SQLite snapshots")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="Snapshot AAF files (or every *.aaf under directories)")
+    export.add_argument("inputs", nargs="+")
+    export.add_argument("-o", "--out", help="Snapshot path (single input only)")
+    export.add_argument("--out-dir", help="Directory for <name>.aafsnap files, mirroring input subdirectories (default: next to each AAF)")
+    export.add_argument("--force", action="store_true", help="Re-export snapshots that are up to date")
+    info = sub.add_parser("info", help="Show snapshot metadata and object counts per class")
+    info.add_argument("snapshot")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    if args.command == "info":
+        with open_snapshot(args.snapshot) as snap:
+            print(json.dumps(snap.stats(), indent=2))
+        return 0
+
+    entries = _expand(args.inputs)
+    if args.out and len(entries) != 1:
+        parser.error("-o/--out takes a single input; use --out-dir for several")
+    targets: Dict[str, str] = {}  # target → input
+    for path, name in entries:
+        if args.out:
+            target = args.out
+        elif args.out_dir:
+            # Mirror subdirectories so same-named files in different folders do not collide
+            target = os.path.join(args.out_dir, name + SNAPSHOT_SUFFIX)
+        else:
+            target = default_snapshot_path(path)
+        if target in targets:
+            parser.error(f"{targets[target]} and {path} would both write {target}")
+        targets[target] = path
+    failed = 0
+    for target, path in targets.items():
+        if args.out_dir:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+        if not args.force and snapshot_is_current(target, path):
+            logger.info(f"Up to date: {target}")
+            continue
+        try:
+            export_snapshot(path, target)
+        except Exception as e:
+            failed += 1
+            logger.error(f"Snapshot of {path} failed: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+aaf_summary.py — Summary-only triage of AAF files
+
+For triaging a drop of many AAFs, the full canonical build (traversal, UMID chain
+resolution, parameter decoding) is far more than needed. summarize_aaf() reads only:
+- the selected composition header: name, rate and start timecode, via the builder's
+  own selection (choose_top_composition, composition_timeline_metadata)
+- top-level component counts, by kind, of the picture track the builder converts
+
+No mob map is built, no source is resolved and no parameter is decoded. Component
+kinds are read from the compound-file directory entries (class id) without loading
+the components' properties.
+
+Usage:
+    python src/aaf_summary.py drop/*.aaf               # table
+    python src/aaf_summary.py drop/ --json --workers 8 # directories are searched for *.aaf
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+try:
+    from .build_canonical import (
+        HAS_AAF2,
+        _find_picture_slot,
+        _iter_safe,
+        aaf2,
+        choose_top_composition,
+        composition_timeline_metadata,
+        frames_to_timecode,
+        list_composition_mobs,
+    )
+except ImportError:  # executed as a script: python src/aaf_summary.py
+    from build_canonical import (
+        HAS_AAF2,
+        _find_picture_slot,
+        _iter_safe,
+        aaf2,
+        choose_top_composition,
+        composition_timeline_metadata,
+        frames_to_timecode,
+        list_composition_mobs,
+    )
+
+# Component kinds counted per track; anything else is counted as "other"
+_KINDS = {
+    "SourceClip": "source_clips",
+    "OperationGroup": "operation_groups",
+    "Filler": "fillers",
+    "Transition": "transitions",
+}
+
+TABLE_COLUMNS = [
+    ("file", 28),
+    ("composition", 28),
+    ("rate", 6),
+    ("start", 11),
+    ("duration", 11),
+    ("tracks", 6),
+    ("components", 10),
+    ("effects", 7),
+]
+
+
+def _component_kinds(aaf, sequence) -> Iterator[str]:
+    """Class names of a Sequence's components from their directory entries (no property reads)."""
+    try:
+        components = sequence["Components"]
+        lookup_class = aaf.metadict.lookup_class
+        for i in range(len(components)):
+            entry = sequence.dir.get(components.index_ref_name(i))
+            yield lookup_class(entry.class_id).__name__
+    except Exception:
+        # In-memory or unusual objects: fall back to loading each component
+        for component in _iter_safe(sequence.components):
+            yield type(component).__name__
+
+
+def _sequence_length(sequence) -> int:
+    length = getattr(sequence, "length", None)
+    if length:
+        return int(length)
+    # Length not stored: derive it from the components (transitions overlap neighbours)
+    total = 0
+    for component in _iter_safe(sequence.components):
+        n = int(getattr(component, "length", 0) or 0)
+        total += -n if "Transition" in type(component).__name__ else n
+    return total
+
+
+def summarize_aaf(aaf_path: str) -> Dict[str, Any]:
+    """
+    Header-level summary of the top composition of an AAF.
+
+    Returns:
+        {"path", "composition", "rate", "drop", "start", "duration_frames", "duration",
+         "tracks", "components", "operation_groups", "source_clips", "fillers",
+         "transitions", "other", "elapsed"}
+    """
+    if not HAS_AAF2:
+        raise ImportError("aaf2 is required. Install with: pip install pyaaf2")
+
+    started = time.perf_counter()
+    with aaf2.open(str(aaf_path), "r") as f:
+        comp = choose_top_composition(list_composition_mobs(f))
+        fps, is_drop, start_tc_string, timeline_name = composition_timeline_metadata(comp)
+        tracks = sum(
+            1 for slot in _iter_safe(comp.slots)
+            if "Sequence" in type(getattr(slot, "segment", None)).__name__
+        )
+        # Counts and duration come from the track the builder extracts events from
+        sequence = _find_picture_slot(comp).segment
+        duration_frames = _sequence_length(sequence)
+        counts = Counter(_KINDS.get(kind, "other") for kind in _component_kinds(f, sequence))
+
+    return {
+        "path": str(aaf_path),
+        "composition": str(timeline_name),
+        "rate": fps,
+        "drop": is_drop,
+        "start": start_tc_string,
+        "duration_frames": duration_frames,
+        "duration": frames_to_timecode(duration_frames, fps, is_drop),
+        "tracks": tracks,
+        "components": sum(counts.values()),
+        **{kind: counts[kind] for kind in [*_KINDS.values(), "other"]},
+        "elapsed": round(time.perf_counter() - started, 4),
+    }
+
+
+def _summarize_safe(aaf_path: str) -> Dict[str, Any]:
+    """summarize_aaf() that reports failures as {"path", "error"} instead of raising."""
+    try:
+        return summarize_aaf(aaf_path)
+    except Exception as e:
+        return {"path": str(aaf_path), "error": str(e)}
+
+
+def summarize_many(paths: Iterable[str], workers: int = 1) -> List[Dict[str, Any]]:
+    """Summaries for many files, in input order; failures are reported per file."""
+    paths = [str(p) for p in paths]
+    if workers > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+            return list(pool.map(_summarize_safe, paths))
+    return [_summarize_safe(p) for p in paths]
+
+
+def _expand_paths(inputs: Iterable[str]) -> List[str]:
+    paths: List[str] = []
+    for item in inputs:
+        p = Path(item)
+        if p.is_dir():
+            paths.extend(str(x) for x in sorted(p.rglob("*")) if x.suffix.lower() == ".aaf")
+        else:
+            paths.append(item)
+    return paths
+
+
+def format_table(summaries: List[Dict[str, Any]]) -> str:
+    """Fixed-width text table, one row per file."""
+
+    def cell(text: Any, width: int) -> str:
+        text = str(text)
+        return text if len(text) <= width else text[: width - 1] + "…"
+
+    lines = ["  ".join(name.ljust(width) for name, width in TABLE_COLUMNS).rstrip()]
+    for s in summaries:
+        name = Path(s["path"]).name
+        if "error" in s:
+            lines.append(f"{cell(name, TABLE_COLUMNS[0][1]).ljust(TABLE_COLUMNS[0][1])}  ERROR: {s['error']}")
+            continue
+        rate = f"{s['rate']:g}{' DF' if s['drop'] else ''}"
+        values = [name, s["composition"], rate, s["start"], s["duration"], s["tracks"], s["components"], s["operation_groups"]]
+        lines.append("  ".join(cell(v, w).ljust(w) for v, (_, w) in zip(values, TABLE_COLUMNS)).rstrip())
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Summary-only triage of AAF files (no source resolution)")
+    parser.add_argument("paths", nargs="+", help="AAF files or directories (searched for *.aaf)")
+    parser.add_argument("--json", action="store_true", help="Print a JSON list instead of a table")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (default: 1)")
+    args = parser.parse_args(argv)
+
+    summaries = summarize_many(_expand_paths(args.paths), workers=args.workers)
+    if args.json:
+        print(json.dumps(summaries, indent=2))
+    else:
+        print(format_table(summaries))
+    return 1 if any("error" in s for s in summaries) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+async_convert.py — asyncio front-end for AAF → canonical → FCPXML conversions
+
+build_canonical_from_aaf() and write_fcpxml_from_canonical() are CPU-bound and block
+the event loop for seconds. This module runs them in a shared process pool behind an
+asyncio.Semaphore so one service process can serve many concurrent requests.
+
+Usage:
+    canon = await convert_aaf("timeline.aaf", timeout=120)
+    await write_fcpxml(canon, "timeline.fcpxml")
+
+    job = get_converter().submit_aaf("timeline.aaf")
+    async for event in job.progress():
+        print(event["stage"], event.get("detail"))  # queued, running, progress..., done
+    canon = await job.result()
+
+Key principles:
+- Bounded concurrency: at most `max_workers` conversions occupy the pool at once
+- Cooperative cancellation: task cancellation and timeouts trigger the build's
+  CancellationToken in the worker process, which returns at its next checkpoint;
+  timeouts count from submission, so time spent queued for a slot is included
+- Progress is streamed from the worker through a Manager queue as plain dicts;
+  "progress" stages carry the builder's ProgressReporter updates (src/build_progress.py)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import multiprocessing
+import os
+import queue
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterator, Dict, Optional
+
+from .build_canonical import build_canonical_from_aaf
+from .traversal_budget import CancellationToken, TraversalBudget
+from .write_fcpxml import write_fcpxml_from_canonical
+
+# Progress stages emitted on a job's progress() iterator
+STAGE_QUEUED = "queued"
+STAGE_RUNNING = "running"
+STAGE_PROGRESS = "progress"
+STAGE_DONE = "done"
+STAGE_FAILED = "failed"
+STAGE_CANCELLED = "cancelled"
+
+_POLL_SECONDS = 0.05
+
+
+def _convert_worker(aaf_path: str, options: Dict[str, Any], cancel_event, progress_queue) -> Dict[str, Any]:
+    """Process-pool entrypoint: build the canonical dict, reporting stages on progress_queue."""
+    progress_queue.put({"stage": STAGE_RUNNING, "detail": {"pid": os.getpid()}})
+    canon = build_canonical_from_aaf(
+        aaf_path,
+        cancel_token=CancellationToken(cancel_event),
+        progress=lambda update: progress_queue.put({"stage": STAGE_PROGRESS, "detail": update}),
+        **options,
+    )
+    clips = canon.get("timeline", {}).get("tracks", [{}])[0].get("clips", [])
+    progress_queue.put({"stage": STAGE_DONE, "detail": {"events": len(clips)}})
+    return canon
+
+
+def _write_worker(canon: Dict[str, Any], out_path: str) -> str:
+    write_fcpxml_from_canonical(canon, out_path)
+    return out_path
+
+
+class ConversionJob:
+    """Handle for one submitted conversion: await result(), iterate progress(), cancel()."""
+
+    def __init__(self, converter: "AsyncConverter", aaf_path: str, options: Dict[str, Any], timeout: Optional[float]):
+        self._converter = converter
+        self._semaphore = converter._loop_semaphore()
+        self._cancel_event = converter._manager.Event()
+        self._queue = converter._manager.Queue()
+        self._events: asyncio.Queue = asyncio.Queue()
+        self._events.put_nowait({"stage": STAGE_QUEUED, "detail": {"path": aaf_path}})
+        self._task = asyncio.ensure_future(self._run(aaf_path, options, timeout))
+
+    async def _run(self, aaf_path: str, options: Dict[str, Any], timeout: Optional[float]) -> Dict[str, Any]:
+        """Wait for a pool slot, then convert; `timeout` covers both. Always ends progress()."""
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        future = None
+        try:
+            await self._acquire(timeout)
+            try:
+                future = loop.run_in_executor(
+                    self._converter._pool, _convert_worker, aaf_path, options, self._cancel_event, self._queue
+                )
+                pump = asyncio.ensure_future(self._pump(future))
+                remaining = None if deadline is None else max(deadline - loop.time(), 0.0)
+                return await asyncio.wait_for(asyncio.shield(future), remaining)
+            except asyncio.TimeoutError:
+                self._stop(future, "timeout")
+                raise
+            except asyncio.CancelledError:
+                self._stop(future, "cancelled")
+                raise
+            except Exception as e:
+                self._events.put_nowait({"stage": STAGE_FAILED, "detail": {"error": str(e)}})
+                raise
+            finally:
+                if future is not None:
+                    # Hold the semaphore slot until the worker has actually returned
+                    await asyncio.gather(future, return_exceptions=True)
+                    await pump
+                self._semaphore.release()
+        finally:
+            if future is None:
+                # Never reached the pool: no pump to post the end of progress()
+                self._events.put_nowait(None)
+
+    async def _acquire(self, timeout: Optional[float]) -> None:
+        """Take a semaphore slot; cancellation or timeout while queued posts STAGE_CANCELLED."""
+        acquire = asyncio.ensure_future(self._semaphore.acquire())
+        try:
+            await asyncio.wait_for(asyncio.shield(acquire), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if acquire.done() and not acquire.cancelled():
+                self._semaphore.release()
+            else:
+                acquire.cancel()
+            self._cancel_event.set()
+            reason = "timeout" if isinstance(e, asyncio.TimeoutError) else "cancelled"
+            self._events.put_nowait({"stage": STAGE_CANCELLED, "detail": {"reason": reason, "queued": True}})
+            raise
+
+    def _stop(self, future, reason: str) -> None:
+        self._cancel_event.set()
+        if future is not None:
+            future.cancel()  # only succeeds if the worker has not started yet
+        self._events.put_nowait({"stage": STAGE_CANCELLED, "detail": {"reason": reason}})
+
+    async def _pump(self, future) -> None:
+        """Forward worker progress from the Manager queue onto the asyncio queue."""
+        while True:
+            finished = future.done()
+            try:
+                while True:
+                    self._events.put_nowait(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            if finished:
+                break
+            await asyncio.sleep(_POLL_SECONDS)
+        self._events.put_nowait(None)
+
+    async def progress(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield progress dicts ({"stage": ..., "detail": {...}}) until the job finishes."""
+        while True:
+            event = await self._events.get()
+            if event is None:
+                return
+            yield event
+
+    async def result(self) -> Dict[str, Any]:
+        return await self._task
+
+    def cancel(self) -> None:
+        self._task.cancel()
+
+    def __await__(self):
+        return self._task.__await__()
+
+
+class AsyncConverter:
+    """Shared process pool plus a semaphore per event loop; one instance per service process."""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        self._manager = multiprocessing.Manager()
+        # asyncio.Semaphore binds to the loop that first waits on it, so each event
+        # loop using this converter gets its own (the pool itself is shared)
+        self._semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def _loop_semaphore(self) -> asyncio.Semaphore:
+        """The concurrency semaphore of the running event loop."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_workers)
+        return semaphore
+
+    def submit_aaf(
+        self,
+        aaf_path: str,
+        timeout: Optional[float] = None,
+        budget: Optional[TraversalBudget] = None,
+        **options: Any,
+    ) -> ConversionJob:
+        """Start a conversion; must be called from a running event loop."""
+        if timeout is not None:
+            # Let the worker stop itself shortly after the caller gives up
+            budget = budget or TraversalBudget()
+            if budget.max_seconds is None or budget.max_seconds > timeout:
+                budget = dataclasses.replace(budget, max_seconds=timeout)
+        if budget is not None:
+            options["budget"] = budget
+        return ConversionJob(self, str(aaf_path), options, timeout)
+
+    async def convert_aaf(self, aaf_path: str, timeout: Optional[float] = None, **options: Any) -> Dict[str, Any]:
+        return await self.submit_aaf(aaf_path, timeout=timeout, **options).result()
+
+    async def write_fcpxml(self, canon: Dict[str, Any], out_path: str, timeout: Optional[float] = None) -> str:
+        loop = asyncio.get_running_loop()
+        async with self._loop_semaphore():
+            future = loop.run_in_executor(self._pool, _write_worker, canon, str(out_path))
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                future.cancel()
+                raise
+            finally:
+                await asyncio.gather(future, return_exceptions=True)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self._manager.shutdown()
+
+    async def __aenter__(self) -> "AsyncConverter":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        self.close()
+
+
+_default_converter: Optional[AsyncConverter] = None
+
+
+def get_converter(max_workers: Optional[int] = None) -> AsyncConverter:
+    """Return the process-wide converter, creating it on first use."""
+    global _default_converter
+    if _default_converter is None:
+        _default_converter = AsyncConverter(max_workers)
+    return _default_converter
+
+
+async def convert_aaf(aaf_path: str, timeout: Optional[float] = None, **options: Any) -> Dict[str, Any]:
+    """Async build_canonical_from_aaf() on the shared converter."""
+    return await get_converter().convert_aaf(aaf_path, timeout=timeout, **options)
+
+
+async def write_fcpxml(canon: Dict[str, Any], out_path: str, timeout: Optional[float] = None) -> str:
+    """Async write_fcpxml_from_canonical() on the shared converter."""
+    return await get_converter().write_fcpxml(canon, out_path, timeout=timeout)
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+batch_convert.py — Batch and watch-folder AAF → canonical JSON + FCPXML conversion
+
+Most nightly drops are re-exports of unchanged sequences: byte-different files whose
+timeline is identical. Every input is first fingerprinted structurally (see
+structural_fingerprint.py, a fraction of a build); a fingerprint the output directory's
+manifest has already converted, with the same build options, is not converted again:
+
+- unchanged: this input's outputs already hold that conversion
+- reused:    the previous outputs are copied to this input's output names
+- converted: built and written (also the first of several equal inputs in one batch)
+
+Outputs per input: <out_dir>/<name>.canonical.json and <name>.fcpxml, where <name> is
+the file's path below the directory it was found in (subdirectories are mirrored), or
+its stem for files given directly. Two inputs with the same name are refused. The
+manifest (<out_dir>/.batch_manifest.json) maps fingerprints to their outputs and caches
+each input's fingerprint by size and mtime, so a watch folder does not reopen files.
+Reuse also requires the same build_canonical.CANONICAL_VERSION: outputs of an older
+builder are converted again.
+
+Conversions are submitted longest-predicted-first (conversion_cost.py): the cost model
+predicts seconds from file size and the object/effect counts of the fingerprint pass,
+and learns from every measured conversion (<out_dir>/.batch_cost_model.json, or a
+shared --cost-model file).
+
+Usage:
+    python src/batch_convert.py drop/ -o converted/ --workers 8
+    python src/batch_convert.py drop/ -o converted/ --watch --interval 30
+    python src/batch_convert.py drop/ -o converted/ --workers 8 --cost-model ~/.aaf_cost_model.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    from .build_canonical import CANONICAL_VERSION, build_canonical_from_aaf
+    from .conversion_cost import CostModel, lpt_order, makespan
+    from .structural_fingerprint import FINGERPRINT_VERSION, fingerprint_aaf
+    from .write_fcpxml import write_fcpxml_from_canonical
+except ImportError:  # executed as a script: python src/batch_convert.py
+    from build_canonical import CANONICAL_VERSION, build_canonical_from_aaf
+    from conversion_cost import CostModel, lpt_order, makespan
+    from structural_fingerprint import FINGERPRINT_VERSION, fingerprint_aaf
+    from write_fcpxml import write_fcpxml_from_canonical
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = ".batch_manifest.json"
+MANIFEST_VERSION = 3
+COST_MODEL_NAME = ".batch_cost_model.json"
+
+# Fingerprint-pass counts kept per input for the cost model
+_COST_FEATURES = ("objects", "effects")
+
+CONVERTED = "converted"
+REUSED = "reused"
+UNCHANGED = "unchanged"
+FAILED = "failed"
+
+
+def expand_inputs(inputs: Iterable[str]) -> List[Tuple[str, str]]:
+    """(path, output name) per AAF: directories are searched for *.aaf, names keep their subdirectories."""
+    entries: List[Tuple[str, str]] = []
+    for item in inputs:
+        p = Path(item)
+        if p.is_dir():
+            for x in sorted(p.rglob("*")):
+                if x.suffix.lower() == ".aaf":
+                    entries.append((str(x), x.relative_to(p).with_suffix("").as_posix()))
+        else:
+            entries.append((str(p), p.stem))
+    return entries
+
+
+def output_paths(name: str, out_dir: str) -> Dict[str, str]:
+    """{"canonical", "fcpxml"} output paths for an output name from expand_inputs()."""
+    return {
+        "canonical": os.path.join(out_dir, f"{name}.canonical.json"),
+        "fcpxml": os.path.join(out_dir, f"{name}.fcpxml"),
+    }
+
+
+def _file_key(path: str) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+class BatchManifest:
+    """Fingerprint → outputs, and per-input fingerprint cache; one JSON file per output directory."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.outputs: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable batch manifest {path}: {e}")
+            return
+        if data.get("version") == MANIFEST_VERSION and data.get("fingerprint_version") == FINGERPRINT_VERSION:
+            self.files = data.get("files", {})
+            self.outputs = data.get("outputs", {})
+            if data.get("canonical_version") != CANONICAL_VERSION:
+                # Fingerprints still hold; outputs of another builder version are not reused
+                self.outputs = {}
+                for entry in self.files.values():
+                    entry.pop("written", None)
+
+    def cached_record(self, aaf_path: str) -> Optional[Dict[str, Any]]:
+        """{"path", "fingerprint", "size", "objects", "effects", "cached"} if the file is unchanged."""
+        entry = self.files.get(os.path.abspath(aaf_path))
+        try:
+            if entry and (entry["size"], entry["mtime_ns"]) == _file_key(aaf_path):
+                features = {name: entry.get(name, 0) for name in _COST_FEATURES}
+                return {"path": aaf_path, "fingerprint": entry["fingerprint"], "size": entry["size"], **features, "cached": True}
+        except OSError:
+            pass
+        return None
+
+    def remember_file(self, record: Dict[str, Any]) -> None:
+        size, mtime_ns = _file_key(record["path"])
+        self.files[os.path.abspath(record["path"])] = {
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "fingerprint": record["fingerprint"],
+            **{name: record.get(name, 0) for name in _COST_FEATURES},
+        }
+
+    def written_key(self, aaf_path: str) -> Optional[str]:
+        """Reuse key of the conversion last written to this input's outputs."""
+        return self.files.get(os.path.abspath(aaf_path), {}).get("written")
+
+    def mark_written(self, aaf_path: str, key: str) -> None:
+        entry = self.files.get(os.path.abspath(aaf_path))
+        if entry is not None:
+            entry["written"] = key
+
+    def save(self) -> None:
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": MANIFEST_VERSION,
+                    "fingerprint_version": FINGERPRINT_VERSION,
+                    "canonical_version": CANONICAL_VERSION,
+                    "files": self.files,
+                    "outputs": self.outputs,
+                },
+                f,
+                indent=2,
+            )
+        os.replace(tmp, self.path)
+
+
+def _fingerprint_safe(aaf_path: str) -> Dict[str, Any]:
+    try:
+        return fingerprint_aaf(aaf_path)
+    except Exception as e:
+        return {"path": str(aaf_path), "error": str(e)}
+
+
+def _convert_one(aaf_path: str, outputs: Dict[str, str], write_fcpxml: bool, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Process-pool entrypoint: build, write the canonical JSON (and FCPXML); failures are returned."""
+    started = time.perf_counter()
+    try:
+        os.makedirs(os.path.dirname(outputs["canonical"]) or ".", exist_ok=True)
+        canon = build_canonical_from_aaf(aaf_path, **options)
+        with open(outputs["canonical"], "w", encoding="utf-8") as f:
+            json.dump(canon, f, indent=2)
+        if write_fcpxml:
+            write_fcpxml_from_canonical(canon, outputs["fcpxml"])
+    except Exception as e:
+        return {"path": aaf_path, "error": str(e), "elapsed": round(time.perf_counter() - started, 4)}
+    return {"path": aaf_path, "elapsed": round(time.perf_counter() - started, 4)}
+
+
+class BatchConverter:
+    """
+    Converts AAFs into one output directory, skipping inputs whose structural
+    fingerprint was already converted there with the same options.
+
+    `build_options` are passed to build_canonical_from_aaf() (picklable values only,
+    e.g. expand_nested=False) and are part of the reuse key. `cost_model` is the path
+    of the persisted conversion-time model (default: in out_dir).
+    """
+
+    def __init__(
+        self,
+        out_dir: str,
+        workers: int = 1,
+        write_fcpxml: bool = True,
+        force: bool = False,
+        cost_model: Optional[str] = None,
+        **build_options: Any,
+    ):
+        self.out_dir = str(out_dir)
+        self.workers = max(int(workers), 1)
+        self.write_fcpxml = write_fcpxml
+        self.force = force
+        self.build_options = build_options
+        os.makedirs(self.out_dir, exist_ok=True)
+        self.manifest = BatchManifest(os.path.join(self.out_dir, MANIFEST_NAME))
+        self.cost_model = CostModel.load(cost_model or os.path.join(self.out_dir, COST_MODEL_NAME))
+        options = json.dumps({"fcpxml": write_fcpxml, **build_options}, sort_keys=True, default=str)
+        self._options_key = hashlib.blake2b(options.encode(), digest_size=8).hexdigest()
+
+    def _reuse_key(self, fingerprint: str) -> str:
+        return f"{fingerprint}:{CANONICAL_VERSION}:{self._options_key}"
+
+    def fingerprints(self, paths: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fingerprint record per path; manifest-cached ones are not reopened."""
+        records: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        for path in paths:
+            cached = self.manifest.cached_record(path)
+            if cached is not None:
+                records[path] = cached
+            else:
+                missing.append(path)
+        if self.workers > 1 and len(missing) > 1:
+            # fingerprint time follows file size: largest first, for the same reason as conversions
+            missing.sort(key=lambda p: -os.path.getsize(p))
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(missing))) as pool:
+                computed = list(pool.map(_fingerprint_safe, missing))
+        else:
+            computed = [_fingerprint_safe(p) for p in missing]
+        for record in computed:
+            records[record["path"]] = record
+            if "error" not in record:
+                self.manifest.remember_file(record)
+        return records
+
+    def _output_names(self) -> List[str]:
+        return ["canonical", "fcpxml"] if self.write_fcpxml else ["canonical"]
+
+    def _outputs_exist(self, outputs: Dict[str, str]) -> bool:
+        return all(outputs.get(name) and os.path.exists(outputs[name]) for name in self._output_names())
+
+    def _previous_outputs(self, key: str) -> Optional[Dict[str, str]]:
+        entry = self.manifest.outputs.get(key)
+        return entry if entry is not None and self._outputs_exist(entry) else None
+
+    def _convert(self, jobs: List[Tuple[str, Dict[str, str]]], records: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Convert jobs longest-predicted-first; results in job order, timings fed to the cost model."""
+        args = [(path, outputs, self.write_fcpxml, self.build_options) for path, outputs in jobs]
+        costs = [self.cost_model.predict(records[path]) for path, _ in jobs]
+        order = lpt_order(costs)
+        workers = min(self.workers, len(args)) or 1
+        if len(args) > 1:
+            logger.info(
+                f"Converting {len(args)} inputs longest-first on {workers} workers: predicted makespan "
+                f"{makespan(costs, workers, order):.1f}s (input order {makespan(costs, workers):.1f}s)"
+            )
+        done: List[Dict[str, Any]] = [{} for _ in args]
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # the pool hands out work in submission order
+                futures = [(i, pool.submit(_convert_one, *args[i])) for i in order]
+                for i, future in futures:
+                    done[i] = future.result()
+        else:
+            for i in order:
+                done[i] = _convert_one(*args[i])
+        for (path, _), cost, result in zip(jobs, costs, done):
+            result["predicted"] = round(cost, 3)
+            if "error" not in result:
+                self.cost_model.observe(records[path], result["elapsed"])
+        if args:
+            self.cost_model.save()
+        return done
+
+    def run(self, inputs: Iterable[str]) -> List[Dict[str, Any]]:
+        """Convert files (directories are searched for *.aaf); one result dict per input, in order."""
+        return self._run(expand_inputs(str(p) for p in inputs))
+
+    def _run(self, entries: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        names: Dict[str, str] = {}
+        for path, name in dict(entries).items():
+            if name in names:
+                raise ValueError(f"{names[name]} and {path} would both be written to {name}.*; convert them separately")
+            names[name] = path
+        paths = list(names.values())
+        outputs_of = {path: output_paths(name, self.out_dir) for name, path in names.items()}
+        records = self.fingerprints(paths)
+        results: Dict[str, Dict[str, Any]] = {}
+        to_convert: Dict[str, Tuple[str, Dict[str, str]]] = {}   # reuse key → first input
+        followers: List[Tuple[str, str]] = []                     # (path, reuse key) reusing a conversion in this batch
+
+        for path in paths:
+            record = records[path]
+            outputs = outputs_of[path]
+            if "error" in record:
+                results[path] = {"path": path, "status": FAILED, "error": record["error"]}
+                continue
+            key = self._reuse_key(record["fingerprint"])
+            base = {"path": path, "fingerprint": record["fingerprint"], **outputs}
+            previous = None if self.force else self._previous_outputs(key)
+            if key in to_convert:
+                followers.append((path, key))
+                results[path] = base
+            elif previous is not None:
+                unchanged = self.manifest.written_key(path) == key and self._outputs_exist(outputs)
+                results[path] = {**base, "status": UNCHANGED if unchanged else self._reuse(previous, outputs)}
+                self.manifest.mark_written(path, key)
+            else:
+                to_convert[key] = (path, outputs)
+                results[path] = base
+
+        for (key, (path, outputs)), done in zip(to_convert.items(), self._convert(list(to_convert.values()), records)):
+            if "error" in done:
+                results[path].update(status=FAILED, error=done["error"])
+                continue
+            results[path].update(status=CONVERTED, elapsed=done["elapsed"], predicted=done["predicted"])
+            self.manifest.outputs[key] = {"source": path, **outputs}
+            self.manifest.mark_written(path, key)
+
+        for path, key in followers:
+            previous = self._previous_outputs(key)
+            if previous is None:
+                results[path].update(status=FAILED, error="conversion of an identical input failed")
+            else:
+                results[path]["status"] = self._reuse(previous, outputs_of[path])
+                self.manifest.mark_written(path, key)
+
+        self.manifest.save()
+        ordered = [results[p] for p in paths]
+        counts = {status: sum(r["status"] == status for r in ordered) for status in (CONVERTED, REUSED, UNCHANGED, FAILED)}
+        logger.info(f"Batch: {len(ordered)} inputs, " + ", ".join(f"{n} {s}" for s, n in counts.items()))
+        return ordered
+
+    def _reuse(self, previous: Dict[str, str], outputs: Dict[str, str]) -> str:
+        copied = False
+        for name in self._output_names():
+            if os.path.abspath(previous[name]) != os.path.abspath(outputs[name]):
+                os.makedirs(os.path.dirname(outputs[name]) or ".", exist_ok=True)
+                shutil.copyfile(previous[name], outputs[name])
+                copied = True
+        return REUSED if copied else UNCHANGED
+
+    def watch(
+        self,
+        folder: str,
+        interval: float = 10.0,
+        max_polls: Optional[int] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Poll `folder` for new or changed AAFs and yield each batch's results.
+
+        A file is picked up once its size and mtime are equal on two consecutive polls
+        (the export has finished writing).
+        """
+        seen: Dict[str, Tuple[int, int]] = {}
+        pending: Dict[str, Tuple[int, int]] = {}
+        polls = 0
+        while max_polls is None or polls < max_polls:
+            polls += 1
+            ready = []
+            for path, name in expand_inputs([folder]):
+                try:
+                    key = _file_key(path)
+                except OSError:
+                    continue
+                if seen.get(path) == key:
+                    continue
+                if pending.get(path) == key:
+                    ready.append((path, name))
+                    seen[path] = key
+                    pending.pop(path)
+                else:
+                    pending[path] = key
+            if ready:
+                yield self._run(ready)
+            if max_polls is None or polls < max_polls:
+                sleep(interval)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Batch AAF → canonical JSON + FCPXML, skipping unchanged re-exports")
+    parser.add_argument("paths", nargs="+", help="AAF files or directories (searched for *.aaf); one folder with --watch")
+    parser.add_argument("-o", "--out-dir", required=True, help="Output directory (holds the batch manifest)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (default: 1)")
+    parser.add_argument("--no-fcpxml", action="store_true", help="Only write canonical JSON")
+    parser.add_argument("--force", action="store_true", help="Convert even when a fingerprint was converted before")
+    parser.add_argument("--cost-model", help=f"Persisted conversion-time model (default: <out-dir>/{COST_MODEL_NAME})")
+    parser.add_argument("--watch", action="store_true", help="Keep polling the folder for new or changed AAFs")
+    parser.add_argument("--interval", type=float, default=10.0, help="Seconds between --watch polls (default: 10)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON lines")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    converter = BatchConverter(
+        args.out_dir,
+        workers=args.workers,
+        write_fcpxml=not args.no_fcpxml,
+        force=args.force,
+        cost_model=args.cost_model,
+    )
+    try:
+        batches = converter.watch(args.paths[0], args.interval) if args.watch else iter([converter.run(args.paths)])
+    except ValueError as e:
+        parser.error(str(e))
+    failed = False
+    try:
+        for results in batches:
+            for r in results:
+                failed = failed or r["status"] == FAILED
+                if args.json:
+                    print(json.dumps(r))
+                else:
+                    print(f"{r['status']:<10} {r['path']}" + (f"  {r['error']}" if "error" in r else ""))
+    except KeyboardInterrupt:
+        pass
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -26,8 +26,13 @@ import argparse
 import json
 import logging
 import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Set
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Set, Union
 
 # External dependency (pyaaf2)
 try:
@@ -37,14 +42,80 @@ except ImportError:
     aaf2 = None
     HAS_AAF2 = False
 
+try:
+    from .aaf_snapshot import SnapshotObject, is_snapshot, open_snapshot
+    from .build_progress import (
+        ProgressCallback,
+        ProgressReporter,
+        estimate_work,
+        json_lines_printer,
+        progress_bar_printer,
+    )
+    from .canonical_tables import collapse_canonical
+    from .event_model import NO_PARAMETERS, Effect, Event, FrozenParameters, Source, SourceRange, events_to_canonical
+    from .keyframe_bake import KeyframeBake
+    from .metadata_reader import ReadAccounting, open_metadata_only
+    from .offset_index import SequenceOffsetIndex, offset_index_for, sidecar_path
+    from .retime_curves import RETIME_PARAMETERS, SPEED_PERCENT_PARAMETERS, Curve, Retime, interpolation_kind
+    from .string_pool import StringPool
+    from .traversal_budget import BudgetExceeded, BudgetGuard, CancellationToken, TraversalBudget
+    from .traversal_trace import TraversalTracer
+except ImportError:  # executed as a script: python src/build_canonical.py
+    from aaf_snapshot import SnapshotObject, is_snapshot, open_snapshot
+    from build_progress import (
+        ProgressCallback,
+        ProgressReporter,
+        estimate_work,
+        json_lines_printer,
+        progress_bar_printer,
+    )
+    from canonical_tables import collapse_canonical
+    from event_model import NO_PARAMETERS, Effect, Event, FrozenParameters, Source, SourceRange, events_to_canonical
+    from keyframe_bake import KeyframeBake
+    from metadata_reader import ReadAccounting, open_metadata_only
+    from offset_index import SequenceOffsetIndex, offset_index_for, sidecar_path
+    from retime_curves import RETIME_PARAMETERS, SPEED_PERCENT_PARAMETERS, Curve, Retime, interpolation_kind
+    from string_pool import StringPool
+    from traversal_budget import BudgetExceeded, BudgetGuard, CancellationToken, TraversalBudget
+    from traversal_trace import TraversalTracer
+
 # Setup logging for debugging AAF traversal
 logger = logging.getLogger(__name__)
 
+
+@dataclass(frozen=True)
+class _BuildContext:
+    """Per-build state, installed by _build_state() for the current thread/task only."""
+
+    # Active tracer; None keeps tracing to a single check per node
+    tracer: Optional[TraversalTracer] = None
+    # Active budget guard; None when no budget or cancellation token is set
+    budget: Optional[BudgetGuard] = None
+    # String pool; None (outside a build) leaves strings as-is
+    strings: Optional[StringPool] = None
+    # Hash-consed OperationGroup parameter sets; None disables sharing
+    param_sets: Optional[ParameterSetCache] = None
+    # Keyframe bake policy; None leaves keyframes as extracted
+    bake: Optional[KeyframeBake] = None
+
+
+# A ContextVar, not module globals: concurrent builds in threads (e.g. sharing an
+# AAFHandlePool) each see their own state
+_build: ContextVar[_BuildContext] = ContextVar("build_canonical_state", default=_BuildContext())
+
+# Maximum CompositionMob nesting depth flattened before falling back to a plain clip event
+NESTED_MAX_DEPTH = 8
+
+# Bump whenever the same AAF and options produce different canonical output (batch_convert
+# only reuses conversions made with the same version). 2: keyframed (VaryingValue)
+# FCPXML-relevant parameters appear in effect_params as {"type": "animated", ...}
+CANONICAL_VERSION = 2
+
 import aaf2
 
 def _debug_assert_real_sourceclip(sc):
-    ok = isinstance(sc, aaf2.components.SourceClip)
     tname = type(sc).__name__
+    ok = isinstance(sc, aaf2.components.SourceClip) or (isinstance(sc, SnapshotObject) and tname == "SourceClip")
     if not ok:
         raise TypeError(f"_find_nested_source_clip_deep returned {tname}, not a pyaaf2 SourceClip")
     return ok
@@ -86,8 +157,10 @@ def extract_keyframe_timing_data(param):
     if not isinstance(n, int) or n <= 1:
         return None
 
+    budget = _build.get().budget
+    n_read = budget.control_points(n) if budget is not None else n
     kfs = []
-    for i in range(n):
+    for i in range(n_read):
         try:
             cp = plist.get(i)
         except Exception:
@@ -98,7 +171,8 @@ def extract_keyframe_timing_data(param):
         # 1) Try labeled props
         try:
             for pr in cp.properties():
-                nm = getattr(getattr(pr, "propertydef", None), "name", getattr(pr, "name", None))
+                # pyaaf2's propertydef.name is the PropertyDefinition class name; pr.name is "Time"/"Value"
+                nm = getattr(pr, "name", None) or getattr(getattr(pr, "propertydef", None), "name", None)
                 val = getattr(pr, "value", None)
                 if nm == "Time":
                     t_raw = val; t = _r2f(val)
@@ -137,7 +211,11 @@ def extract_keyframe_timing_data(param):
                 if v is None and nums:
                     v = nums[0]
 
-        kfs.append({"normalized_time": t, "value": v, "_time_raw": t_raw, "_value_raw": v_raw})
+        try:
+            tangents = cp.tangents  # Bezier handles (PP_IN/OUT_TANGENT_* point properties)
+        except Exception:
+            tangents = None
+        kfs.append({"normalized_time": t, "value": v, "_time_raw": t_raw, "_value_raw": v_raw, "_tangents": tangents})
 
     # Sort if we have times
     try:
@@ -146,7 +224,10 @@ def extract_keyframe_timing_data(param):
     except Exception:
         pass
 
-    return {"type": "animated", "point_count": n, "keyframes": kfs}
+    result = {"type": "animated", "point_count": n, "keyframes": kfs}
+    if n_read < n:
+        result["truncated"] = True
+    return result
 def convert_normalized_time_to_fcpxml_seconds(normalized_time, segment_length_edit_units, track_edit_rate):
     """
     Convert AAF normalized keyframe time to FCPXML rational seconds.
@@ -171,13 +252,140 @@ def convert_normalized_time_to_fcpxml_seconds(normalized_time, segment_length_ed
         return 0.0
 
 
-def extract_fcpxml_relevant_parameters(operation_group):
+class ParameterSetCache:
+    """
+    Hash-consing of decoded OperationGroup parameter sets for one build.
+
+    OperationGroups whose raw static parameter values are identical (default Submaster
+    levels, one Resize across a scene) are decoded once; later matches share the same
+    read-only mapping. Groups with animated parameters are always decoded.
+    """
+
+    def __init__(self):
+        self.sets: Dict[Tuple[Any, ...], Any] = {}
+        self.hits = 0
+        self.misses = 0
+        self.uncacheable = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"unique": len(self.sets), "hits": self.hits, "misses": self.misses, "uncacheable": self.uncacheable}
+
+
+def _operation_parameter_name(param):
+    return getattr(getattr(param, 'parameterdef', None), 'name', None) or getattr(param, 'name', 'Unknown')
+
+
+# Still/matte file extensions recognised in byte-array parameters (external refs)
+_EXTERNAL_REF_EXTENSIONS = (".jpg", ".jpeg", ".png", ".tif", ".tiff", ".psd", ".bmp", ".tga", ".pict", ".pct")
+
+
+class _ParameterScan:
+    """Everything the decoders need from one enumeration of an OperationGroup's parameters."""
+
+    __slots__ = ("names", "prefixes", "effect_id", "fingerprint", "relevant", "external_refs", "retime")
+
+    def __init__(self):
+        self.names: List[str] = []
+        self.prefixes: Set[str] = set()
+        self.effect_id: Optional[str] = None
+        # Structural key of the raw static values; None when a parameter is animated
+        # (keyframe output depends on the group's length and budget)
+        self.fingerprint: Optional[Tuple[Any, ...]] = None
+        self.relevant: List[Tuple[str, Any]] = []
+        self.external_refs: List[Dict[str, str]] = []
+        # Retime parameters by name, animated ones included (VaryingValue has no .value)
+        self.retime: Dict[str, Any] = {}
+
+
+def _external_ref(name: str, value) -> Optional[Dict[str, str]]:
+    """{"kind", "path"} for a still/matte path stored as a UTF-16LE byte array."""
+    if not isinstance(value, (list, tuple)) or len(value) < 8 or not all(isinstance(b, int) for b in value):
+        return None
+    try:
+        text = bytes(b & 0xFF for b in value).decode("utf-16le", errors="ignore").replace("\x00", "").strip()
+    except Exception:
+        return None
+    if not text.lower().endswith(_EXTERNAL_REF_EXTENSIONS):
+        return None
+    kind = "matte" if "matte" in name.lower() else "image"
+    return {"kind": kind, "path": text}
+
+
+def _scan_parameters(operation_group) -> _ParameterScan:
+    """Single pass over operation_group.parameters (names, effect id, cache key, relevant set, refs)."""
+    scan = _ParameterScan()
+    key: Optional[List[Any]] = []
+    for param in list(operation_group.parameters):
+        if not hasattr(param, 'name'):
+            continue
+        name = str(_operation_parameter_name(param))
+        if name in RETIME_PARAMETERS:
+            scan.retime[name] = param
+        if not hasattr(param, 'value'):
+            # VaryingValue: keyframed, so never part of a shareable static set
+            if param.get("PointList") is not None and _is_fcpxml_relevant_parameter(name):
+                scan.relevant.append((name, param))
+                key = None
+            continue
+        value = param.value
+        scan.names.append(name)
+
+        if name == 'AvidEffectID' and isinstance(value, (list, tuple)):
+            scan.effect_id = decode_avid_effect_id(value)
+        if '_' in name:
+            scan.prefixes.add(name.split('_')[0])
+
+        if key is not None:
+            if param.get("PointList") is not None:
+                key = None
+            else:
+                try:
+                    hash(value)
+                    raw = value
+                except TypeError:
+                    raw = repr(value)
+                key.append((name, type(raw).__name__, raw))
+
+        if _is_fcpxml_relevant_parameter(name):
+            scan.relevant.append((name, param))
+        ref = _external_ref(name, value)
+        if ref is not None:
+            scan.external_refs.append(ref)
+
+    scan.fingerprint = tuple(key) if key is not None else None
+    return scan
+
+
+def extract_fcpxml_relevant_parameters(operation_group, scan: Optional[_ParameterScan] = None):
     """
     Extract parameters that are relevant for FCPXML/Resolve conversion with proper keyframe timing.
     Focus on AFX/DVE parameters that have meaningful values.
+
+    During a build, identical static parameter sets are hash-consed (see ParameterSetCache):
+    the returned mapping may be shared with other events and is read-only. Pass the
+    group's _scan_parameters() result to avoid enumerating its parameters again.
     """
     if not hasattr(operation_group, 'parameters'):
         return {}
+
+    try:
+        if scan is None:
+            scan = _scan_parameters(operation_group)
+    except Exception as e:
+        return {"extraction_error": str(e)}
+
+    state = _build.get()
+    cache = state.param_sets
+    key = None
+    if cache is not None:
+        key = scan.fingerprint
+        if key is None:
+            cache.uncacheable += 1
+        else:
+            shared = cache.sets.get(key)
+            if shared is not None:
+                cache.hits += 1
+                return shared
     
     # Get segment length for keyframe timing conversion
     segment_length = int(getattr(operation_group, "length", 0))
@@ -185,21 +393,26 @@ def extract_fcpxml_relevant_parameters(operation_group):
     try:
         extracted_params = {}
         
-        for param in operation_group.parameters:
-            if not (hasattr(param, 'name') and hasattr(param, 'value')):
-                continue
-                
-            param_name = str((getattr(getattr(param,'parameterdef',None),'name',None) or getattr(param,'name','Unknown')))
-            
-            # Only extract parameters that matter for FCPXML conversion
-            if not _is_fcpxml_relevant_parameter(param_name):
-                continue
+        # Only parameters that matter for FCPXML conversion (see _is_fcpxml_relevant_parameter)
+        for name, param in scan.relevant:
+            param_name = _intern(name)
                 
             # Extract the value with proper keyframe timing (25.0 fps default)
-            param_data = _extract_parameter_value(param, segment_length, 25.0)
+            trace = state.tracer
+            if trace is not None:
+                trace.begin(param_name, "parameter")
+            try:
+                param_data = _extract_parameter_value(param, segment_length, 25.0)
+            finally:
+                if trace is not None:
+                    trace.end(param_name, "parameter")
             if param_data is not None:
                 extracted_params[param_name] = param_data
-        
+
+        if key is not None:
+            shared = cache.sets[key] = FrozenParameters(extracted_params)
+            cache.misses += 1
+            return shared
         return extracted_params
     
     except Exception as e:
@@ -237,6 +450,34 @@ def _is_fcpxml_relevant_parameter(param_name):
     return False
 
 
+def _bake_keyframes(param, keyframe_data, animated, length, track_edit_rate):
+    """Apply the build's KeyframeBake to one animated parameter (see src/keyframe_bake.py)."""
+    bake = _build.get().bake
+    length = int(length or 0)
+    try:
+        curve = _keyframe_curve(param, keyframe_data, length)
+        baked = bake.bake(str(_operation_parameter_name(param)), curve, length) if curve is not None else None
+    except Exception as e:
+        logger.debug(f"Keyframe bake failed for {_operation_parameter_name(param)}: {e}")
+        return animated
+    if baked is None:
+        return animated
+    frames, values = baked
+    keyframes = []
+    for frame, value in zip(frames, values):
+        normalized = frame / length
+        keyframes.append({
+            "time_seconds": convert_normalized_time_to_fcpxml_seconds(normalized, length, track_edit_rate),
+            "normalized_time": normalized,
+            "value": value,
+        })
+    return {
+        "type": "animated",
+        "keyframes": keyframes,
+        "baked": {"interpolation": curve.kind, "keyframes": len(curve.times), "step": bake.step},
+    }
+
+
 def _extract_parameter_value(param, segment_length_edit_units=None, track_edit_rate=25.0):
     """
     Extract parameter value, handling both animated and static cases with proper keyframe timing.
@@ -269,11 +510,17 @@ def _extract_parameter_value(param, segment_length_edit_units=None, track_edit_r
                 "value": kf["value"]
             })
         
-        return {
+        animated = {
             "type": "animated",
             "keyframes": converted_keyframes
         }
+        if _build.get().bake is not None:
+            animated = _bake_keyframes(param, keyframe_data, animated, segment_length_edit_units, track_edit_rate)
+        return animated
     
+    if not hasattr(param, 'value'):
+        return None
+
     # Static value - use existing logic
     clean_value = _clean_parameter_value(param.value)
     if clean_value is not None:
@@ -312,28 +559,17 @@ def _clean_parameter_value(raw_value):
     return str(raw_value)
 
 
-def extract_effect_name_from_operation_group(op_group):
+def extract_effect_name_from_operation_group(op_group, scan: Optional[_ParameterScan] = None):
     """Extract effect name from OperationGroup parameters"""
     if not hasattr(op_group, 'parameters'):
         return 'Unknown Effect'
     
     try:
-        params = list(op_group.parameters)
-        effect_id = None
-        param_prefixes = set()
-        param_names = []
-        
-        for param in params:
-            if hasattr(param, 'name') and hasattr(param, 'value'):
-                name = str((getattr(getattr(param,'parameterdef',None),'name',None) or getattr(param,'name','Unknown')))
-                param_names.append(name)
-                
-                if name == 'AvidEffectID' and isinstance(param.value, (list, tuple)):
-                    effect_id = decode_avid_effect_id(param.value)
-                
-                if '_' in name:
-                    prefix = name.split('_')[0]
-                    param_prefixes.add(prefix)
+        if scan is None:
+            scan = _scan_parameters(op_group)
+        effect_id = scan.effect_id
+        param_prefixes = scan.prefixes
+        param_names = scan.names
         
         # Special case for Pan & Zoom
         if effect_id == 'EFF2_PAN_SCAN':
@@ -363,6 +599,111 @@ def extract_effect_name_from_operation_group(op_group):
         return 'Unknown Effect'
 
 
+def _keyframe_curve(param, keyframe_data, length: int, scale: float = 1.0) -> Optional[Curve]:
+    """Curve over group frames 0..length from extract_keyframe_timing_data() output."""
+    kfs = [k for k in keyframe_data["keyframes"] if k["normalized_time"] is not None and k["value"] is not None]
+    if not kfs:
+        return None
+    handles = None
+    if all(k.get("_tangents") for k in kfs):
+        # Handle offsets are in normalized time like the keyframes
+        handles = [[(dt * length, dv * scale) for dt, dv in k["_tangents"]] for k in kfs]
+    return Curve(
+        [k["normalized_time"] * length for k in kfs], [k["value"] * scale for k in kfs],
+        interpolation_kind(getattr(param, "interpolation", None)), handles,
+    )
+
+
+def _retime_from_scan(scan: _ParameterScan, length: int) -> Optional[Retime]:
+    """
+    Retime of a Motion Effect / Timewarp group from its scanned retime parameters.
+
+    A position graph wins over a speed graph, which wins over a constant ratio.
+    Keyframe times are normalized over the group, so curves are built in group frames.
+    """
+    for name in RETIME_PARAMETERS:
+        param = scan.retime.get(name)
+        if param is None:
+            continue
+        kind = RETIME_PARAMETERS[name]
+        scale = 0.01 if name in SPEED_PERCENT_PARAMETERS else 1.0
+        try:
+            animated = extract_keyframe_timing_data(param) if param.get("PointList") is not None else None
+            if animated:
+                curve = _keyframe_curve(param, animated, length, scale)
+                if curve is None:
+                    continue
+                return Retime.position(curve) if kind == "position" else Retime.speed(curve)
+            value = _r2f(getattr(param, "value", None))
+            if value is None:
+                continue
+            if kind == "position":
+                return Retime.position(Curve([0.0], [value]))
+            return Retime.constant(value * scale)
+        except Exception as e:
+            logger.debug(f"Error decoding retime parameter {name}: {e}")
+    return None
+
+
+class DecodedOperationGroup:
+    """Result of decode_operation_group(): everything the builder reads from one group."""
+
+    __slots__ = ("effect_name", "parameters", "external_refs", "input_clip", "retime")
+
+    def __init__(self, effect_name: str, parameters, external_refs: List[Dict[str, str]], input_clip, retime: Optional[Retime] = None):
+        self.effect_name = effect_name
+        self.parameters = parameters
+        self.external_refs = external_refs
+        self.input_clip = input_clip
+        self.retime = retime
+
+    @property
+    def on_filler(self) -> bool:
+        """No SourceClip among the inputs: the effect sits on filler."""
+        return self.input_clip is None
+
+    @property
+    def keyframe_tracks(self) -> Dict[str, Any]:
+        """Animated entries of parameters, by parameter name."""
+        return {
+            name: data for name, data in self.parameters.items()
+            if isinstance(data, dict) and data.get("type") == "animated"
+        }
+
+
+def decode_operation_group(operation_group) -> DecodedOperationGroup:
+    """
+    Fused decoder: one enumeration of the group's parameters yields the effect name,
+    the decoded (static + keyframed) parameters and external refs; one walk of its
+    inputs yields the nested SourceClip (None for effects on filler). Motion Effect /
+    Timewarp groups also get their Retime (None otherwise).
+    """
+    try:
+        scan = _scan_parameters(operation_group) if hasattr(operation_group, 'parameters') else None
+    except Exception as e:
+        logger.debug(f'Error scanning parameters: {e}')
+        scan = None
+    if scan is None:
+        effect_name = 'Unknown Effect'
+        parameters = extract_fcpxml_relevant_parameters(operation_group)
+        external_refs: List[Dict[str, str]] = []
+        retime = None
+    else:
+        effect_name = extract_effect_name_from_operation_group(operation_group, scan)
+        parameters = extract_fcpxml_relevant_parameters(operation_group, scan)
+        external_refs = scan.external_refs
+        retime = _retime_from_scan(scan, int(getattr(operation_group, "length", 0) or 0)) if scan.retime else None
+    return DecodedOperationGroup(effect_name, parameters, external_refs, _find_nested_source_clip_deep(operation_group), retime)
+
+
+def _intern(value):
+    """Share one instance of repeated names, UMIDs and paths across the current build."""
+    pool = _build.get().strings
+    if pool is None:
+        return value if value is None or type(value) is str else str(value)
+    return pool.intern(value)
+
+
 def _iter_safe(aaf_obj):
     """Safely iterate over AAF objects that may be properties or None."""
     if aaf_obj is None:
@@ -375,7 +716,24 @@ def _iter_safe(aaf_obj):
         return [aaf_obj]
 
 
-def build_canonical_from_aaf(aaf_path: str) -> Dict[str, Any]:
+def build_canonical_from_aaf(
+    aaf_path: str,
+    expand_nested: bool = True,
+    nested_max_depth: int = NESTED_MAX_DEPTH,
+    tracer: Optional[TraversalTracer] = None,
+    budget: Optional[TraversalBudget] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    progress: Optional[ProgressCallback] = None,
+    progress_interval: float = 0.5,
+    string_pool: Optional[StringPool] = None,
+    share_parameter_sets: bool = True,
+    time_range: Optional[Union[str, Tuple[int, int]]] = None,
+    rebase_range: bool = False,
+    offset_sidecar: Optional[str] = None,
+    handle_pool=None,
+    read_accounting: Optional[ReadAccounting] = None,
+    keyframe_bake: Optional[KeyframeBake] = None,
+) -> Dict[str, Any]:
     """
     Open an AAF and return the canonical JSON dict per docs/data_model_json.md.
 
@@ -383,9 +741,38 @@ def build_canonical_from_aaf(aaf_path: str) -> Dict[str, Any]:
     - Walk mob chains to find true sources
     - Combine OperationGroups with resolved source info
     - Emit Media+Effect events
+    - Flatten SourceClips that reference nested CompositionMobs (memoized per mob/slot)
 
     Args:
         aaf_path: Path to AAF file
+        expand_nested: Flatten nested CompositionMobs into the parent timeline
+        nested_max_depth: Maximum nesting depth before falling back to a plain clip event
+        tracer: Optional TraversalTracer recording node-level enter/exit events
+        budget: Optional TraversalBudget (nodes, chain depth, control points, seconds)
+        cancel_token: Optional CancellationToken the caller can trigger mid-build
+        progress: Optional callback receiving progress dicts (see src/build_progress.py)
+        progress_interval: Minimum seconds between intermediate progress callbacks
+        string_pool: Optional StringPool to intern into (a fresh pool per build by default;
+            pass one in to read its stats() afterwards)
+        share_parameter_sets: Decode identical static OperationGroup parameter sets once
+            and share the result (see ParameterSetCache)
+        time_range: Only emit events intersecting this window, clipped to it: a
+            (start, end) frame tuple or "START-END" string of frames (timeline-relative)
+            or timecodes (absolute, e.g. "10:00:30:00-10:01:00:00")
+        rebase_range: Shift the clipped events so the window starts at frame 0
+        offset_sidecar: JSON sidecar caching the component offset index used to seek to
+            the window (see src/offset_index.py); the index is always cached in memory
+        handle_pool: Optional AAFHandlePool (src/aaf_pool.py) to reuse an already open
+            file and its mob map instead of opening the AAF for this build
+        read_accounting: Optional ReadAccounting (src/metadata_reader.py): open the AAF
+            metadata-only, counting bytes read per compound-file stream and refusing or
+            skipping essence streams; its report() is logged at the end of the build
+        keyframe_bake: Optional KeyframeBake (src/keyframe_bake.py): sample keyframed
+            parameters with interpolations Resolve cannot represent onto the frame grid;
+            its report() (samples added) is logged at the end of the build
+
+    When a budget trips or the token is cancelled, the events emitted so far are
+    returned and a top-level "diagnostics" list describes what was exceeded.
 
     Returns:
         Canonical JSON dict matching docs/data_model_json.md schema
@@ -396,44 +783,423 @@ def build_canonical_from_aaf(aaf_path: str) -> Dict[str, Any]:
     if not Path(aaf_path).exists():
         raise FileNotFoundError(f"AAF file not found: {aaf_path}")
 
+    if handle_pool is not None and read_accounting is not None:
+        raise ValueError("read_accounting cannot be combined with handle_pool (pooled files are already open)")
+
     logger.info(f"Opening AAF: {aaf_path}")
 
+    guard = BudgetGuard(budget, cancel_token) if (budget or cancel_token) else None
+    strings = string_pool if string_pool is not None else StringPool()
+    param_sets = ParameterSetCache() if share_parameter_sets else None
     try:
-        with aaf2.open(aaf_path, "r") as f:
+        with _build_state(tracer, guard, strings, param_sets, keyframe_bake), _open_aaf(aaf_path, handle_pool, read_accounting) as (f, mob_map):
             # Step 1: Select top-level composition and extract timeline metadata
             comp, fps, is_drop, start_tc_string, timeline_name = select_top_sequence(f)
             logger.info(f"Selected timeline: {timeline_name} @ {fps}fps {'DF' if is_drop else 'NDF'}")
 
-            # Step 2: Build mob lookup map for UMID resolution
-            mob_map = build_mob_map(f)
+            # Step 2: Build mob lookup map for UMID resolution (kept with pooled handles)
+            mob_map = mob_map if mob_map is not None else build_mob_map(f)
             logger.info(f"Built mob map with {len(mob_map)} entries")
 
-            # Step 3: Extract events using proper source resolution with deduplication
-            clips, processed_operations = extract_events_with_source_resolution(comp, mob_map, fps)
-            logger.info(f"Extracted {len(clips)} clips, processed {len(processed_operations)} operations")
-
-            # Step 4: Pack canonical structure  
-            return {
-                "timeline": {
-                    "name": timeline_name,
-                    "rate": int(fps),
-                    "start": start_tc_string,
-                    "tracks": [
-                        {
-                            "clips": clips
-                        }
-                    ]
+            # Optional time window: seek via the component offset index
+            window = index = None
+            if time_range is not None:
+                window = parse_time_range(time_range, fps, start_tc_string)
+                picture_slot = _find_picture_slot(comp)
+                if picture_slot is not None:
+                    index = offset_index_for(aaf_path, comp, picture_slot, sidecar=offset_sidecar)
+                logger.info(f"Extracting frames {window[0]}-{window[1]}")
+
+            # Steps 3-4: Extract events and pack canonical structure
+            nested = NestedCompositionCache(nested_max_depth) if expand_nested else None
+            reporter = ProgressReporter(progress, progress_interval) if progress else None
+            canon = _build_timeline_canon(
+                comp, mob_map, fps, start_tc_string, timeline_name, nested, reporter, guard,
+                window=window, offset_index=index, rebase_range=rebase_range,
+            )
+            _log_build_caches(strings, param_sets)
+        if read_accounting is not None:
+            logger.info(read_accounting.report())
+        if keyframe_bake is not None:
+            logger.info(keyframe_bake.report())
+        return canon
+
+    except Exception as e:
+        logger.error(f"Failed to parse AAF {aaf_path}: {e}")
+        raise ValueError(f"AAF parsing failed: {e}") from e
+
+
+def build_canonical_for_compositions(
+    aaf_path: str,
+    select: Optional[str] = None,
+    workers: int = 1,
+    expand_nested: bool = True,
+    nested_max_depth: int = NESTED_MAX_DEPTH,
+    tracer: Optional[TraversalTracer] = None,
+    budget: Optional[TraversalBudget] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    string_pool: Optional[StringPool] = None,
+    share_parameter_sets: bool = True,
+) -> List[Dict[str, Any]]:
+    """
+    Build one canonical dict per CompositionMob (bin exports with many sequences).
+
+    The AAF is opened once and the mob map, nested-composition cache, string pool and
+    parameter-set cache are built once and shared by every composition, instead of
+    paying open + index per sequence via build_canonical_from_aaf().
+
+    Args:
+        aaf_path: Path to AAF file
+        select: Optional regex; only compositions whose name matches (re.search) are built
+        workers: Split the matching compositions across this many worker processes; each
+            worker opens and indexes the file once for its share
+        budget / cancel_token: Applied to each composition separately; with workers > 1
+            the token must wrap a process-shared event (multiprocessing.Manager().Event())
+        (remaining args as for build_canonical_from_aaf)
+
+    Compositions without a picture Sequence are skipped. Returns canonical dicts in
+    file order.
+    """
+    if not HAS_AAF2:
+        raise ImportError("aaf2 is required. Install with: pip install pyaaf2")
+
+    if not Path(aaf_path).exists():
+        raise FileNotFoundError(f"AAF file not found: {aaf_path}")
+
+    options = {
+        "expand_nested": expand_nested,
+        "nested_max_depth": nested_max_depth,
+        "budget": budget,
+        "cancel_token": cancel_token,
+        "share_parameter_sets": share_parameter_sets,
+    }
+    if workers > 1:
+        if tracer is not None:
+            raise ValueError("tracer is not supported with workers > 1")
+        if cancel_token is not None and not cancel_token.process_shareable:
+            raise ValueError(
+                "cancel_token with workers > 1 needs a process-shared event, "
+                "e.g. CancellationToken(multiprocessing.Manager().Event())"
+            )
+        # Only the composition list is read here; each worker indexes the file itself
+        with aaf2.open(aaf_path, "r") as f:
+            indices = _select_composition_indices(list_composition_mobs(f), select)
+        chunks = [indices[w::workers] for w in range(workers) if indices[w::workers]]
+        with ProcessPoolExecutor(max_workers=max(len(chunks), 1)) as pool:
+            results = pool.map(
+                _build_compositions_worker, [aaf_path] * len(chunks), chunks, [options] * len(chunks)
+            )
+            return [canon for _, canon in sorted((r for chunk in results for r in chunk), key=lambda r: r[0])]
+
+    built = _build_compositions(aaf_path, select=select, tracer=tracer, string_pool=string_pool, **options)
+    return [canon for _, canon in built]
+
+
+def _build_compositions_worker(aaf_path: str, indices: List[int], options: Dict[str, Any]) -> List[Tuple[int, Dict[str, Any]]]:
+    """Process-pool entrypoint for build_canonical_for_compositions(workers > 1)."""
+    return _build_compositions(aaf_path, indices=indices, **options)
+
+
+def _build_compositions(
+    aaf_path: str,
+    indices: Optional[List[int]] = None,
+    select: Optional[str] = None,
+    expand_nested: bool = True,
+    nested_max_depth: int = NESTED_MAX_DEPTH,
+    tracer: Optional[TraversalTracer] = None,
+    budget: Optional[TraversalBudget] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    string_pool: Optional[StringPool] = None,
+    share_parameter_sets: bool = True,
+) -> List[Tuple[int, Dict[str, Any]]]:
+    """Build the compositions at `indices` (of list_composition_mobs), or matching `select`, in one open."""
+    strings = string_pool if string_pool is not None else StringPool()
+    param_sets = ParameterSetCache() if share_parameter_sets else None
+    results = []
+    try:
+        with _build_state(tracer, None, strings, param_sets), aaf2.open(aaf_path, "r") as f:
+            comp_mobs = list_composition_mobs(f)
+            if indices is None:
+                indices = _select_composition_indices(comp_mobs, select)
+            mob_map = build_mob_map(f)
+            logger.info(f"Built mob map with {len(mob_map)} entries for {len(indices)} compositions")
+            nested = NestedCompositionCache(nested_max_depth) if expand_nested else None
+
+            for index in indices:
+                comp = comp_mobs[index]
+                try:
+                    fps, is_drop, start_tc_string, timeline_name = composition_timeline_metadata(comp)
+                except ValueError as e:
+                    logger.warning(f"Skipping composition: {e}")
+                    continue
+                logger.info(f"Building timeline: {timeline_name} @ {fps}fps {'DF' if is_drop else 'NDF'}")
+                guard = BudgetGuard(budget, cancel_token) if (budget or cancel_token) else None
+                with _build_state(tracer, guard, strings, param_sets):
+                    results.append(
+                        (index, _build_timeline_canon(comp, mob_map, fps, start_tc_string, timeline_name, nested, None, guard))
+                    )
+            _log_build_caches(strings, param_sets)
+            return results
+
+    except Exception as e:
+        logger.error(f"Failed to parse AAF {aaf_path}: {e}")
+        raise ValueError(f"AAF parsing failed: {e}") from e
+
+
+@contextmanager
+def _open_aaf(aaf_path: str, handle_pool=None, read_accounting: Optional[ReadAccounting] = None):
+    """Yield (file, mob map or None): a pooled handle, or a file opened for this build only."""
+    if is_snapshot(aaf_path):
+        # Graph snapshot (src/aaf_snapshot.py): no CFB layer to pool or account for
+        with open_snapshot(aaf_path) as f:
+            yield f, None
+    elif read_accounting is not None:
+        with open_metadata_only(aaf_path, read_accounting) as f:
+            yield f, None
+    elif handle_pool is None:
+        with aaf2.open(aaf_path, "r") as f:
+            yield f, None
+    else:
+        with handle_pool.open(aaf_path) as handle:
+            yield handle.file, handle.mob_map
+
+
+@contextmanager
+def _build_state(tracer, guard, strings, param_sets, bake=None):
+    """Install the per-build state (tracer, budget, string pool, parameter sets, bake) for this context."""
+    token = _build.set(_BuildContext(tracer, guard, strings, param_sets, bake))
+    try:
+        yield
+    finally:
+        _build.reset(token)
+
+
+def _build_timeline_canon(comp, mob_map, fps, start_tc_string, timeline_name, nested, reporter, guard, window=None, offset_index=None, rebase_range=False) -> Dict[str, Any]:
+    """Extract events of one CompositionMob and pack its canonical structure."""
+    clips, processed_operations = extract_events_with_source_resolution(
+        comp, mob_map, fps, nested=nested, progress=reporter, window=window, offset_index=offset_index
+    )
+    if window is not None:
+        clips = _clip_events_to_window(clips, window, rebase_range)
+    logger.info(f"Extracted {len(clips)} clips, processed {len(processed_operations)} operations")
+    if nested is not None and (nested.hits or nested.misses):
+        logger.info(
+            f"Nested compositions: {nested.misses} expanded, {nested.hits} reused from cache"
+        )
+
+    canon = _pack_timeline_canon(timeline_name, fps, start_tc_string, events_to_canonical(clips))
+    if window is not None:
+        canon["timeline"]["range"] = {"start": window[0], "end": window[1], "rebased": rebase_range}
+    if guard is not None and guard.diagnostics:
+        canon["diagnostics"] = guard.diagnostics
+    return canon
+
+
+def _pack_timeline_canon(timeline_name, fps, start_tc_string, clips: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "timeline": {
+            "name": timeline_name,
+            "rate": int(fps),
+            "start": start_tc_string,
+            "tracks": [
+                {
+                    "clips": clips
                 }
-            }
+            ]
+        }
+    }
+
+
+def build_canonical_sharded(
+    aaf_path: str,
+    shards: Optional[int] = None,
+    expand_nested: bool = True,
+    nested_max_depth: int = NESTED_MAX_DEPTH,
+    share_parameter_sets: bool = True,
+    offset_sidecar: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    build_canonical_from_aaf() with the top picture Sequence split across worker processes.
+
+    The component offset index (src/offset_index.py) of the top Sequence is split into
+    `shards` contiguous runs of components; each worker reopens the AAF, builds its own
+    mob map and caches, and resolves only its run at the indexed offsets. Shards are
+    merged in offset order, so the result is identical to the serial build (which
+    remains the regression reference).
+
+    Budgets, tracing and progress are not available in this mode.
+
+    Args:
+        shards: Number of worker processes (default: CPU count)
+        offset_sidecar: Optional sidecar JSON for the offset index
+    """
+    if not HAS_AAF2:
+        raise ImportError("aaf2 is required. Install with: pip install pyaaf2")
+
+    if not Path(aaf_path).exists():
+        raise FileNotFoundError(f"AAF file not found: {aaf_path}")
 
+    try:
+        with aaf2.open(aaf_path, "r") as f:
+            comp_mobs = list_composition_mobs(f)
+            comp = choose_top_composition(comp_mobs)
+            comp_index = comp_mobs.index(comp)
+            fps, is_drop, start_tc_string, timeline_name = composition_timeline_metadata(comp)
+            picture_slot = _find_picture_slot(comp)
+            index = offset_index_for(aaf_path, comp, picture_slot, sidecar=offset_sidecar) if picture_slot else None
     except Exception as e:
         logger.error(f"Failed to parse AAF {aaf_path}: {e}")
         raise ValueError(f"AAF parsing failed: {e}") from e
 
+    if index is None:
+        logger.warning("No picture slot found")
+        return _pack_timeline_canon(timeline_name, fps, start_tc_string, [])
+
+    count = len(index.lengths)
+    shards = max(1, min(shards or os.cpu_count() or 1, count))
+    bounds = [(count * i // shards, count * (i + 1) // shards) for i in range(shards)]
+    logger.info(f"Sharding {count} components of {timeline_name} across {shards} workers")
 
-def select_top_sequence(aaf) -> Tuple[Any, float, bool, str, str]:
-    """Select top-level CompositionMob and extract timeline metadata."""
-    # Find CompositionMobs
+    options = {
+        "expand_nested": expand_nested,
+        "nested_max_depth": nested_max_depth,
+        "share_parameter_sets": share_parameter_sets,
+    }
+    with ProcessPoolExecutor(max_workers=shards) as pool:
+        futures = [
+            pool.submit(_build_shard_worker, aaf_path, comp_index, index.starts[lo:hi], lo, fps, options)
+            for lo, hi in bounds
+        ]
+        results = [future.result() for future in futures]
+
+    # Deterministic merge: shards are contiguous and ordered by starting offset. The
+    # serial build emits only the first OperationGroup per operation id, so a shard's
+    # output is replayed against the ids already emitted by the shards before it
+    # (only operation-definition ids; address fallbacks are local to each process).
+    clips: List[Dict[str, Any]] = []
+    seen_ops: Set[str] = set()
+    for (lo, hi), components in zip(bounds, results):
+        if any(ops & seen_ops and not is_group for is_group, ops, _ in components):
+            # A nested Sequence mixes deduplicated groups with other events: redo exactly
+            components = _build_shard_worker(aaf_path, comp_index, index.starts[lo:hi], lo, fps, options, seen_ops)
+        for is_group, ops, events in components:
+            if is_group and ops & seen_ops:
+                continue
+            seen_ops |= ops
+            clips.extend(events)
+
+    return _pack_timeline_canon(timeline_name, fps, start_tc_string, clips)
+
+
+def _build_shard_worker(
+    aaf_path: str,
+    comp_index: int,
+    starts: List[int],
+    first: int,
+    fps: float,
+    options: Dict[str, Any],
+    seen_ops: Iterable[str] = (),
+) -> List[Tuple[bool, Set[str], List[Dict[str, Any]]]]:
+    """
+    Process-pool entrypoint: resolve top-level components first..first+len(starts).
+
+    Returns one (is_operation_group, newly processed operation ids, canonical events)
+    entry per component.
+    """
+    strings = StringPool()
+    param_sets = ParameterSetCache() if options["share_parameter_sets"] else None
+    with _build_state(None, None, strings, param_sets), aaf2.open(aaf_path, "r") as f:
+        comp = list_composition_mobs(f)[comp_index]
+        components = _find_picture_slot(comp).segment.components
+        mob_map = build_mob_map(f)
+        nested = NestedCompositionCache(options["nested_max_depth"]) if options["expand_nested"] else None
+        processed_operations: Set[str] = set(seen_ops)
+        results = []
+        for i, offset in enumerate(starts, start=first):
+            component = components[i]
+            clips: List[Event] = []
+            before = set(processed_operations)
+            _process_component(component, clips, mob_map, offset, fps, processed_operations, nested)
+            results.append((
+                "OperationGroup" in type(component).__name__,
+                {op for op in processed_operations - before if _is_stable_operation_id(op)},
+                events_to_canonical(clips),
+            ))
+        return results
+
+
+def _clip_events_to_window(clips: List[Event], window: Tuple[int, int], rebase: bool) -> List[Event]:
+    """Events intersecting [start, end), clipped to it and optionally shifted to start at 0."""
+    start, end = window
+    shift = start if rebase else 0
+    clipped = []
+    for event in clips:
+        ev_in = max(event.timeline_in, start)
+        ev_out = min(event.timeline_out, end)
+        if ev_out <= ev_in:
+            continue
+        if (ev_in, ev_out) == (event.timeline_in, event.timeline_out) and not shift:
+            clipped.append(event)
+        else:
+            clipped.append(event.clipped(ev_in, ev_out, -shift))
+    return clipped
+
+
+def parse_time_range(time_range: Union[str, Tuple[int, int]], fps: float, start_tc: str = "00:00:00:00") -> Tuple[int, int]:
+    """
+    Resolve a time window to timeline-relative frames [start, end).
+
+    Strings are "START-END"; each side is a frame count relative to the timeline start
+    or an absolute timecode (HH:MM:SS:FF, ';' accepted for DF) offset by `start_tc`.
+    """
+    if isinstance(time_range, str):
+        parts = time_range.split("-")
+        if len(parts) != 2 or not all(p.strip() for p in parts):
+            raise ValueError(f"Invalid range {time_range!r}: expected START-END")
+        origin = timecode_to_frames(start_tc, fps)
+        bounds = []
+        for part in parts:
+            part = part.strip()
+            if ":" in part or ";" in part:
+                bounds.append(timecode_to_frames(part, fps) - origin)
+            else:
+                bounds.append(int(part))
+        start, end = bounds
+    else:
+        start, end = (int(v) for v in time_range)
+    if start < 0 or end <= start:
+        raise ValueError(f"Invalid range {time_range!r}: need 0 <= START < END (got {start}-{end})")
+    return start, end
+
+
+def _log_build_caches(strings: StringPool, param_sets: Optional[ParameterSetCache]) -> None:
+    logger.info(f"String pool: {strings.report()}")
+    if param_sets is not None and (param_sets.hits or param_sets.misses):
+        logger.info(
+            f"Parameter sets: {param_sets.misses} decoded, {param_sets.hits} shared, "
+            f"{param_sets.uncacheable} animated/uncacheable"
+        )
+
+
+def estimate_aaf_work(aaf_path: str) -> Dict[str, int]:
+    """
+    Cheap work estimate for scheduling: top-level component and OperationGroup counts of
+    the selected picture Sequence, without traversal or source resolution.
+    """
+    if not HAS_AAF2:
+        raise ImportError("aaf2 is required. Install with: pip install pyaaf2")
+
+    with aaf2.open(aaf_path, "r") as f:
+        comp = select_top_sequence(f)[0]
+        for slot in _iter_safe(comp.slots):
+            segment = getattr(slot, "segment", None)
+            if segment is not None and "Sequence" in str(type(segment).__name__):
+                return estimate_work(segment)
+    return estimate_work(None)
+
+
+def list_composition_mobs(aaf) -> List[Any]:
+    """All CompositionMobs of an open AAF, in file order."""
     comp_mobs = []
     try:
         for mob in aaf.content.mobs:
@@ -443,7 +1209,29 @@ def select_top_sequence(aaf) -> Tuple[Any, float, bool, str, str]:
         logger.debug(f"Error iterating mobs: {e}")
         if hasattr(aaf.content, 'compositionmobs'):
             comp_mobs = list(aaf.content.compositionmobs())
+    return comp_mobs
+
+
+def _select_composition_indices(comp_mobs: List[Any], select: Optional[str]) -> List[int]:
+    """Indices of compositions whose name matches the `select` regex (all when None)."""
+    if select is None:
+        return list(range(len(comp_mobs)))
+    pattern = re.compile(select)
+    return [
+        i for i, mob in enumerate(comp_mobs)
+        if pattern.search(str(getattr(mob, "name", None) or ""))
+    ]
+
+
+def select_top_sequence(aaf) -> Tuple[Any, float, bool, str, str]:
+    """Select top-level CompositionMob and extract timeline metadata."""
+    selected_mob = choose_top_composition(list_composition_mobs(aaf))
+    fps, is_drop, start_tc_string, timeline_name = composition_timeline_metadata(selected_mob)
+    return selected_mob, fps, is_drop, start_tc_string, timeline_name
+
 
+def choose_top_composition(comp_mobs: List[Any]) -> Any:
+    """The CompositionMob build_canonical_from_aaf() converts: *.Exported.01, else the first."""
     if not comp_mobs:
         raise ValueError("No CompositionMobs found in AAF")
 
@@ -458,7 +1246,11 @@ def select_top_sequence(aaf) -> Tuple[Any, float, bool, str, str]:
     if not selected_mob:
         selected_mob = comp_mobs[0]
         logger.warning("No .Exported.01 mob found, using first CompositionMob")
+    return selected_mob
 
+
+def composition_timeline_metadata(selected_mob) -> Tuple[float, bool, str, str]:
+    """Edit rate, drop flag, start timecode and name of a CompositionMob's picture track."""
     timeline_name = getattr(selected_mob, "name", "Unknown Timeline") or "Unknown Timeline"
 
     # Find picture slot - look for Sequence, not Timecode
@@ -491,7 +1283,7 @@ def select_top_sequence(aaf) -> Tuple[Any, float, bool, str, str]:
     if start_frames is not None:
         start_tc_string = frames_to_timecode(start_frames, fps, is_drop)
 
-    return selected_mob, fps, is_drop, start_tc_string, timeline_name
+    return fps, is_drop, start_tc_string, timeline_name
 
 
 def _find_start_timecode(segment) -> Optional[int]:
@@ -525,62 +1317,107 @@ def build_mob_map(aaf) -> Dict[str, Any]:
     for mob in _iter_safe(aaf.content.mobs):
         # Add all possible ID attributes to the map
         if hasattr(mob, "mob_id"):
-            mob_map[str(mob.mob_id)] = mob
+            mob_map[_intern(mob.mob_id)] = mob
         if hasattr(mob, "umid"):
-            mob_map[str(mob.umid)] = mob
+            mob_map[_intern(mob.umid)] = mob
         if hasattr(mob, "source_id"):
-            mob_map[str(mob.source_id)] = mob
+            mob_map[_intern(mob.source_id)] = mob
         if hasattr(mob, "package_id"):
-            mob_map[str(mob.package_id)] = mob
+            mob_map[_intern(mob.package_id)] = mob
     
     return mob_map
 
 
-def extract_events_with_source_resolution(comp_mob, mob_map: Dict[str, Any], fps: float) -> Tuple[List[Dict[str, Any]], Set[str]]:
+def _find_picture_slot(comp_mob):
+    """First slot of a CompositionMob whose segment is a Sequence."""
+    for slot in _iter_safe(comp_mob.slots):
+        if hasattr(slot, "segment") and slot.segment:
+            segment_type = str(type(slot.segment).__name__)
+            if "Sequence" in segment_type:
+                return slot
+    return None
+
+
+def extract_events_with_source_resolution(comp_mob, mob_map: Dict[str, Any], fps: float, nested: Optional[NestedCompositionCache] = None, progress: Optional[ProgressReporter] = None, window: Optional[Tuple[int, int]] = None, offset_index: Optional[SequenceOffsetIndex] = None) -> Tuple[List[Event], Set[str]]:
     """
     Extract events using proper AAF source resolution.
+
+    With a window, top-level components (and inline nested Sequences) entirely outside
+    [start, end) are skipped without descending; offset_index lets the top-level
+    Sequence seek straight to the window. Events are returned unclipped.
     
     Returns:
-        Tuple of (clips, processed_operations) where processed_operations tracks dedupe
+        Tuple of (clips, processed_operations) where clips are Event objects
+        (src/event_model.py) and processed_operations tracks dedupe
     """
     clips = []
     processed_operations = set()  # STAGE 1: Deduplication tracking
 
     # Find picture slot
-    picture_slot = None
-    slots = _iter_safe(comp_mob.slots)
-    
-    for i, slot in enumerate(slots):
-        if hasattr(slot, "segment") and slot.segment:
-            segment_type = str(type(slot.segment).__name__)
-            if "Sequence" in segment_type:
-                picture_slot = slot
-                break
+    picture_slot = _find_picture_slot(comp_mob)
 
     if not picture_slot or not hasattr(picture_slot, "segment"):
         logger.warning("No picture slot found")
         return clips, processed_operations
 
-    # Process the timeline sequence
-    _process_sequence(picture_slot.segment, clips, mob_map, 0, fps, processed_operations)
+    if progress is not None:
+        progress.start(estimate_work(picture_slot.segment))
+
+    # Process the timeline sequence; a tripped budget keeps the events emitted so far
+    end_offset = 0
+    try:
+        budget = _build.get().budget
+        if budget is not None:
+            budget.check()
+        end_offset = _process_sequence(
+            picture_slot.segment, clips, mob_map, 0, fps, processed_operations, nested, progress, window, offset_index
+        )
+    except BudgetExceeded as e:
+        logger.warning(f"Traversal stopped early, returning {len(clips)} partial events: {e}")
+    finally:
+        if progress is not None:
+            progress.finish(len(clips), end_offset or (clips[-1].timeline_out if clips else 0))
     return clips, processed_operations
 
 
-def _process_sequence(segment, clips: List[Dict[str, Any]], mob_map: Dict[str, Any], timeline_offset: int, fps: float, processed_ops: Set[str]) -> int:
-    """Process a sequence and its components."""
+def _process_sequence(segment, clips: List[Event], mob_map: Dict[str, Any], timeline_offset: int, fps: float, processed_ops: Set[str], nested: Optional[NestedCompositionCache] = None, progress: Optional[ProgressReporter] = None, window: Optional[Tuple[int, int]] = None, offset_index: Optional[SequenceOffsetIndex] = None) -> int:
+    """
+    Process a sequence and its components (progress and offset_index are only passed for
+    the top-level Sequence). Components outside `window` are skipped using their lengths.
+    """
     if not segment or not hasattr(segment, "components"):
         return timeline_offset
+
+    if window is not None and offset_index is not None:
+        # Seek: only components intersecting the window are read
+        components = segment.components
+        for i in offset_index.component_range(window[0] - timeline_offset, window[1] - timeline_offset):
+            component = components[i]
+            current_offset = timeline_offset + offset_index.starts[i]
+            current_offset = _process_component(component, clips, mob_map, current_offset, fps, processed_ops, nested, window)
+            if progress is not None:
+                progress.advance(component, len(clips), current_offset)
+        return timeline_offset + offset_index.end
     
     current_offset = timeline_offset
     components = _iter_safe(segment.components)
     
     for component in components:
-        current_offset = _process_component(component, clips, mob_map, current_offset, fps, processed_ops)
+        if window is not None:
+            if current_offset >= window[1]:
+                break
+            length = int(getattr(component, "length", 0) or 0)
+            if current_offset + length <= window[0]:
+                current_offset += length
+                continue
+        current_offset = _process_component(component, clips, mob_map, current_offset, fps, processed_ops, nested, window)
+        if progress is not None:
+            progress.advance(component, len(clips), current_offset)
     
     return current_offset
 
 
-def _process_component(segment, clips: List[Dict[str, Any]], mob_map: Dict[str, Any], timeline_offset: int, fps: float, processed_ops: Set[str]) -> int:
+def _process_component(segment, clips: List[Event], mob_map: Dict[str, Any], timeline_offset: int, fps: float, processed_ops: Set[str], nested: Optional[NestedCompositionCache] = None, window: Optional[Tuple[int, int]] = None) -> int:
     """Process a single timeline component."""
     if not segment:
         return timeline_offset
@@ -588,23 +1425,140 @@ def _process_component(segment, clips: List[Dict[str, Any]], mob_map: Dict[str,
     segment_type = str(type(segment).__name__)
     segment_length = int(getattr(segment, "length", 0))
     
-    if "OperationGroup" in segment_type:
-        # STAGE 1: Each OperationGroup should produce ONE Media+Effect event with deduplication
-        _process_operation_group(segment, clips, mob_map, timeline_offset, fps, processed_ops)
+    state = _build.get()
+    if state.budget is not None:
+        state.budget.offset = timeline_offset
+        state.budget.visit()
+    trace = state.tracer
+    if trace is not None:
+        trace.offset = timeline_offset
+        trace.begin(segment_type, "operation_group" if "OperationGroup" in segment_type else "component", length=segment_length)
+    try:
+        if "OperationGroup" in segment_type:
+            # STAGE 1: Each OperationGroup should produce ONE Media+Effect event with deduplication
+            _process_operation_group(segment, clips, mob_map, timeline_offset, fps, processed_ops)
         
-    elif "SourceClip" in segment_type:
-        # Standalone SourceClip (rare in modern AAF)
-        _process_source_clip(segment, clips, mob_map, timeline_offset, fps, effect_name="N/A")
+        elif "SourceClip" in segment_type:
+            # Nested CompositionMob reference - flatten into this timeline
+            if nested is not None and _expand_nested_composition(segment, clips, mob_map, timeline_offset, fps, nested):
+                return timeline_offset + segment_length
+            # Standalone SourceClip (rare in modern AAF)
+            _process_source_clip(segment, clips, mob_map, timeline_offset, fps, effect_name="N/A")
         
-    elif "Filler" in segment_type:
-        # Pure filler - skip
-        logger.debug(f"Skipping Filler at {timeline_offset}, length {segment_length}")
+        elif "Filler" in segment_type:
+            # Pure filler - skip
+            logger.debug("Skipping Filler at %s, length %s", timeline_offset, segment_length)
         
-    elif "Sequence" in segment_type:
-        # Nested sequence - process recursively
-        return _process_sequence(segment, clips, mob_map, timeline_offset, fps, processed_ops)
+        elif "Sequence" in segment_type:
+            # Nested sequence - process recursively
+            return _process_sequence(segment, clips, mob_map, timeline_offset, fps, processed_ops, nested, window=window)
     
-    return timeline_offset + segment_length
+        return timeline_offset + segment_length
+    finally:
+        if trace is not None:
+            trace.end(segment_type, "operation_group" if "OperationGroup" in segment_type else "component")
+
+
+class NestedCompositionCache:
+    """
+    Memoized expansion of nested CompositionMobs referenced by timeline SourceClips.
+
+    Each referenced (mob_id, slot_id) is traversed once into a list of events relative
+    to the start of the nested slot; every use copies that list, trims it to the clip's
+    [start, start + length) window and re-bases it onto the parent timeline offset.
+
+    Expansions cut short by the depth limit or a cycle depend on where they were first
+    reached, so they are not memoized.
+    """
+
+    def __init__(self, max_depth: int = NESTED_MAX_DEPTH):
+        self.max_depth = max_depth
+        self.events: Dict[Tuple[str, int], List[Event]] = {}
+        self.stack: List[Tuple[str, int]] = []  # active expansions (cycle protection)
+        self.truncations = 0  # nested references left unexpanded (cycle or depth limit)
+        self.hits = 0
+        self.misses = 0
+
+
+def _nested_composition_slot(source_clip):
+    """Return (key, slot) when a SourceClip references a CompositionMob slot, else (None, None)."""
+    try:
+        target_mob = source_clip.mob
+    except Exception:
+        return None, None
+    if target_mob is None or "CompositionMob" not in str(type(target_mob).__name__):
+        return None, None
+
+    slot_id = int(getattr(source_clip, "slot_id", 0) or 0)
+    slot = None
+    try:
+        slot = source_clip.slot
+    except Exception:
+        pass
+    if slot is None:
+        # Fall back to the nested comp's picture Sequence
+        for candidate in _iter_safe(getattr(target_mob, "slots", None)):
+            if "Sequence" in str(type(getattr(candidate, "segment", None)).__name__):
+                slot = candidate
+                break
+    if slot is None or not getattr(slot, "segment", None):
+        return None, None
+
+    return (str(target_mob.mob_id), slot_id), slot
+
+
+def _expand_nested_composition(source_clip, clips: List[Event], mob_map: Dict[str, Any], timeline_offset: int, fps: float, nested: NestedCompositionCache) -> bool:
+    """
+    Flatten a SourceClip that references a nested CompositionMob into `clips`.
+
+    Returns False (caller emits a plain clip event) when the target is not a
+    CompositionMob, is already being expanded (cycle) or exceeds the depth limit.
+    """
+    key, slot = _nested_composition_slot(source_clip)
+    if key is None:
+        return False
+
+    if key in nested.stack:
+        logger.warning(f"Circular nested composition reference: {key[0]} slot {key[1]}")
+        nested.truncations += 1
+        return False
+    if len(nested.stack) >= nested.max_depth:
+        logger.warning(f"Nested composition depth limit ({nested.max_depth}) reached at {key[0]}")
+        nested.truncations += 1
+        return False
+
+    relative = nested.events.get(key)
+    if relative is None:
+        nested.misses += 1
+        relative = []
+        truncations = nested.truncations
+        nested.stack.append(key)
+        try:
+            segment = slot.segment
+            if "Sequence" in str(type(segment).__name__):
+                _process_sequence(segment, relative, mob_map, 0, fps, set(), nested)
+            else:
+                _process_component(segment, relative, mob_map, 0, fps, set(), nested)
+        finally:
+            nested.stack.pop()
+        if nested.truncations == truncations:
+            nested.events[key] = relative
+    else:
+        nested.hits += 1
+
+    # Re-base: trim to [in-point, in-point + length) and shift onto the parent timeline
+    window_start = int(getattr(source_clip, "start", 0) or 0)
+    window_end = window_start + int(getattr(source_clip, "length", 0) or 0)
+    shift = timeline_offset - window_start
+    for event in relative:
+        ev_in = max(event.timeline_in, window_start)
+        ev_out = min(event.timeline_out, window_end)
+        if ev_out <= ev_in:
+            continue
+        clips.append(event.clipped(ev_in, ev_out, shift))
+
+    logger.debug("Expanded nested composition %s at %s (%s events)", key[0], timeline_offset, len(relative))
+    return True
 
 
 def _get_operation_group_id(operation_group) -> str:
@@ -624,7 +1578,12 @@ def _get_operation_group_id(operation_group) -> str:
     return f"opgroup_{id(operation_group)}"
 
 
-def _process_operation_group(operation_group, clips: List[Dict[str, Any]], mob_map: Dict[str, Any], timeline_offset: int, fps: float, processed_ops: Set[str]):
+def _is_stable_operation_id(op_id: str) -> bool:
+    """False for the memory-address fallback of _get_operation_group_id (process-local)."""
+    return not op_id[len("opgroup_"):].isdigit()
+
+
+def _process_operation_group(operation_group, clips: List[Event], mob_map: Dict[str, Any], timeline_offset: int, fps: float, processed_ops: Set[str]):
     """
     Process an OperationGroup by finding its nested SourceClip and combining with effect info.
     
@@ -636,13 +1595,14 @@ def _process_operation_group(operation_group, clips: List[Dict[str, Any]], mob_m
     # STAGE 1: Deduplication check
     op_id = _get_operation_group_id(operation_group)
     if op_id in processed_ops:
-        logger.debug(f"Skipping already processed OperationGroup: {op_id}")
+        logger.debug("Skipping already processed OperationGroup: %s", op_id)
         return
     processed_ops.add(op_id)
     
-    # STAGE 1: Extract real effect information (not "Unknown Effect")
+    # STAGE 1: Extract real effect information (not "Unknown Effect") in one pass
+    decoded = decode_operation_group(operation_group)
     operation_def = getattr(operation_group, "operation_def", None)
-    effect_name = extract_effect_name_from_operation_group(operation_group)
+    effect_name = decoded.effect_name
     if operation_def:
         if hasattr(operation_def, "name") and operation_def.name:
             # Extract clean effect name
@@ -658,31 +1618,27 @@ def _process_operation_group(operation_group, clips: List[Dict[str, Any]], mob_m
             # Use AUID as fallback
             effect_name = f"Effect_{str(operation_def.auid)[-8:]}"
     
-    # STAGE 2: Find nested SourceClip via deep recursive search
-    source_clip = _find_nested_source_clip_deep(operation_group)
+    # STAGE 2: Nested SourceClip found by the decoder's deep search of the inputs
+    source_clip = decoded.input_clip
     
     if source_clip:
         # Test if we get real pyaaf2 SourceClips
         _debug_assert_real_sourceclip(source_clip)
         # STAGE 3: Process as Media+Effect event
-        _process_source_clip(source_clip, clips, mob_map, timeline_offset, fps, effect_name, operation_group)
-        logger.debug(f"Added Media+Effect event: SourceClip + {effect_name} at {timeline_offset}")
+        _process_source_clip(source_clip, clips, mob_map, timeline_offset, fps, effect_name, operation_group, decoded.parameters, decoded.retime)
+        logger.debug("Added Media+Effect event: SourceClip + %s at %s", effect_name, timeline_offset)
     else:
         # No SourceClip found - this is an effect on filler
         op_length = int(getattr(operation_group, "length", 0))
-        filler_event = {
-            "name": "Pan & Zoom on Filler" if "Avid Pan & Zoom" in effect_name else f"FX_ON_FILLER: {effect_name}",
-            "in": timeline_offset,
-            "out": timeline_offset + op_length,
-            "source_umid": "FX_ON_FILLER",
-            "source_path": None,
-            "effect_params": {
-                "operation": effect_name,
-                "parameters": extract_fcpxml_relevant_parameters(operation_group)
-            }
-        }
+        filler_event = Event(
+            name=_intern("Pan & Zoom on Filler" if "Avid Pan & Zoom" in effect_name else f"FX_ON_FILLER: {effect_name}"),
+            timeline_in=timeline_offset,
+            timeline_out=timeline_offset + op_length,
+            source=Source("FX_ON_FILLER", None),
+            effect=Effect(_intern(effect_name), decoded.parameters),
+        )
         clips.append(filler_event)
-        logger.debug(f"Added FX_ON_FILLER event: {effect_name} at {timeline_offset}")
+        logger.debug("Added FX_ON_FILLER event: %s at %s", effect_name, timeline_offset)
 
 
 def _find_nested_source_clip_deep(node, depth=0):
@@ -693,79 +1649,108 @@ def _find_nested_source_clip_deep(node, depth=0):
     """
     if not node or depth > 15:
         return None
+    state = _build.get()
+    if state.budget is not None:
+        state.budget.visit()
+        if not state.budget.allow_chain_depth(depth):
+            return None
     
     node_type = str(type(node).__name__)
     
-    # Found it!
-    if "SourceClip" in node_type:
-        logger.debug(f"Found SourceClip at depth {depth}")
-        return node
-    
-    # Skip internal wiring
-    if "ScopeReference" in node_type:
-        return None
-    
-    # Follow the correct paths based on your AAF structure
-    search_children = []
-    
-    # PRIMARY PATH: segments (NOT input_segments!)
-    if hasattr(node, "segments"):
-        segments_list = _iter_safe(node.segments)
-        search_children.extend(segments_list)
-        logger.debug(f"Found {len(segments_list)} segments at depth {depth}")
-    
-    # SECONDARY PATH: components (for Sequence traversal)
-    if hasattr(node, "components"):
-        components_list = _iter_safe(node.components)
-        search_children.extend(components_list)
-        logger.debug(f"Found {len(components_list)} components at depth {depth}")
-    
-    # FALLBACK: input_segments (in case some OperationGroups use this)
-    if hasattr(node, "input_segments"):
-        input_list = _iter_safe(node.input_segments)
-        search_children.extend(input_list)
-        logger.debug(f"Found {len(input_list)} input_segments at depth {depth}")
-    
-    # Single references
-    for attr in ["segment", "input_segment", "selected"]:
-        if hasattr(node, attr):
-            child = getattr(node, attr)
-            if child:
-                search_children.append(child)
-    
-    # PROPERTY-LEVEL ACCESS for StrongRefVectorProperty
+    trace = state.tracer
+    if trace is not None:
+        trace.begin(node_type, "chain_walk", depth=depth)
     try:
-        from aaf2.properties import StrongRefVectorProperty
-        for prop in node.properties():
-            prop_name = getattr(getattr(prop, "propertydef", None), "name", None) or getattr(prop, "name", None)
-            if prop_name in ["InputSegments", "Components", "Segments"] and isinstance(prop, StrongRefVectorProperty):
-                prop_children = []
-                for i in range(len(prop)):
-                    try:
-                        prop_children.append(prop.get(i))
-                    except Exception:
-                        pass
-                search_children.extend(prop_children)
-                logger.debug(f"Property {prop_name} at depth {depth}, found {len(prop_children)} children")
-    except Exception as e:
-        logger.debug(f"Property access error at depth {depth}: {e}")
+        # Found it!
+        if "SourceClip" in node_type:
+            logger.debug("Found SourceClip at depth %s", depth)
+            return node
+    
+        # Skip internal wiring
+        if "ScopeReference" in node_type:
+            return None
+    
+        # Follow the correct paths based on your AAF structure
+        search_children = []
+    
+        # PRIMARY PATH: segments (NOT input_segments!)
+        if hasattr(node, "segments"):
+            segments_list = _iter_safe(node.segments)
+            search_children.extend(segments_list)
+            logger.debug("Found %s segments at depth %s", len(segments_list), depth)
+    
+        # SECONDARY PATH: components (for Sequence traversal)
+        if hasattr(node, "components"):
+            components_list = _iter_safe(node.components)
+            search_children.extend(components_list)
+            logger.debug("Found %s components at depth %s", len(components_list), depth)
+    
+        # FALLBACK: input_segments (in case some OperationGroups use this)
+        if hasattr(node, "input_segments"):
+            input_list = _iter_safe(node.input_segments)
+            search_children.extend(input_list)
+            logger.debug("Found %s input_segments at depth %s", len(input_list), depth)
+    
+        # Single references
+        for attr in ["segment", "input_segment", "selected"]:
+            if hasattr(node, attr):
+                child = getattr(node, attr)
+                if child:
+                    search_children.append(child)
+    
+        # PROPERTY-LEVEL ACCESS for StrongRefVectorProperty
+        try:
+            from aaf2.properties import StrongRefVectorProperty
+            for prop in node.properties():
+                prop_name = getattr(getattr(prop, "propertydef", None), "name", None) or getattr(prop, "name", None)
+                if prop_name in ["InputSegments", "Components", "Segments"] and isinstance(prop, StrongRefVectorProperty):
+                    # pyaaf2 hands out the same objects as the attributes above; only
+                    # children those missed are searched (a second descent doubles the walk)
+                    seen = {id(child) for child in search_children}
+                    prop_children = []
+                    for i in range(len(prop)):
+                        try:
+                            child = prop.get(i)
+                        except Exception:
+                            continue
+                        if id(child) not in seen:
+                            prop_children.append(child)
+                    search_children.extend(prop_children)
+                    logger.debug("Property %s at depth %s, found %s new children", prop_name, depth, len(prop_children))
+        except Exception as e:
+            logger.debug("Property access error at depth %s: %s", depth, e)
     
-    # Recursive search through all discovered children
-    for child in search_children:
-        if child:
-            result = _find_nested_source_clip_deep(child, depth + 1)
-            if result:
-                return result
+        # Recursive search through all discovered children
+        for child in search_children:
+            if child:
+                result = _find_nested_source_clip_deep(child, depth + 1)
+                if result:
+                    return result
     
-    return None
+        return None
+    finally:
+        if trace is not None:
+            trace.end(node_type, "chain_walk")
 
 
-def _process_source_clip(source_clip, clips, mob_map, timeline_offset, fps, effect_name, operation_group=None):
+def _process_source_clip(source_clip, clips, mob_map, timeline_offset, fps, effect_name, operation_group=None, parameters=None, retime=None):
     """
     FIXED: Use SourceClip.mob and SourceClip.mob_id attributes (confirmed by debug output).
+
+    `parameters` are the already decoded parameters of operation_group, if any.
+    With a `retime`, the event spans the group on the timeline and carries the source
+    frames the curve resolves from the clip's start.
     """
     
     clip_length = int(getattr(source_clip, "length", 0))
+    source_range = None
+    if retime is not None and operation_group is not None:
+        clip_length = int(getattr(operation_group, "length", 0) or 0)
+        try:
+            start = float(getattr(source_clip, "start", 0) or 0)
+            source_range = SourceRange.from_positions(retime.source_positions(clip_length, start), retime.kind)
+        except Exception as e:
+            logger.warning(f"Retime evaluation error at {timeline_offset}: {e}")
     
     # FIXED: Use the correct attributes shown in debug output
     clip_name = "Unresolved Media"
@@ -781,12 +1766,12 @@ def _process_source_clip(source_clip, clips, mob_map, timeline_offset, fps, effe
             mob_name = getattr(target_mob, "name", None)
             if mob_name:
                 clip_name = str(mob_name)
-                logger.debug(f"Got clip name from mob.name: {clip_name}")
+                logger.debug("Got clip name from mob.name: %s", clip_name)
             
             # Get UMID
             if hasattr(source_clip, 'mob_id') and source_clip.mob_id:
                 source_umid = str(source_clip.mob_id)
-                logger.debug(f"Got UMID from mob_id: {source_umid}")
+                logger.debug("Got UMID from mob_id: %s", source_umid)
             
             # Try to extract source info from the mob
             resolved_source = extract_source_info_from_mob(target_mob)
@@ -798,9 +1783,9 @@ def _process_source_clip(source_clip, clips, mob_map, timeline_offset, fps, effe
                     source_path = resolved_source["source_path"]
                 if resolved_source.get("source_umid"):
                     source_umid = resolved_source["source_umid"]
-                logger.debug(f"Enhanced with resolved source info: {clip_name}")
+                logger.debug("Enhanced with resolved source info: %s", clip_name)
             
-            logger.debug(f"Successfully resolved SourceClip: {clip_name} (UMID: {source_umid})")
+            logger.debug("Successfully resolved SourceClip: %s (UMID: %s)", clip_name, source_umid)
         
         else:
             logger.warning(f"SourceClip at {timeline_offset} has no mob attribute")
@@ -814,31 +1799,29 @@ def _process_source_clip(source_clip, clips, mob_map, timeline_offset, fps, effe
     else:
         event_name = clip_name
     
-    # Extract parameters from OperationGroup
-    parameters = {}
-    if operation_group:
+    # Extract parameters from OperationGroup, unless the caller already decoded them
+    if parameters is None and operation_group is not None:
         try:
             parameters = extract_fcpxml_relevant_parameters(operation_group)
-            logger.debug(f"Extracted {len(parameters)} parameters for {event_name}")
+            logger.debug("Extracted %s parameters for %s", len(parameters), event_name)
         except Exception as e:
             logger.warning(f"Parameter extraction error: {e}")
             parameters = {"extraction_error": str(e)}
+    else:
+        parameters = parameters or NO_PARAMETERS
     
     # Create event
-    event = {
-        "name": event_name,
-        "in": timeline_offset,
-        "out": timeline_offset + clip_length,
-        "source_umid": source_umid,
-        "source_path": source_path,
-        "effect_params": {
-            "operation": effect_name,
-            "parameters": parameters
-        }
-    }
+    event = Event(
+        name=_intern(event_name),
+        timeline_in=timeline_offset,
+        timeline_out=timeline_offset + clip_length,
+        source=Source(_intern(source_umid), _intern(source_path)),
+        effect=Effect(_intern(effect_name), parameters),
+        source_range=source_range,
+    )
     
     clips.append(event)
-    logger.debug(f"Added resolved event: {event_name}")
+    logger.debug("Added resolved event: %s", event_name)
 
 
 def walk_mob_chain_to_import_descriptor(mob_id: str, mob_map: Dict[str, Any], visited: Optional[Set[str]] = None) -> Optional[Dict[str, Any]]:
@@ -856,45 +1839,52 @@ def walk_mob_chain_to_import_descriptor(mob_id: str, mob_map: Dict[str, Any], vi
         return None
     
     visited.add(mob_id)
-    mob = mob_map.get(mob_id)
-    
-    if not mob:
-        logger.debug(f"Mob not found in map: {mob_id}")
-        return None
+    trace = _build.get().tracer
+    if trace is not None:
+        trace.begin("mob_chain", "chain_walk", mob_id=mob_id, depth=len(visited))
+    try:
+        mob = mob_map.get(mob_id)
+    
+        if not mob:
+            logger.debug("Mob not found in map: %s", mob_id)
+            return None
+    
+        # STAGE 2: Check if this mob has an ImportDescriptor (end of chain)
+        has_import_descriptor = False
+        if hasattr(mob, "descriptor"):
+            descriptor = mob.descriptor
+            if descriptor:
+                descriptor_type = str(type(descriptor).__name__)
+                # Look for ImportDescriptor or similar
+                if "ImportDescriptor" in descriptor_type or "NetworkLocator" in descriptor_type:
+                    has_import_descriptor = True
+                # Also check for locators
+                elif hasattr(descriptor, "locator") or (hasattr(descriptor, "locators") and _iter_safe(descriptor.locators)):
+                    has_import_descriptor = True
+    
+        if has_import_descriptor:
+            # Found ImportDescriptor - extract source info
+            logger.debug("Found ImportDescriptor at mob: %s", mob_id)
+            return extract_source_info_from_mob(mob)
+    
+        # Look for next mob in chain via SourceClip
+        next_mob_id = find_next_mob_in_chain(mob)
+    
+        if next_mob_id and next_mob_id != mob_id:  # Avoid self-reference
+            # Continue walking the chain
+            result = walk_mob_chain_to_import_descriptor(next_mob_id, mob_map, visited)
+            if result:
+                return result
     
-    # STAGE 2: Check if this mob has an ImportDescriptor (end of chain)
-    has_import_descriptor = False
-    if hasattr(mob, "descriptor"):
-        descriptor = mob.descriptor
-        if descriptor:
-            descriptor_type = str(type(descriptor).__name__)
-            # Look for ImportDescriptor or similar
-            if "ImportDescriptor" in descriptor_type or "NetworkLocator" in descriptor_type:
-                has_import_descriptor = True
-            # Also check for locators
-            elif hasattr(descriptor, "locator") or (hasattr(descriptor, "locators") and _iter_safe(descriptor.locators)):
-                has_import_descriptor = True
-    
-    if has_import_descriptor:
-        # Found ImportDescriptor - extract source info
-        logger.debug(f"Found ImportDescriptor at mob: {mob_id}")
-        return extract_source_info_from_mob(mob)
-    
-    # Look for next mob in chain via SourceClip
-    next_mob_id = find_next_mob_in_chain(mob)
-    
-    if next_mob_id and next_mob_id != mob_id:  # Avoid self-reference
-        # Continue walking the chain
-        result = walk_mob_chain_to_import_descriptor(next_mob_id, mob_map, visited)
-        if result:
-            return result
-    
-    # Fallback: use current mob if no chain continuation and it has descriptor info
-    if hasattr(mob, "descriptor") and mob.descriptor:
-        logger.debug(f"Using fallback mob for source info: {mob_id}")
-        return extract_source_info_from_mob(mob)
+        # Fallback: use current mob if no chain continuation and it has descriptor info
+        if hasattr(mob, "descriptor") and mob.descriptor:
+            logger.debug("Using fallback mob for source info: %s", mob_id)
+            return extract_source_info_from_mob(mob)
     
-    return None
+        return None
+    finally:
+        if trace is not None:
+            trace.end("mob_chain", "chain_walk")
 
 
 def find_next_mob_in_chain(mob) -> Optional[str]:
@@ -1004,6 +1994,16 @@ def _extract_url_from_locator(locator) -> Optional[str]:
     return None
 
 
+def timecode_to_frames(timecode: str, fps: float) -> int:
+    """Convert HH:MM:SS:FF (or HH:MM:SS;FF) to a frame count; inverse of frames_to_timecode."""
+    parts = timecode.replace(";", ":").split(":")
+    if len(parts) != 4:
+        raise ValueError(f"Invalid timecode {timecode!r}: expected HH:MM:SS:FF")
+    hours, minutes, seconds, frames = (int(p) for p in parts)
+    fps_int = int(fps)
+    return ((hours * 60 + minutes) * 60 + seconds) * fps_int + frames
+
+
 def frames_to_timecode(frames: int, fps: float, is_drop: bool) -> str:
     """Convert frame count to timecode string."""
     try:
@@ -1024,8 +2024,108 @@ def _cli() -> None:
         description="Build canonical JSON from AAF file per aaf2resolve-spec."
     )
     parser.add_argument("aaf", help="Path to AAF file")
-    parser.add_argument("-o", "--out", default="-", help="Output JSON path (default: stdout)")
+    parser.add_argument(
+        "-o",
+        "--out",
+        default="-",
+        help="Output JSON path (default: stdout); an output directory with --all-compositions/--select",
+    )
     parser.add_argument("-v", "--verbose", action="store_true", help="Enable debug logging")
+    parser.add_argument(
+        "--no-expand-nested",
+        action="store_true",
+        help="Emit nested CompositionMob references as plain clip events",
+    )
+    parser.add_argument(
+        "--nested-depth",
+        type=int,
+        default=NESTED_MAX_DEPTH,
+        help=f"Maximum nested CompositionMob depth to flatten (default: {NESTED_MAX_DEPTH})",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="TRACE_JSON",
+        help="Write a Chrome trace-event JSON of the traversal (open in Perfetto / about://tracing)",
+    )
+    parser.add_argument("--max-nodes", type=int, help="Stop traversal after visiting N nodes")
+    parser.add_argument(
+        "--max-chain-depth", type=int, help="Truncate nested SourceClip searches deeper than N levels"
+    )
+    parser.add_argument(
+        "--max-control-points", type=int, help="Decode at most N control points per parameter"
+    )
+    parser.add_argument("--timeout", type=float, help="Stop traversal after N seconds")
+    parser.add_argument(
+        "--progress",
+        choices=["bar", "json"],
+        help="Report progress on stderr as a progress bar or as JSON lines",
+    )
+    parser.add_argument(
+        "--range",
+        dest="time_range",
+        metavar="START-END",
+        help="Only emit events intersecting this window: frames (e.g. 0-750) or timecodes "
+        "(e.g. 10:00:30:00-10:01:00:00), clipped to it",
+    )
+    parser.add_argument(
+        "--rebase",
+        action="store_true",
+        help="With --range, shift clipped events so the window starts at frame 0",
+    )
+    parser.add_argument(
+        "--offset-index",
+        nargs="?",
+        const="",
+        metavar="SIDECAR_JSON",
+        help="With --range, cache component offsets in a sidecar (default: <aaf>.offsets.json) "
+        "so later ranges seek directly",
+    )
+    parser.add_argument(
+        "--metadata-only",
+        nargs="?",
+        const="refuse",
+        choices=["refuse", "skip"],
+        help="Read through a byte-counting file that refuses (default) or skips essence streams, "
+        "and log the per-stream read breakdown",
+    )
+    parser.add_argument(
+        "--bake-keyframes",
+        nargs="?",
+        const="bake",
+        choices=["bake", "decimate"],
+        help="Sample keyframed parameters with non-linear interpolation onto the frame grid "
+        "(decimate: then drop samples linear interpolation reproduces)",
+    )
+    parser.add_argument(
+        "--bake-step", type=int, default=1, metavar="N", help="With --bake-keyframes, sample every Nth frame"
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        metavar="N",
+        help="Split the top timeline across N worker processes (output identical to the serial build)",
+    )
+    parser.add_argument(
+        "--all-compositions",
+        action="store_true",
+        help="Emit one canonical document per CompositionMob (file opened and indexed once)",
+    )
+    parser.add_argument(
+        "--select",
+        metavar="REGEX",
+        help="Like --all-compositions, limited to compositions whose name matches REGEX",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for --all-compositions/--select (default: 1)",
+    )
+    parser.add_argument(
+        "--normalized",
+        action="store_true",
+        help="Emit the table-encoded layout (top-level sources / effect_templates, see canonical_tables.py)",
+    )
     args = parser.parse_args()
 
     if args.verbose:
@@ -1034,7 +2134,60 @@ def _cli() -> None:
         logging.basicConfig(level=logging.INFO)
 
     try:
-        canon = build_canonical_from_aaf(args.aaf)
+        tracer = TraversalTracer() if args.trace else None
+        budget = TraversalBudget(
+            max_nodes=args.max_nodes,
+            max_chain_depth=args.max_chain_depth,
+            max_control_points=args.max_control_points,
+            max_seconds=args.timeout,
+        )
+        if args.all_compositions or args.select:
+            canons = build_canonical_for_compositions(
+                args.aaf,
+                select=args.select,
+                workers=args.workers,
+                expand_nested=not args.no_expand_nested,
+                nested_max_depth=args.nested_depth,
+                tracer=tracer,
+                budget=budget if budget != TraversalBudget() else None,
+            )
+            if tracer is not None:
+                tracer.write(args.trace)
+                logger.info(f"Traversal trace ({len(tracer.events)} events) written to {args.trace}")
+            if args.normalized:
+                canons = [collapse_canonical(canon) for canon in canons]
+            _write_composition_documents(canons, args.out)
+            return
+
+        if args.shards:
+            canon = build_canonical_sharded(
+                args.aaf,
+                shards=args.shards,
+                expand_nested=not args.no_expand_nested,
+                nested_max_depth=args.nested_depth,
+                offset_sidecar=(args.offset_index or sidecar_path(args.aaf)) if args.offset_index is not None else None,
+            )
+        else:
+            canon = build_canonical_from_aaf(
+                args.aaf,
+                expand_nested=not args.no_expand_nested,
+                nested_max_depth=args.nested_depth,
+                tracer=tracer,
+                budget=budget if budget != TraversalBudget() else None,
+                progress={"bar": progress_bar_printer, "json": json_lines_printer}[args.progress]()
+                if args.progress
+                else None,
+                time_range=args.time_range,
+                rebase_range=args.rebase,
+                offset_sidecar=(args.offset_index or sidecar_path(args.aaf)) if args.offset_index is not None else None,
+                read_accounting=ReadAccounting(args.metadata_only) if args.metadata_only else None,
+                keyframe_bake=KeyframeBake(args.bake_keyframes, step=args.bake_step) if args.bake_keyframes else None,
+            )
+        if tracer is not None:
+            tracer.write(args.trace)
+            logger.info(f"Traversal trace ({len(tracer.events)} events) written to {args.trace}")
+        if args.normalized:
+            canon = collapse_canonical(canon)
         text = json.dumps(canon, indent=2)
 
         if args.out == "-" or args.out.lower() == "stdout":
@@ -1049,112 +2202,26 @@ def _cli() -> None:
         raise SystemExit(1) from e
 
 
-if __name__ == "__main__":
-    _cli()
-
-
-def _is_rational(x):
-    return hasattr(x, "numerator") and hasattr(x, "denominator")
-
-def _r2f(x):
-    if x is None: return None
-    if _is_rational(x):
-        den = x.denominator or 1
-        try: return x.numerator / float(den)
-        except Exception: return None
-    try: return float(x)
-    except Exception: return None
-
-def extract_keyframe_timing_data(param):
-    """
-    Animated = any parameter that exposes a PointList with >1 ControlPoint.
-    - Parse ControlPoint Time/Value when labeled (preferred).
-    - If unlabeled, infer: 'time' is a rational in [0..1]; 'value' is the other numeric.
-    Returns a truthy dict for animated params even if some values can't be parsed.
-    """
-    try:
-        plist = param.get("PointList")
-        n = len(plist)
-    except Exception:
-        return None
-    if not isinstance(n, int) or n <= 1:
-        return None
-
-    kfs = []
-    for i in range(n):
-        try:
-            cp = plist.get(i)
-        except Exception:
-            continue
-
-        t_raw = t = v_raw = v = None
-
-        # 1) Try labeled props
-        try:
-            for pr in cp.properties():
-                nm = getattr(getattr(pr, "propertydef", None), "name", getattr(pr, "name", None))
-                val = getattr(pr, "value", None)
-                if nm == "Time":
-                    t_raw = val; t = _r2f(val)
-                elif nm == "Value":
-                    v_raw = val; v = _r2f(val)
-        except Exception:
-            pass
-
-        # 2) If unlabeled or partially missing, infer from rationals/numerics
-        if t is None or v is None:
-            rats, nums = [], []
-            try:
-                for pr in cp.properties():
-                    val = getattr(pr, "value", None)
-                    if _is_rational(val): rats.append(val)
-                    else:
-                        try:
-                            nums.append(float(val))
-                        except Exception:
-                            pass
-            except Exception:
-                pass
-
-            if t is None:
-                for q in rats:
-                    qf = _r2f(q)
-                    if qf is not None and 0.0 <= qf <= 1.0:
-                        t_raw, t = q, qf
-                        break
-            if v is None:
-                for q in rats:
-                    if q is not t_raw:
-                        v_raw, v = q, _r2f(q)
-                        if v is not None:
-                            break
-                if v is None and nums:
-                    v = nums[0]
+def _write_composition_documents(canons: List[Dict[str, Any]], out: str) -> None:
+    """One JSON line per composition on stdout, or one <timeline name>.json per composition in `out`."""
+    if out == "-" or out.lower() == "stdout":
+        for canon in canons:
+            print(json.dumps(canon))
+        return
 
-        kfs.append({"normalized_time": t, "value": v, "_time_raw": t_raw, "_value_raw": v_raw})
-
-    # Sort if we have times
-    try:
-        if any(k["normalized_time"] is not None for k in kfs):
-            kfs.sort(key=lambda x: (1,0)[x["normalized_time"] is None] if x["normalized_time"] is None else x["normalized_time"])
-    except Exception:
-        pass
-
-    return {"type": "animated", "point_count": n, "keyframes": kfs}
-def convert_normalized_time_to_fcpxml_seconds(normalized_time, segment_length_edit_units, track_edit_rate):
-    """
-    Convert AAF normalized keyframe time to FCPXML rational seconds.
-    
-    Implements verified conversion formula:
-    fcpxml_seconds = (normalized_time × segment_length_edit_units) ÷ track_edit_rate
-    """
-    try:
-        edit_units_position = normalized_time * segment_length_edit_units
-        fcpxml_seconds = edit_units_position / track_edit_rate
-        return fcpxml_seconds
-    except (ZeroDivisionError, TypeError, ValueError):
-        logger.warning(f"Failed to convert normalized time {normalized_time} to FCPXML seconds")
-        return 0.0
+    out_dir = Path(out)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    used: Set[str] = set()
+    for canon in canons:
+        stem = re.sub(r"[^\w.-]+", "_", canon["timeline"]["name"]).strip("._") or "timeline"
+        name, n = stem, 1
+        while name in used:
+            n += 1
+            name = f"{stem}_{n}"
+        used.add(name)
+        with open(out_dir / f"{name}.json", "w", encoding="utf-8") as f:
+            f.write(json.dumps(canon, indent=2))
+    logger.info(f"{len(canons)} canonical documents written to {out_dir}")
 
 
 #--DEEP_TRAVERSAL--
@@ -1241,94 +2308,6 @@ def param_name(p):
             or getattr(getattr(p,"parameter_definition",None),"name",None)
             or getattr(p,"name","Unknown"))
 
-def _is_rational(x):
-    return hasattr(x, "numerator") and hasattr(x, "denominator")
-
-def _r2f(x):
-    if x is None: return None
-    if _is_rational(x):
-        den = x.denominator or 1
-        try: return x.numerator / float(den)
-        except Exception: return None
-    try: return float(x)
-    except Exception: return None
-
-def extract_keyframe_timing_data(param):
-    """
-    Animated = any parameter that exposes a PointList with >1 ControlPoint.
-    - Parse ControlPoint Time/Value when labeled (preferred).
-    - If unlabeled, infer: 'time' is a rational in [0..1]; 'value' is the other numeric.
-    Returns a truthy dict for animated params even if some values can't be parsed.
-    """
-    try:
-        plist = param.get("PointList")
-        n = len(plist)
-    except Exception:
-        return None
-    if not isinstance(n, int) or n <= 1:
-        return None
-
-    kfs = []
-    for i in range(n):
-        try:
-            cp = plist.get(i)
-        except Exception:
-            continue
-
-        t_raw = t = v_raw = v = None
-
-        # 1) Try labeled props
-        try:
-            for pr in cp.properties():
-                nm = getattr(getattr(pr, "propertydef", None), "name", getattr(pr, "name", None))
-                val = getattr(pr, "value", None)
-                if nm == "Time":
-                    t_raw = val; t = _r2f(val)
-                elif nm == "Value":
-                    v_raw = val; v = _r2f(val)
-        except Exception:
-            pass
-
-        # 2) If unlabeled or partially missing, infer from rationals/numerics
-        if t is None or v is None:
-            rats, nums = [], []
-            try:
-                for pr in cp.properties():
-                    val = getattr(pr, "value", None)
-                    if _is_rational(val): rats.append(val)
-                    else:
-                        try:
-                            nums.append(float(val))
-                        except Exception:
-                            pass
-            except Exception:
-                pass
-
-            if t is None:
-                for q in rats:
-                    qf = _r2f(q)
-                    if qf is not None and 0.0 <= qf <= 1.0:
-                        t_raw, t = q, qf
-                        break
-            if v is None:
-                for q in rats:
-                    if q is not t_raw:
-                        v_raw, v = q, _r2f(q)
-                        if v is not None:
-                            break
-                if v is None and nums:
-                    v = nums[0]
-
-        kfs.append({"normalized_time": t, "value": v, "_time_raw": t_raw, "_value_raw": v_raw})
-
-    # Sort if we have times
-    try:
-        if any(k["normalized_time"] is not None for k in kfs):
-            kfs.sort(key=lambda x: (1,0)[x["normalized_time"] is None] if x["normalized_time"] is None else x["normalized_time"])
-    except Exception:
-        pass
-
-    return {"type": "animated", "point_count": n, "keyframes": kfs}
 def _umid_to_bytes(umid):
     b = getattr(umid,"bytes",None)
     if isinstance(b,(bytes,bytearray)): return bytes(b)
@@ -1376,3 +2355,7 @@ def iter_parameters(op):
                     yield pr.get(i); yielded=True
     except Exception:
         pass
+
+
+if __name__ == "__main__":
+    _cli()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+build_progress.py — Progress reporting for build_canonical
+
+Gives long parses a heartbeat so dashboards can tell hung jobs from slow ones.
+
+- estimate_work(): cheap total computed from the picture Sequence without descending
+  (top-level component count plus OperationGroup count, so effect-heavy cuts weigh more)
+- ProgressReporter: rate-limited callback invoked as top-level components complete
+- progress_bar_printer() / json_lines_printer(): CLI consumers (human bar, machine lines)
+
+Each update is a plain dict:
+    {"events": 120, "offset": 4200, "elapsed": 2.314, "done": 57, "total": 140,
+     "fraction": 0.407, "final": false}
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+from typing import Any, Callable, Dict, Optional, TextIO
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+def estimate_work(sequence) -> Dict[str, int]:
+    """Count top-level components and OperationGroups of a Sequence without descending."""
+    components = 0
+    operation_groups = 0
+    try:
+        for component in sequence.components:
+            components += 1
+            if "OperationGroup" in type(component).__name__:
+                operation_groups += 1
+    except Exception:
+        pass
+    return {
+        "components": components,
+        "operation_groups": operation_groups,
+        "total": components + operation_groups,
+    }
+
+
+def _work_units(component) -> int:
+    return 2 if "OperationGroup" in type(component).__name__ else 1
+
+
+class ProgressReporter:
+    """Rate-limited progress callback driver; start and final updates are always sent."""
+
+    def __init__(self, callback: ProgressCallback, min_interval: float = 0.5):
+        self.callback = callback
+        self.min_interval = min_interval
+        self.total = 0
+        self.done = 0
+        self._started = time.monotonic()
+        self._last_emit: Optional[float] = None
+
+    def start(self, estimate: Dict[str, int]) -> None:
+        self.total = estimate.get("total", 0)
+        self._started = time.monotonic()
+        self._emit(events=0, offset=0, final=False)
+
+    def advance(self, component, events: int, offset: int) -> None:
+        """Called after each top-level component of the picture Sequence."""
+        self.done += _work_units(component)
+        now = time.monotonic()
+        if self._last_emit is not None and now - self._last_emit < self.min_interval:
+            return
+        self._emit(events, offset, final=False, now=now)
+
+    def finish(self, events: int, offset: int) -> None:
+        self._emit(events, offset, final=True)
+
+    def _emit(self, events: int, offset: int, final: bool, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        self._last_emit = now
+        fraction = min(self.done / self.total, 1.0) if self.total else (1.0 if final else 0.0)
+        self.callback(
+            {
+                "events": events,
+                "offset": offset,
+                "elapsed": round(now - self._started, 3),
+                "done": self.done,
+                "total": self.total,
+                "fraction": round(fraction, 4),
+                "final": final,
+            }
+        )
+
+
+def progress_bar_printer(stream: TextIO = sys.stderr, width: int = 30) -> ProgressCallback:
+    """Callback that redraws a single-line progress bar on `stream`."""
+
+    def _print(update: Dict[str, Any]) -> None:
+        filled = int(update["fraction"] * width)
+        bar = "#" * filled + "." * (width - filled)
+        stream.write(
+            f"\r[{bar}] {update['fraction'] * 100:5.1f}% "
+            f"{update['events']} events @ frame {update['offset']} {update['elapsed']:.1f}s"
+        )
+        if update["final"]:
+            stream.write("\n")
+        stream.flush()
+
+    return _print
+
+
+def json_lines_printer(stream: TextIO = sys.stderr) -> ProgressCallback:
+    """Callback that writes one JSON object per update (machine-readable progress lines)."""
+
+    def _print(update: Dict[str, Any]) -> None:
+        stream.write(json.dumps({"progress": update}) + "\n")
+        stream.flush()
+
+    return _print
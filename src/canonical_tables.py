@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+canonical_tables.py — Dictionary-encoded (normalized) canonical layout
+
+Every canonical event carries its full source object and effect payload, although a
+cut typically references a few dozen sources and a handful of distinct effect setups.
+The normalized layout moves those into top-level tables and replaces them per event
+with integer references:
+
+    {
+      "project": {...},
+      "timeline": {"events": [{"id": "ev_0001", ..., "source_ref": 0, "effect_ref": 0}]},
+      "sources": [{"path": "file:///...", "umid_chain": [...], ...}],
+      "effect_templates": [{"name": "(none)", "on_filler": false, ...}]
+    }
+
+Both event containers are handled:
+- timeline.events (docs/data_model_json.md): "source" (object | null) and "effect"
+- timeline.tracks[].clips (build_canonical output): "source_umid"/"source_path" and
+  "effect_params"
+
+collapse_canonical() and expand_canonical() are lossless inverses: expanding a collapsed
+document returns a dict equal to the original, with event keys in their original order.
+Rows are deduplicated by exact JSON content, so key order inside a row is preserved too.
+
+Usage:
+    python src/canonical_tables.py collapse canon.json -o canon.normalized.json
+    python src/canonical_tables.py expand canon.normalized.json -o canon.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+SOURCES = "sources"
+EFFECT_TEMPLATES = "effect_templates"
+SOURCE_REF = "source_ref"
+EFFECT_REF = "effect_ref"
+
+# Event container → (source field, effect field); a None source field means the
+# source is stored flat on the event under _FLAT_SOURCE_KEYS
+_CONTAINER_FIELDS: Dict[str, Tuple[Optional[str], str]] = {
+    "events": ("source", "effect"),
+    "clips": (None, "effect_params"),
+}
+_FLAT_SOURCE_KEYS = ("source_umid", "source_path")
+
+
+class _Table:
+    """Append-only row table deduplicated by exact JSON content."""
+
+    def __init__(self) -> None:
+        self.rows: List[Any] = []
+        self._index: Dict[str, int] = {}
+
+    def ref(self, row: Any) -> int:
+        key = json.dumps(row, separators=(",", ":"))
+        idx = self._index.get(key)
+        if idx is None:
+            idx = self._index[key] = len(self.rows)
+            self.rows.append(row)
+        return idx
+
+
+def is_normalized(canon: Dict[str, Any]) -> bool:
+    """True when canon uses the table-encoded layout."""
+    return SOURCES in canon or EFFECT_TEMPLATES in canon
+
+
+def _collapse_event(event: Dict[str, Any], fields: Tuple[Optional[str], str], sources: _Table, effects: _Table) -> Dict[str, Any]:
+    source_field, effect_field = fields
+    out: Dict[str, Any] = {}
+    for key, value in event.items():
+        if source_field is not None and key == source_field:
+            out[SOURCE_REF] = None if value is None else sources.ref(value)
+        elif source_field is None and key in _FLAT_SOURCE_KEYS:
+            if SOURCE_REF not in out:
+                out[SOURCE_REF] = sources.ref({k: event[k] for k in _FLAT_SOURCE_KEYS if k in event})
+        elif key == effect_field:
+            out[EFFECT_REF] = effects.ref(value)
+        else:
+            out[key] = value
+    return out
+
+
+def _expand_event(event: Dict[str, Any], fields: Tuple[Optional[str], str], sources: List[Any], effects: List[Any]) -> Dict[str, Any]:
+    source_field, effect_field = fields
+    out: Dict[str, Any] = {}
+    for key, value in event.items():
+        if key == SOURCE_REF:
+            if source_field is None:
+                out.update(sources[value])
+            else:
+                out[source_field] = None if value is None else sources[value]
+        elif key == EFFECT_REF:
+            out[effect_field] = effects[value]
+        else:
+            out[key] = value
+    return out
+
+
+def _map_timeline(timeline: Dict[str, Any], fn) -> Dict[str, Any]:
+    """Copy of timeline with fn(event, fields) applied to every event in every container."""
+    out = dict(timeline)
+    if "events" in timeline:
+        fields = _CONTAINER_FIELDS["events"]
+        out["events"] = [fn(event, fields) for event in timeline["events"]]
+    if "tracks" in timeline:
+        fields = _CONTAINER_FIELDS["clips"]
+        tracks = []
+        for track in timeline["tracks"]:
+            track = dict(track)
+            if "clips" in track:
+                track["clips"] = [fn(event, fields) for event in track["clips"]]
+            tracks.append(track)
+        out["tracks"] = tracks
+    return out
+
+
+def collapse_canonical(canon: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the normalized layout of canon (already-normalized input is returned as-is)."""
+    if is_normalized(canon):
+        return canon
+    sources, effects = _Table(), _Table()
+    out = dict(canon)
+    if "timeline" in canon:
+        out["timeline"] = _map_timeline(
+            canon["timeline"], lambda event, fields: _collapse_event(event, fields, sources, effects)
+        )
+    out[SOURCES] = sources.rows
+    out[EFFECT_TEMPLATES] = effects.rows
+    return out
+
+
+def expand_canonical(canon: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return the expanded (one object per event) layout of canon.
+
+    Expanded events share their source/effect objects with the table rows; copy them
+    before mutating. Non-normalized input is returned as-is.
+    """
+    if not is_normalized(canon):
+        return canon
+    sources = canon.get(SOURCES, [])
+    effects = canon.get(EFFECT_TEMPLATES, [])
+    out = {k: v for k, v in canon.items() if k not in (SOURCES, EFFECT_TEMPLATES)}
+    if "timeline" in canon:
+        out["timeline"] = _map_timeline(
+            canon["timeline"], lambda event, fields: _expand_event(event, fields, sources, effects)
+        )
+    return out
+
+
+def iter_expanded_events(canon: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Yield timeline.events with source/effect resolved, for either layout."""
+    events: Iterable[Dict[str, Any]] = canon.get("timeline", {}).get("events", [])
+    if not is_normalized(canon):
+        yield from events
+        return
+    sources = canon.get(SOURCES, [])
+    effects = canon.get(EFFECT_TEMPLATES, [])
+    fields = _CONTAINER_FIELDS["events"]
+    for event in events:
+        yield _expand_event(event, fields, sources, effects)
+
+
+def _cli(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Convert canonical JSON between expanded and normalized layouts")
+    parser.add_argument("mode", choices=["collapse", "expand"])
+    parser.add_argument("canon_json", help="Input canonical JSON")
+    parser.add_argument("-o", "--out", default="-", help="Output JSON path (default: stdout)")
+    parser.add_argument("--indent", type=int, default=2, help="JSON indent (default: 2; -1 for compact)")
+    args = parser.parse_args(argv)
+
+    with open(args.canon_json, encoding="utf-8") as f:
+        canon = json.load(f)
+    converted = collapse_canonical(canon) if args.mode == "collapse" else expand_canonical(canon)
+    indent = None if args.indent < 0 else args.indent
+    text = json.dumps(converted, indent=indent)
+
+    if args.out == "-":
+        print(text)
+    else:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+        before = len(json.dumps(canon, indent=indent))
+        print(f"{args.mode}: {before} → {len(text)} bytes ({before / max(len(text), 1):.1f}x)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(_cli())
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+conversion_cost.py — Per-file conversion cost model and LPT scheduling for batch_convert
+
+A mixed drop handed to workers in directory order often ends with one large conform
+converting alone while the other workers idle. batch_convert orders conversions
+longest-predicted-first (LPT) instead, which keeps the makespan within 4/3 of optimal.
+
+The prediction is linear in features the fingerprint pass already collects (nothing
+is opened again):
+
+    seconds ≈ w0 + w1·size_MB + w2·objects/1000 + w3·effects/100
+
+Each conversion's measured time is recorded, and the weights are refit by ridge
+regression towards PRIOR_WEIGHTS. The model is persisted as JSON (by default next to
+the batch manifest, or shared via --cost-model), so estimates fit the machine and the
+kind of material after a few nightly runs.
+
+Usage:
+    model = CostModel.load("converted/.batch_cost_model.json")
+    costs = [model.predict(record) for record in records]     # {"size", "objects", "effects"}
+    for i in lpt_order(costs):
+        pool.submit(convert, records[i])
+    ...
+    model.observe(record, elapsed)
+    model.save()
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import logging
+import os
+from typing import Any, List, Mapping, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+MODEL_VERSION = 1
+
+FEATURES = ("size", "objects", "effects")
+
+# Feature scales: bytes → MB, objects per 1000, effects per 100
+_SCALES = (1 << 20, 1000, 100)
+
+# Starting weights (intercept, per MB, per 1000 objects, per 100 effects), measured on
+# a 2000-event timeline; replaced as timings accumulate
+PRIOR_WEIGHTS = (0.1, 0.02, 0.35, 0.5)
+
+# Most recent timings kept for refitting
+MAX_SAMPLES = 2000
+
+
+def feature_vector(features: Mapping[str, Any]) -> List[float]:
+    """[1, size_MB, objects/1000, effects/100]; missing features count as 0."""
+    return [1.0] + [float(features.get(name) or 0) / scale for name, scale in zip(FEATURES, _SCALES)]
+
+
+class CostModel:
+    """Linear conversion-time model fitted to observed timings; persisted as JSON."""
+
+    def __init__(self, path: Optional[str] = None, ridge: float = 1.0):
+        self.path = path
+        self.ridge = float(ridge)
+        self.samples: List[List[float]] = []    # [size, objects, effects, seconds]
+        self.weights: List[float] = list(PRIOR_WEIGHTS)
+        self._stale = False
+
+    @classmethod
+    def load(cls, path: str, ridge: float = 1.0) -> "CostModel":
+        """Model stored at path; a missing or unreadable file starts from the prior."""
+        model = cls(path, ridge)
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return model
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cost model {path}: {e}")
+            return model
+        if data.get("version") == MODEL_VERSION:
+            model.samples = [list(map(float, s)) for s in data.get("samples", [])][-MAX_SAMPLES:]
+            model.fit()
+        return model
+
+    def save(self, path: Optional[str] = None) -> None:
+        path = path or self.path
+        if path is None:
+            return
+        if self._stale:
+            self.fit()
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": MODEL_VERSION,
+                    "features": list(FEATURES),
+                    "weights": [round(w, 6) for w in self.weights],
+                    "samples": self.samples,
+                },
+                f,
+            )
+        os.replace(tmp, path)
+
+    def predict(self, features: Mapping[str, Any]) -> float:
+        """Predicted conversion seconds (never below zero)."""
+        if self._stale:
+            self.fit()
+        return max(sum(w * x for w, x in zip(self.weights, feature_vector(features))), 0.0)
+
+    def observe(self, features: Mapping[str, Any], seconds: float) -> None:
+        """Record one measured conversion; the next predict() or save() refits."""
+        self.samples.append([float(features.get(name) or 0) for name in FEATURES] + [float(seconds)])
+        del self.samples[:-MAX_SAMPLES]
+        self._stale = True
+
+    def fit(self) -> None:
+        """Ridge least squares towards PRIOR_WEIGHTS: (XᵀX + λI)w = Xᵀy + λ·prior."""
+        n = len(PRIOR_WEIGHTS)
+        a = [[self.ridge if i == j else 0.0 for j in range(n)] for i in range(n)]
+        b = [self.ridge * p for p in PRIOR_WEIGHTS]
+        for sample in self.samples:
+            x = feature_vector(dict(zip(FEATURES, sample)))
+            y = sample[-1]
+            for i in range(n):
+                b[i] += x[i] * y
+                for j in range(n):
+                    a[i][j] += x[i] * x[j]
+        self.weights = _solve(a, b)
+        self._stale = False
+
+
+def _solve(a: List[List[float]], b: List[float]) -> List[float]:
+    """Gaussian elimination with partial pivoting (a is positive definite here)."""
+    n = len(b)
+    m = [row[:] + [b[i]] for i, row in enumerate(a)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(m[r][col]))
+        m[col], m[pivot] = m[pivot], m[col]
+        for r in range(col + 1, n):
+            factor = m[r][col] / m[col][col]
+            for c in range(col, n + 1):
+                m[r][c] -= factor * m[col][c]
+    x = [0.0] * n
+    for r in reversed(range(n)):
+        x[r] = (m[r][n] - sum(m[r][c] * x[c] for c in range(r + 1, n))) / m[r][r]
+    return x
+
+
+def lpt_order(costs: Sequence[float]) -> List[int]:
+    """Indices by descending cost (ties in input order): the submission order for LPT."""
+    return sorted(range(len(costs)), key=lambda i: -costs[i])
+
+
+def makespan(costs: Sequence[float], workers: int, order: Optional[Sequence[int]] = None) -> float:
+    """Finish time when `workers` take jobs in `order` (default: input order) as they free up."""
+    finish = [0.0] * max(int(workers), 1)
+    for i in (range(len(costs)) if order is None else order):
+        heapq.heappush(finish, heapq.heappop(finish) + costs[i])
+    return max(finish)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+event_model.py — Slotted event model used inside build_canonical
+
+The builder used to emit every event as nested dicts (event → effect_params), paying
+several dict allocations and repeated key strings per event. Events are now frozen
+slotted dataclasses while the timeline is built; the dict form only exists at the
+output boundary via Event.to_canonical().
+
+to_canonical() emits exactly the clip dict shape build_canonical_from_aaf() returned
+before this model existed:
+    {"name", "in", "out", "source_umid", "source_path",
+     "effect_params": {"operation", "parameters"}}
+Retimed events (Motion Effect / Timewarp, see retime_curves.py) add
+    "source_range": {"in", "out", "retime"}
+with the source frames actually played; other events are unchanged.
+
+Hash-consed parameter sets (FrozenParameters) are emitted as-is rather than copied,
+so events sharing a set also share it in the canonical output.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class FrozenParameters(dict):
+    """
+    Read-only parameter dict shared by every event with the same decoded parameter set.
+
+    A dict subclass so the canonical output serializes it directly (json, pickle)
+    without a per-event copy; mutation raises TypeError.
+    """
+
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("shared parameter set is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return (FrozenParameters, (dict(self),))
+
+
+@dataclass(frozen=True, slots=True)
+class Source:
+    """Resolved source of a clip event (UMID plus Locator path, when known)."""
+
+    umid: str
+    path: Optional[str]
+
+
+@dataclass(frozen=True, slots=True)
+class Effect:
+    """OperationGroup applied to an event; operation "N/A" for plain clips."""
+
+    operation: str
+    parameters: Dict[str, Any]
+
+    def to_canonical(self) -> Dict[str, Any]:
+        parameters = self.parameters
+        if not isinstance(parameters, FrozenParameters):
+            parameters = dict(parameters)
+        return {"operation": self.operation, "parameters": parameters}
+
+
+@dataclass(frozen=True, slots=True)
+class SourceRange:
+    """Source frames a retimed event plays; positions[i] is the source frame at event frame i."""
+
+    source_in: float
+    source_out: float
+    retime: str
+    positions: Tuple[float, ...] = field(default=(), compare=False, repr=False)
+
+    @classmethod
+    def from_positions(cls, positions, retime: str) -> "SourceRange":
+        positions = tuple(positions)
+        return cls(positions[0], positions[-1], retime, positions)
+
+    def sliced(self, start: int, end: int) -> "SourceRange":
+        """Range played by event frames [start, end)."""
+        if not self.positions:
+            return self
+        return SourceRange.from_positions(self.positions[start:end + 1], self.retime)
+
+    def to_canonical(self) -> Dict[str, Any]:
+        return {"in": round(self.source_in, 3), "out": round(self.source_out, 3), "retime": self.retime}
+
+
+@dataclass(frozen=True, slots=True)
+class Event:
+    """One timeline event covering [timeline_in, timeline_out) in edit units."""
+
+    name: str
+    timeline_in: int
+    timeline_out: int
+    source: Source
+    effect: Effect
+    source_range: Optional[SourceRange] = None
+
+    def rebased(self, timeline_in: int, timeline_out: int) -> "Event":
+        """Copy of this event moved to a new timeline span (nested composition reuse)."""
+        return replace(self, timeline_in=timeline_in, timeline_out=timeline_out)
+
+    def clipped(self, clip_in: int, clip_out: int, shift: int = 0) -> "Event":
+        """Copy covering [clip_in, clip_out) of this event, moved by shift; source range sliced to match."""
+        event = replace(self, timeline_in=clip_in + shift, timeline_out=clip_out + shift)
+        if self.source_range is not None and (clip_in, clip_out) != (self.timeline_in, self.timeline_out):
+            event = replace(event, source_range=self.source_range.sliced(clip_in - self.timeline_in, clip_out - self.timeline_in))
+        return event
+
+    def to_canonical(self) -> Dict[str, Any]:
+        canon = {
+            "name": self.name,
+            "in": self.timeline_in,
+            "out": self.timeline_out,
+            "source_umid": self.source.umid,
+            "source_path": self.source.path,
+            "effect_params": self.effect.to_canonical(),
+        }
+        if self.source_range is not None:
+            canon["source_range"] = self.source_range.to_canonical()
+        return canon
+
+
+def events_to_canonical(events: List[Event]) -> List[Dict[str, Any]]:
+    """Canonical clip dicts for `events`, emptying the list as it goes so converted events can be freed."""
+    events.reverse()
+    canonical = []
+    while events:
+        canonical.append(events.pop().to_canonical())
+    return canonical
+
+
+# Shared parameters and effect for plain clip events
+NO_PARAMETERS = FrozenParameters()
+NO_EFFECT = Effect("N/A", NO_PARAMETERS)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+keyframe_bake.py — Frame-grid baking of keyframed parameters Resolve cannot interpolate
+
+Resolve imports linear keyframes faithfully, but not Avid's Bezier curves with custom
+tangents, cubic/B-spline ("shelf"/spline) curves or holds. The builder can bake those
+tracks after extract_keyframe_timing_data(): the curve is evaluated at every Nth frame
+of the event in one batch (retime_curves.Curve: NumPy when installed, pure Python
+otherwise), and the samples replace the original keyframes.
+
+Per-parameter modes:
+    keep        leave the keyframes as extracted
+    bake        one sample every `step` frames (plus the last frame)
+    decimate    bake, then drop samples the remaining ones reproduce by linear
+                interpolation within `tolerance` (Ramer-Douglas-Peucker)
+
+`default` applies to tracks whose interpolation is not linear; `parameters` overrides
+the mode per parameter name for any interpolation.
+
+Usage:
+    bake = KeyframeBake(default="decimate", parameters={"AFX_BLUR": "bake"}, step=2)
+    canon = build_canonical_from_aaf("cut.aaf", keyframe_bake=bake)
+    print(bake.report())   # "Baked 12 of 40 animated parameters: 96 keyframes → 811 samples (+715)"
+
+CLI: build_canonical.py --bake-keyframes [bake|decimate] [--bake-step N]
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+try:
+    from .retime_curves import HAS_NUMPY, Curve, np
+except ImportError:  # executed as a script
+    from retime_curves import HAS_NUMPY, Curve, np
+
+BAKE_MODES = ("keep", "bake", "decimate")
+
+# Interpolations Resolve represents without baking
+SUPPORTED_KINDS = ("linear",)
+
+
+class KeyframeBake:
+    """Bake policy for one or more builds, plus counters of what it added."""
+
+    def __init__(
+        self,
+        default: str = "bake",
+        parameters: Optional[Mapping[str, str]] = None,
+        step: int = 1,
+        tolerance: float = 1e-3,
+    ):
+        for mode in [default, *(parameters or {}).values()]:
+            if mode not in BAKE_MODES:
+                raise ValueError(f"bake mode must be one of {BAKE_MODES}, got {mode!r}")
+        if step < 1:
+            raise ValueError(f"step must be >= 1, got {step}")
+        self.default = default
+        self.parameters: Dict[str, str] = dict(parameters or {})
+        self.step = int(step)
+        self.tolerance = float(tolerance)
+        self.animated = 0       # animated parameters seen
+        self.baked = 0          # of those, baked
+        self.keyframes = 0      # keyframes replaced by baking
+        self.samples = 0        # samples emitted in their place
+        self.decimated = 0      # samples dropped again by decimation
+        self.by_parameter: Dict[str, Dict[str, int]] = {}
+
+    def mode_for(self, name: str, kind: str) -> str:
+        """Mode for a parameter: explicit per-name mode, else `default` unless Resolve supports `kind`."""
+        mode = self.parameters.get(name)
+        if mode is not None:
+            return mode
+        return "keep" if kind in SUPPORTED_KINDS else self.default
+
+    def bake(self, name: str, curve: Curve, length: int) -> Optional[Tuple[List[int], List[float]]]:
+        """(frames, values) sampled from curve over frames 0..length-1, or None to keep the keyframes."""
+        self.animated += 1
+        mode = self.mode_for(name, curve.kind)
+        if mode == "keep" or length <= 0:
+            return None
+
+        frames = list(range(0, length, self.step))
+        if frames[-1] != length - 1:
+            frames.append(length - 1)
+        values = curve.evaluate(frames)
+        n_baked = len(frames)
+        if mode == "decimate" and n_baked > 2:
+            keep = decimate(frames, values, self.tolerance)
+            frames = [frames[i] for i in keep]
+            values = [values[i] for i in keep]
+
+        self.baked += 1
+        self.keyframes += len(curve.times)
+        self.samples += len(frames)
+        self.decimated += n_baked - len(frames)
+        row = self.by_parameter.setdefault(name, {"baked": 0, "keyframes": 0, "samples": 0})
+        row["baked"] += 1
+        row["keyframes"] += len(curve.times)
+        row["samples"] += len(frames)
+        return frames, values
+
+    @property
+    def samples_added(self) -> int:
+        return self.samples - self.keyframes
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "animated": self.animated,
+            "baked": self.baked,
+            "keyframes": self.keyframes,
+            "samples": self.samples,
+            "samples_added": self.samples_added,
+            "decimated": self.decimated,
+            "by_parameter": {name: dict(row) for name, row in sorted(self.by_parameter.items())},
+        }
+
+    def report(self) -> str:
+        s = self.stats()
+        return (
+            f"Baked {s['baked']} of {s['animated']} animated parameters: {s['keyframes']} keyframes → "
+            f"{s['samples']} samples ({s['samples_added']:+d}, {s['decimated']} dropped by decimation)"
+        )
+
+
+def decimate(frames: Sequence[float], values: Sequence[float], tolerance: float) -> List[int]:
+    """Indices of the samples to keep so linear interpolation stays within tolerance (RDP)."""
+    n = len(frames)
+    if n <= 2:
+        return list(range(n))
+    keep = [False] * n
+    keep[0] = keep[-1] = True
+    if HAS_NUMPY:
+        x = np.asarray(frames, dtype=float)
+        y = np.asarray(values, dtype=float)
+    stack = [(0, n - 1)]
+    while stack:
+        lo, hi = stack.pop()
+        if hi - lo < 2:
+            continue
+        if HAS_NUMPY:
+            xs, ys = x[lo + 1:hi], y[lo + 1:hi]
+            line = y[lo] + (y[hi] - y[lo]) * (xs - x[lo]) / (x[hi] - x[lo])
+            errors = np.abs(ys - line)
+            i = int(np.argmax(errors))
+            worst = float(errors[i])
+        else:
+            x0, y0, x1, y1 = frames[lo], values[lo], frames[hi], values[hi]
+            worst, i = -1.0, 0
+            for j in range(lo + 1, hi):
+                err = abs(values[j] - (y0 + (y1 - y0) * (frames[j] - x0) / (x1 - x0)))
+                if err > worst:
+                    worst, i = err, j - lo - 1
+        if worst > tolerance:
+            mid = lo + 1 + i
+            keep[mid] = True
+            stack.append((lo, mid))
+            stack.append((mid, hi))
+    return [i for i in range(n) if keep[i]]
@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+legacy_export.py — Streaming legacy compressed-JSON export
+
+Recreates the Enhanced AAF Inspector export described in
+docs/legacy_compressed_json_rules.md: a JSON dump of the top CompositionMob in which
+values normally found down the UMID chain (locator path, TapeID, DiskLabel, source
+timecode and rate) are inlined on each SourceClip, so historical SuperEDL output can
+be diffed against the new pipeline.
+
+The tree is written depth-first as it is read. Slots, components and input segments
+are loaded one at a time by index and, once serialized, dropped from pyaaf2's
+per-vector object cache (files opened read-only), so the loaded object tree is
+bounded by nesting depth plus the resolver memo (one entry per distinct referenced
+mob), not by timeline length. pyaaf2 itself still keeps a fixed-size read cache
+(the last 512 objects) and the compound-file directory listing of each storage it
+reads (a few hundred bytes per child entry).
+
+Layout:
+    {"format": "legacy_compressed_json", "version": 1, "file": "...",
+     "CompositionMob": {"Name": "...", "MobID": "...", "Slots": [
+        {"SlotID": 1, "EditRate": 25.0, "Segment":
+            {"class": "Sequence", "Length": 300, "Components": [
+                {"class": "SourceClip", "Length": 100, "StartTime": 0, "SourceID": "...",
+                 "SourceMobSlotID": 1, "Resolved": {"path": ..., "tape_id": ..., ...}},
+                {"class": "OperationGroup", "Length": 40, "Operation": "...",
+                 "Parameters": [{"Name": "Level", "Value": 0.5}],
+                 "InputSegments": [...]},
+                {"class": "Filler", "Length": 50}]}}]}}
+
+Usage:
+    python src/legacy_export.py timeline.aaf -o timeline.legacy.json.gz   # gzip by suffix
+    python src/legacy_export.py timeline.aaf --gzip > timeline.legacy.json.gz
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import io
+import json
+import logging
+import sys
+from typing import IO, Any, Dict, Iterator, Optional
+
+try:
+    from .build_canonical import (
+        HAS_AAF2,
+        _clean_parameter_value,
+        _find_nested_source_clip_deep,
+        _iter_safe,
+        aaf2,
+        choose_top_composition,
+        extract_effect_name_from_operation_group,
+        extract_keyframe_timing_data,
+        extract_source_info_from_mob,
+        iter_parameters,
+        list_composition_mobs,
+        param_name,
+    )
+except ImportError:  # executed as a script: python src/legacy_export.py
+    from build_canonical import (
+        HAS_AAF2,
+        _clean_parameter_value,
+        _find_nested_source_clip_deep,
+        _iter_safe,
+        aaf2,
+        choose_top_composition,
+        extract_effect_name_from_operation_group,
+        extract_keyframe_timing_data,
+        extract_source_info_from_mob,
+        iter_parameters,
+        list_composition_mobs,
+        param_name,
+    )
+
+logger = logging.getLogger(__name__)
+
+FORMAT_NAME = "legacy_compressed_json"
+FORMAT_VERSION = 1
+
+# Bytes buffered before each write to the (possibly gzip) output stream
+_WRITE_BUFFER = 1 << 16
+
+# Longest MasterMob → SourceMob → ... chain followed before giving up
+_MAX_CHAIN = 32
+
+
+class SourceResolver:
+    """
+    Memoized UMID-chain resolution: each referenced mob is walked once per export, by
+    following SourceClip.mob references down to the mob carrying the descriptor.
+    """
+
+    def __init__(self) -> None:
+        self._memo: Dict[str, Optional[Dict[str, Any]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, source_clip) -> Optional[Dict[str, Any]]:
+        mob_id = getattr(source_clip, "mob_id", None)
+        if not mob_id:
+            return None
+        key = str(mob_id)
+        if key in self._memo:
+            self.hits += 1
+            return self._memo[key]
+        self.misses += 1
+        try:
+            mob = source_clip.mob
+        except Exception:
+            mob = None
+        resolved = self._memo[key] = self._resolve(mob) if mob is not None else None
+        return resolved
+
+    def _resolve(self, mob) -> Optional[Dict[str, Any]]:
+        if "CompositionMob" in type(mob).__name__:
+            return {"composition": str(getattr(mob, "name", "") or ""), "umid": str(mob.mob_id)}
+        end = _end_of_chain(mob)
+        if end is None:
+            return None
+        info = extract_source_info_from_mob(end)
+        resolved = {
+            "path": info.get("source_path") or _descriptor_path(end.descriptor),
+            "clip_name": str(getattr(mob, "name", "") or info.get("clip_name")),
+            "umid": str(end.mob_id),
+            "tape_id": info.get("tape_id"),
+            "disk_label": info.get("disk_label"),
+        }
+        resolved.update(_source_timing(end))
+        return resolved
+
+
+def _end_of_chain(mob):
+    """Last mob of the chain starting at mob: the first one with a descriptor."""
+    for _ in range(_MAX_CHAIN):
+        if getattr(mob, "descriptor", None) is not None:
+            return mob
+        next_mob = None
+        for slot in _iter_safe(getattr(mob, "slots", [])):
+            source_clip = _find_nested_source_clip_deep(getattr(slot, "segment", None))
+            if source_clip is not None:
+                try:
+                    next_mob = source_clip.mob
+                except Exception:
+                    next_mob = None
+                break
+        if next_mob is None or next_mob is mob:
+            return None
+        mob = next_mob
+    logger.warning(f"Mob chain longer than {_MAX_CHAIN} at {getattr(mob, 'mob_id', '?')}")
+    return None
+
+
+def _descriptor_path(descriptor) -> Optional[str]:
+    """First locator URL of a descriptor (pyaaf2 keeps them in the Locator property)."""
+    try:
+        locators = descriptor["Locator"].value or []
+    except Exception:
+        return None
+    for locator in locators:
+        try:
+            url = locator["URLString"].value
+        except Exception:
+            continue
+        if url:
+            return str(url)
+    return None
+
+
+def _source_timing(mob) -> Dict[str, Any]:
+    """src_tc_start_frames / src_rate_fps / src_drop from the end-of-chain SourceMob."""
+    timing: Dict[str, Any] = {"src_tc_start_frames": None, "src_rate_fps": None, "src_drop": None}
+    if mob is None:
+        return timing
+    for slot in _iter_safe(getattr(mob, "slots", [])):
+        segment = getattr(slot, "segment", None)
+        if timing["src_rate_fps"] is None and hasattr(slot, "edit_rate"):
+            timing["src_rate_fps"] = float(slot.edit_rate)
+        if segment is not None and "Timecode" in type(segment).__name__:
+            timing["src_tc_start_frames"] = int(getattr(segment, "start", 0))
+            timing["src_drop"] = bool(getattr(segment, "drop", False))
+            timing["src_rate_fps"] = float(slot.edit_rate) if hasattr(slot, "edit_rate") else timing["src_rate_fps"]
+            break
+    return timing
+
+
+def _parameter_node(param) -> Dict[str, Any]:
+    node: Dict[str, Any] = {"Name": str(param_name(param))}
+    keyframes = extract_keyframe_timing_data(param)
+    if keyframes:
+        node["PointList"] = [{"Time": kf["normalized_time"], "Value": kf["value"]} for kf in keyframes["keyframes"]]
+    else:
+        try:
+            node["Value"] = _clean_parameter_value(param.value)
+        except Exception:
+            node["Value"] = None
+    return node
+
+
+def _iter_children(obj, key: str) -> Iterator[Any]:
+    """
+    Children in the strong-ref vector obj[key], loaded one at a time by index.
+
+    pyaaf2 keeps every loaded child in the vector's `objects` cache; for files opened
+    read-only each child is dropped from it once the caller moves on. In-memory and
+    writable files keep theirs (the cache is their only copy or holds pending edits).
+    """
+    prop = obj.get(key)
+    if not hasattr(prop, "objects"):
+        yield from _iter_safe(prop)
+        return
+    release = prop.attached and not prop.parent.root.writeable
+    for i in range(len(prop)):
+        yield prop.get(i)
+        if release:
+            prop.objects.pop(i, None)
+
+
+def _iter_segment(segment, resolver: SourceResolver) -> Iterator[str]:
+    """JSON text of one segment, depth-first; children are loaded one at a time."""
+    kind = type(segment).__name__
+    head: Dict[str, Any] = {"class": kind, "Length": int(getattr(segment, "length", 0) or 0)}
+
+    if "SourceClip" in kind:
+        mob_id = getattr(segment, "mob_id", None)
+        head["StartTime"] = int(getattr(segment, "start", 0) or 0)
+        head["SourceID"] = str(mob_id) if mob_id else None
+        head["SourceMobSlotID"] = getattr(segment, "slot_id", None)
+        head["Resolved"] = resolver.resolve(segment)
+        yield json.dumps(head)
+        return
+
+    if "OperationGroup" in kind:
+        head["Operation"] = extract_effect_name_from_operation_group(segment)
+        head["Parameters"] = [_parameter_node(p) for p in iter_parameters(segment)]
+        yield from _iter_container(head, "InputSegments", _iter_children(segment, "InputSegments"), resolver)
+        return
+
+    if "Sequence" in kind:
+        yield from _iter_container(head, "Components", _iter_children(segment, "Components"), resolver)
+        return
+
+    if "Timecode" in kind:
+        head["Start"] = int(getattr(segment, "start", 0) or 0)
+        head["FPS"] = getattr(segment, "fps", None)
+        head["Drop"] = bool(getattr(segment, "drop", False))
+    yield json.dumps(head)
+
+
+def _iter_container(head: Dict[str, Any], key: str, children, resolver: SourceResolver) -> Iterator[str]:
+    """`head` with a `key` array streamed from `children`."""
+    yield json.dumps(head)[:-1] + f', "{key}": ['
+    for i, child in enumerate(children):
+        if i:
+            yield ", "
+        yield from _iter_segment(child, resolver)
+    yield "]}"
+
+
+def iter_legacy_json(aaf, aaf_path: str = "") -> Iterator[str]:
+    """Text fragments of the legacy export of the top composition of an open AAF."""
+    # Same composition as select_top_sequence(), without its start-timecode search
+    # (which would load the whole picture track up front)
+    comp = choose_top_composition(list_composition_mobs(aaf))
+    resolver = SourceResolver()
+    header = {"format": FORMAT_NAME, "version": FORMAT_VERSION, "file": str(aaf_path)}
+    yield json.dumps(header)[:-1] + ', "CompositionMob": '
+    mob_head = {"Name": str(getattr(comp, "name", "") or ""), "MobID": str(getattr(comp, "mob_id", ""))}
+    yield json.dumps(mob_head)[:-1] + ', "Slots": ['
+    for i, slot in enumerate(_iter_children(comp, "Slots")):
+        if i:
+            yield ", "
+        slot_head = {
+            "SlotID": getattr(slot, "slot_id", None),
+            "EditRate": float(slot.edit_rate) if hasattr(slot, "edit_rate") else None,
+        }
+        segment = getattr(slot, "segment", None)
+        yield json.dumps(slot_head)[:-1] + ', "Segment": '
+        if segment is None:
+            yield "null"
+        else:
+            yield from _iter_segment(segment, resolver)
+        yield "}"
+    yield "]}}\n"
+    logger.info(f"Resolver: {resolver.misses} mobs resolved, {resolver.hits} reused")
+
+
+def export_legacy_json(aaf_path: str, out: IO[str]) -> int:
+    """Stream the legacy export of aaf_path to a text stream; returns characters written."""
+    if not HAS_AAF2:
+        raise ImportError("aaf2 is required. Install with: pip install pyaaf2")
+
+    written = 0
+    buffer = io.StringIO()
+    with aaf2.open(str(aaf_path), "r") as f:
+        for fragment in iter_legacy_json(f, aaf_path):
+            buffer.write(fragment)
+            if buffer.tell() >= _WRITE_BUFFER:
+                written += out.write(buffer.getvalue())
+                buffer.seek(0)
+                buffer.truncate()
+    written += out.write(buffer.getvalue())
+    return written
+
+
+def open_legacy_output(path: str, compress: bool = False) -> IO[str]:
+    """Text stream for path ("-" for stdout); gzip when compress or path ends in .gz."""
+    if path == "-":
+        return gzip.open(sys.stdout.buffer, "wt", encoding="utf-8") if compress else sys.stdout
+    if compress or path.endswith(".gz"):
+        return gzip.open(path, "wt", encoding="utf-8")
+    return open(path, "w", encoding="utf-8")
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Stream the legacy compressed-JSON export of an AAF's top composition")
+    parser.add_argument("aaf", help="Input AAF")
+    parser.add_argument("-o", "--out", default="-", help="Output path (default: stdout; *.gz is gzip-compressed)")
+    parser.add_argument("--gzip", action="store_true", help="gzip the output regardless of suffix")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    out = open_legacy_output(args.out, args.gzip)
+    try:
+        written = export_legacy_json(args.aaf, out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if args.out != "-":
+        logger.info(f"Legacy JSON ({written} characters) written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
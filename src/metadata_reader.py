@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+metadata_reader.py — Metadata-only AAF reads with per-stream byte accounting
+
+AAFs with embedded essence can be several GB, almost all of it EssenceData streams the
+converter never needs. open_metadata_only() opens an AAF read-only through a counting
+file object and guards every compound-file stream open:
+
+- Every byte and read() reaching the OS file is counted, attributed to the stream
+  being read, or to "(structure)" for the header, FAT/DIFAT/miniFAT and directory
+- Essence streams (the Data stream of each EssenceData object) are refused
+  (EssenceAccessError), skipped (read as empty) or allowed, per `essence=`
+- ReadAccounting.report() gives the per-stream breakdown at the end of a build
+
+Usage:
+    accounting = ReadAccounting()                       # essence="refuse"
+    canon = build_canonical_from_aaf("big.aaf", read_accounting=accounting)
+    print(accounting.report())
+    accounting.fraction_read   # 0.004: 0.4% of the file was read
+
+CLI: build_canonical.py --metadata-only logs the same report.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+try:
+    import aaf2
+    from aaf2.cfb import CompoundFileBinary
+    from aaf2.file import AAFFactory, AAFFile, AAFObjectManager
+    from aaf2.metadict import MetaDictionary
+    HAS_AAF2 = True
+except ImportError:
+    aaf2 = None
+    HAS_AAF2 = False
+
+logger = logging.getLogger(__name__)
+
+ESSENCE_POLICIES = ("refuse", "skip", "allow")
+
+# Label for reads outside any stream (header, FAT/DIFAT/miniFAT sectors, directory entries)
+STRUCTURE = "(structure)"
+
+# Compound-file streams pyaaf2 keeps object metadata in; anything else is StreamProperty data
+_METADATA_STREAMS = ("properties", "referenced properties")
+
+
+class EssenceAccessError(IOError):
+    """An essence stream was opened while reading metadata-only with essence="refuse"."""
+
+
+def is_essence_stream(entry) -> bool:
+    """True for the payload stream of an EssenceData object ("/.../EssenceData-1902{0}/Data-2702")."""
+    name = entry.name
+    if name in _METADATA_STREAMS or name.endswith(" index"):
+        return False
+    return "/EssenceData-" in entry.path()
+
+
+class StreamStats:
+    """Reads of one compound-file stream."""
+
+    __slots__ = ("path", "essence", "opens", "reads", "bytes", "file_reads", "file_bytes", "refused", "skipped")
+
+    def __init__(self, path: str, essence: bool = False):
+        self.path = path
+        self.essence = essence
+        self.opens = 0
+        self.reads = 0          # stream.read() calls
+        self.bytes = 0          # bytes returned by stream.read()
+        self.file_reads = 0     # reads reaching the file (sector cache misses)
+        self.file_bytes = 0     # bytes those reads returned
+        self.refused = 0
+        self.skipped = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class ReadAccounting:
+    """Per-stream read counters for one metadata-only open, plus the essence policy."""
+
+    def __init__(self, essence: str = "refuse"):
+        if essence not in ESSENCE_POLICIES:
+            raise ValueError(f"essence must be one of {ESSENCE_POLICIES}, got {essence!r}")
+        self.essence = essence
+        self.file_size = 0
+        self.file_reads = 0
+        self.file_bytes = 0
+        self.streams: Dict[str, StreamStats] = {STRUCTURE: StreamStats(STRUCTURE)}
+        self._current = self.streams[STRUCTURE]
+
+    def _stream(self, entry) -> StreamStats:
+        path = entry.path()
+        stats = self.streams.get(path)
+        if stats is None:
+            stats = self.streams[path] = StreamStats(path, is_essence_stream(entry))
+        return stats
+
+    def _file_read(self, n: int) -> None:
+        self.file_reads += 1
+        self.file_bytes += n
+        current = self._current
+        current.file_reads += 1
+        current.file_bytes += n
+
+    @property
+    def fraction_read(self) -> float:
+        """Bytes read from the file over its size."""
+        return self.file_bytes / self.file_size if self.file_size else 0.0
+
+    @property
+    def essence_bytes(self) -> int:
+        return sum(s.file_bytes for s in self.streams.values() if s.essence)
+
+    def stats(self) -> Dict[str, Any]:
+        essence = [s for s in self.streams.values() if s.essence]
+        return {
+            "file_size": self.file_size,
+            "file_reads": self.file_reads,
+            "file_bytes": self.file_bytes,
+            "fraction_read": round(self.fraction_read, 6),
+            "streams": len(self.streams) - 1,
+            "essence_streams": len(essence),
+            "essence_bytes": self.essence_bytes,
+            "essence_refused": sum(s.refused for s in essence),
+            "essence_skipped": sum(s.skipped for s in essence),
+        }
+
+    def breakdown(self, top: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Per-stream counters, largest file_bytes first."""
+        rows = sorted(self.streams.values(), key=lambda s: (-s.file_bytes, s.path))
+        return [s.as_dict() for s in rows[:top]]
+
+    def report(self, top: int = 10) -> str:
+        """Human-readable summary and the `top` streams by bytes read from the file."""
+        s = self.stats()
+        lines = [
+            f"Read {s['file_bytes']} of {s['file_size']} bytes ({s['fraction_read']:.2%}) in "
+            f"{s['file_reads']} reads across {s['streams']} streams; essence: {s['essence_bytes']} bytes, "
+            f"{s['essence_refused']} refused, {s['essence_skipped']} skipped opens",
+            f"  {'file bytes':>12} {'reads':>7} {'stream bytes':>13}  stream",
+        ]
+        for row in self.breakdown(top):
+            flag = " [essence]" if row["essence"] else ""
+            lines.append(f"  {row['file_bytes']:12d} {row['file_reads']:7d} {row['bytes']:13d}  {row['path']}{flag}")
+        return "\n".join(lines)
+
+
+class _CountingFile:
+    """Unbuffered binary file counting every read into the active ReadAccounting stream."""
+
+    def __init__(self, raw, accounting: ReadAccounting):
+        self._raw = raw
+        self._accounting = accounting
+
+    def read(self, n: int = -1) -> bytes:
+        data = self._raw.read(n)
+        self._accounting._file_read(len(data))
+        return data
+
+    def readinto(self, buffer) -> int:
+        n = self._raw.readinto(buffer) or 0
+        self._accounting._file_read(n)
+        return n
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+class _AccountedStream:
+    """pyaaf2 cfb.Stream proxy attributing its reads to one StreamStats."""
+
+    __slots__ = ("_stream", "_stats", "_accounting")
+
+    def __init__(self, stream, stats: StreamStats, accounting: ReadAccounting):
+        self._stream = stream
+        self._stats = stats
+        self._accounting = accounting
+
+    def read(self, n: int = -1):
+        accounting = self._accounting
+        previous, accounting._current = accounting._current, self._stats
+        try:
+            data = self._stream.read(n)
+        finally:
+            accounting._current = previous
+        self._stats.reads += 1
+        self._stats.bytes += len(data)
+        return data
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class _SkippedStream:
+    """Stand-in for an essence stream under essence="skip": empty, never touches the file."""
+
+    def __init__(self, stats: StreamStats):
+        self._stats = stats
+
+    def read(self, n: int = -1) -> bytes:
+        self._stats.reads += 1
+        return b""
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return 0
+
+    def tell(self) -> int:
+        return 0
+
+    def close(self) -> None:
+        pass
+
+
+def _guarded_open(cfb, accounting: ReadAccounting):
+    """Replacement for cfb.open (every DirEntry.open goes through it) applying the policy."""
+    original = cfb.open
+
+    def open(path, mode="r"):
+        entry = cfb.find(path) if isinstance(path, str) else path
+        if entry is None:
+            return original(path, mode)
+        stats = accounting._stream(entry)
+        stats.opens += 1
+        if stats.essence:
+            if accounting.essence == "refuse":
+                stats.refused += 1
+                raise EssenceAccessError(f"essence stream {stats.path} opened in metadata-only mode")
+            if accounting.essence == "skip":
+                stats.skipped += 1
+                logger.debug(f"Skipping essence stream {stats.path}")
+                return _SkippedStream(stats)
+        return _AccountedStream(original(entry, mode), stats, accounting)
+
+    return open
+
+
+if HAS_AAF2:
+
+    class MetadataOnlyAAFFile(AAFFile):
+        """Read-only AAFFile whose file object and stream opens go through a ReadAccounting."""
+
+        def __init__(self, path: str, accounting: ReadAccounting):
+            # Mirrors AAFFile.__init__ for mode "rb" with the counting file in place of
+            # io.open(), and stream opens guarded before the first stream is read
+            self.mode = "rb"
+            accounting.file_size = os.path.getsize(path)
+            self.f = _CountingFile(io.open(path, "rb", buffering=0), accounting)
+            try:
+                self.cfb = CompoundFileBinary(self.f, self.mode)
+                self.cfb.open = _guarded_open(self.cfb, accounting)
+                self.weakref_table = []
+                self.manager = AAFObjectManager(self)
+                self.create = AAFFactory(self)
+                self.is_open = True
+
+                self.read_reference_properties()
+                self.metadict = MetaDictionary(self)
+                self.metadict.dir = self.cfb.find('/MetaDictionary-1')
+                self.manager['/MetaDictionary-1'] = self.metadict
+                self.root = self.manager.read_object("/")
+                self.metadict.read_properties()
+            except Exception:
+                self.f.close()
+                raise
+            self.accounting = accounting
+
+
+def open_metadata_only(path: str, accounting: Optional[ReadAccounting] = None):
+    """Open an AAF read-only in metadata-only mode; use as `with open_metadata_only(p, acc) as f:`."""
+    if not HAS_AAF2:
+        raise ImportError("aaf2 is required. Install with: pip install pyaaf2")
+    return MetadataOnlyAAFFile(str(path), accounting if accounting is not None else ReadAccounting())
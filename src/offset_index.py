@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+offset_index.py — Component offset index for time-window extraction
+
+build_canonical_from_aaf(time_range=...) only needs the components of the picture
+Sequence that intersect the window. Without an index the builder still has to read
+every top-level component's length to find them; with one it bisects straight to the
+first intersecting component and reads nothing outside the window.
+
+- SequenceOffsetIndex: start offset + length per top-level component of a Sequence
+- offset_index_for(): in-memory cache (per file size/mtime) with an optional JSON
+  sidecar, so repeated range queries against the same AAF are sub-linear
+
+Sidecar layout (<file>.aaf.offsets.json by default):
+    {"version": 1, "size": 123, "mtime_ns": 456,
+     "sequences": {"<mob_id>:<slot_id>": {"lengths": [10, 5, 20, ...]}}}
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SIDECAR_VERSION = 1
+SIDECAR_SUFFIX = ".offsets.json"
+
+# In-memory indexes keyed by (path, size, mtime_ns, sequence key); oldest evicted first
+_MEMORY_CACHE_SIZE = 32
+_memory_cache: "OrderedDict[Tuple[Any, ...], SequenceOffsetIndex]" = OrderedDict()
+
+
+class SequenceOffsetIndex:
+    """Start offset and length of each top-level component of one Sequence."""
+
+    def __init__(self, lengths: List[int]):
+        self.lengths = list(lengths)
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        offset = 0
+        for length in self.lengths:
+            self.starts.append(offset)
+            offset += length
+            self.ends.append(offset)
+        self.end = offset
+
+    @classmethod
+    def from_sequence(cls, sequence) -> "SequenceOffsetIndex":
+        """Read each component's length once (same offset arithmetic as _process_sequence)."""
+        return cls([int(getattr(c, "length", 0) or 0) for c in sequence.components])
+
+    def component_range(self, start: int, end: int) -> range:
+        """Indices of components intersecting [start, end)."""
+        return range(bisect_right(self.ends, start), bisect_left(self.starts, end))
+
+
+def sidecar_path(aaf_path: str) -> str:
+    return str(aaf_path) + SIDECAR_SUFFIX
+
+
+def _sequence_key(comp_mob, slot) -> str:
+    return f"{getattr(comp_mob, 'mob_id', '')}:{getattr(slot, 'slot_id', '')}"
+
+
+def _file_key(aaf_path: str) -> Tuple[str, int, int]:
+    st = os.stat(aaf_path)
+    return os.path.realpath(aaf_path), st.st_size, st.st_mtime_ns
+
+
+def _load_sidecar(path: str, size: int, mtime_ns: int) -> Dict[str, Any]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != SIDECAR_VERSION or data.get("size") != size or data.get("mtime_ns") != mtime_ns:
+        logger.debug("Ignoring stale offset sidecar %s", path)
+        return {}
+    return data.get("sequences", {})
+
+
+def _save_sidecar(path: str, size: int, mtime_ns: int, sequences: Dict[str, Any]) -> None:
+    data = {"version": SIDECAR_VERSION, "size": size, "mtime_ns": mtime_ns, "sequences": sequences}
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+    except OSError as e:
+        logger.warning(f"Could not write offset sidecar {path}: {e}")
+
+
+def offset_index_for(aaf_path: str, comp_mob, slot, sidecar: Optional[str] = None) -> SequenceOffsetIndex:
+    """
+    Offset index of `slot`'s Sequence, from the in-memory cache, the sidecar, or built
+    from the file (and then stored in both).
+
+    Args:
+        sidecar: Sidecar JSON path; None keeps the index in memory only
+    """
+    real, size, mtime_ns = _file_key(aaf_path)
+    seq_key = _sequence_key(comp_mob, slot)
+    key = (real, size, mtime_ns, seq_key)
+
+    index = _memory_cache.get(key)
+    if index is not None:
+        _memory_cache.move_to_end(key)
+        return index
+
+    sequences = _load_sidecar(sidecar, size, mtime_ns) if sidecar else {}
+    entry = sequences.get(seq_key)
+    if entry is not None:
+        index = SequenceOffsetIndex(entry["lengths"])
+    else:
+        index = SequenceOffsetIndex.from_sequence(slot.segment)
+        if sidecar:
+            sequences[seq_key] = {"lengths": index.lengths}
+            _save_sidecar(sidecar, size, mtime_ns, sequences)
+
+    _memory_cache[key] = index
+    while len(_memory_cache) > _MEMORY_CACHE_SIZE:
+        _memory_cache.popitem(last=False)
+    return index
+
+
+def clear_memory_cache() -> None:
+    _memory_cache.clear()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+structural_fingerprint.py — Content fingerprint of an AAF's selected timeline
+
+Re-exporting an unchanged sequence from Avid produces a byte-different AAF (new export
+timestamps, another mob order, a new Identification), so byte hashes never match. The
+structural fingerprint hashes only what the canonical build depends on, reached from
+the composition build_canonical_from_aaf() selects:
+
+- timeline header: name, edit rate, drop frame, start timecode
+- every object under the composition, in component order: class, then its properties
+  sorted by pid, as stored bytes (nothing is decoded; definitions by their AUID key)
+- every mob a SourceClip references (nested compositions, master/source mobs with
+  their descriptors and locators), hashed once each by MobID
+
+Export-volatile properties (LastModified, CreationTime, Generation) are left out, and
+mobs no SourceClip reaches are never read. Dynamic pids (>= 0x8000, assigned per file)
+are keyed by property name instead. Equal fingerprints mean equal canonical
+output for the same builder version and options.
+
+Usage:
+    python src/structural_fingerprint.py drop/*.aaf     # "<fingerprint>  <path>" per file
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+try:
+    from .build_canonical import HAS_AAF2, aaf2, select_top_sequence
+except ImportError:  # executed as a script: python src/structural_fingerprint.py
+    from build_canonical import HAS_AAF2, aaf2, select_top_sequence
+
+if HAS_AAF2:
+    from aaf2.properties import (
+        StreamProperty,
+        StrongRefProperty,
+        StrongRefSetProperty,
+        StrongRefVectorProperty,
+        WeakRefArrayProperty,
+        WeakRefProperty,
+    )
+
+# Bump when the hashed content changes, so old fingerprints stop matching
+FINGERPRINT_VERSION = 1
+
+# Rewritten by every export without changing the timeline
+VOLATILE_PROPERTIES = frozenset({"LastModified", "CreationTime", "Generation"})
+
+# Their static pids: Generation, Mob LastModified, Mob CreationTime, ContentStorage LastModified
+_VOLATILE_PIDS = frozenset({0x0102, 0x4404, 0x4405, 0x3b02})
+
+# First dynamic (file-assigned) pid
+_DYNAMIC_PID = 0x8000
+
+
+class _Fingerprinter:
+    """Hashes objects depth-first; referenced mobs get one memoized digest each."""
+
+    def __init__(self):
+        self.mob_digests: Dict[str, bytes] = {}
+        self.objects = 0
+        self.effects = 0    # OperationGroups, for batch_convert's cost estimate
+        self._active: set = set()
+
+    def mob_digest(self, mob) -> bytes:
+        key = str(mob.mob_id)
+        digest = self.mob_digests.get(key)
+        if digest is not None:
+            return digest
+        if key in self._active:
+            return b"cycle:" + key.encode()
+        self._active.add(key)
+        h = hashlib.blake2b(digest_size=16)
+        self._object(mob, h)
+        self._active.discard(key)
+        digest = self.mob_digests[key] = h.digest()
+        return digest
+
+    def _object(self, obj, h) -> None:
+        if obj is None:
+            h.update(b"null;")
+            return
+        self.objects += 1
+        class_name = type(obj).__name__
+        if class_name == "OperationGroup":
+            self.effects += 1
+        h.update(b"{" + class_name.encode())
+        static, dynamic = [], []
+        for pid, prop in obj.property_entries.items():
+            if pid >= _DYNAMIC_PID:
+                name = str(prop.name)
+                if name not in VOLATILE_PROPERTIES:
+                    dynamic.append((name.encode(), prop))
+            elif pid not in _VOLATILE_PIDS:
+                static.append((b"%x" % pid, pid, prop))
+        for label, _, prop in sorted(static, key=lambda item: item[1]):
+            h.update(b"|" + label + b"=")
+            self._property(prop, h)
+        for label, prop in sorted(dynamic, key=lambda item: item[0]):
+            h.update(b"|" + label + b"=")
+            self._property(prop, h)
+        if class_name == "SourceClip":
+            try:
+                mob = obj.mob
+            except Exception:
+                mob = None
+            if mob is not None:
+                h.update(b"@" + self.mob_digest(mob))
+        h.update(b"}")
+
+    def _property(self, prop, h) -> None:
+        if isinstance(prop, StrongRefProperty):
+            self._object(prop.value, h)
+        elif isinstance(prop, StrongRefVectorProperty):
+            h.update(b"[")
+            for child in prop:
+                self._object(child, h)
+            h.update(b"]")
+        elif isinstance(prop, StrongRefSetProperty):
+            h.update(b"(")
+            for key, child in sorted(prop.items(), key=lambda item: str(item[0])):
+                h.update(str(key).encode())
+                self._object(child, h)
+            h.update(b")")
+        elif isinstance(prop, WeakRefProperty):
+            h.update(b"<" + str(prop.ref).encode() + b">")
+        elif isinstance(prop, WeakRefArrayProperty):
+            for target in prop.value or []:
+                h.update(_definition(target))
+        elif isinstance(prop, StreamProperty):
+            h.update(b"stream")
+        else:
+            data = prop.data
+            h.update(b"%d:" % len(data) + bytes(data) if data is not None else b"null;")
+
+
+def _definition(target) -> bytes:
+    """Weak reference target (DataDef, OperationDef, ParameterDef, ...) by class, name and AUID."""
+    if target is None:
+        return b"null;"
+    return f"<{type(target).__name__}:{getattr(target, 'name', '')}:{getattr(target, 'auid', '')}>".encode()
+
+
+def structural_fingerprint(f, stats: Optional[Dict[str, Any]] = None) -> str:
+    """Hex fingerprint of the open file's selected timeline; `stats` receives counters if given."""
+    comp, fps, is_drop, start_tc, timeline_name = select_top_sequence(f)
+    fingerprinter = _Fingerprinter()
+    h = hashlib.blake2b(digest_size=20)
+    h.update(f"v{FINGERPRINT_VERSION}|{timeline_name}|{fps}|{is_drop}|{start_tc}|".encode())
+    h.update(fingerprinter.mob_digest(comp))
+    if stats is not None:
+        stats.update(
+            composition=timeline_name,
+            objects=fingerprinter.objects,
+            effects=fingerprinter.effects,
+            mobs=len(fingerprinter.mob_digests),
+        )
+    return h.hexdigest()
+
+
+def fingerprint_aaf(aaf_path: str) -> Dict[str, Any]:
+    """{"path", "fingerprint", "composition", "objects", "effects", "mobs", "size", "elapsed"} for one AAF."""
+    if not HAS_AAF2:
+        raise ImportError("aaf2 is required. Install with: pip install pyaaf2")
+    started = time.perf_counter()
+    stats: Dict[str, Any] = {}
+    with aaf2.open(str(aaf_path), "r") as f:
+        fingerprint = structural_fingerprint(f, stats)
+    return {
+        "path": str(aaf_path),
+        "fingerprint": fingerprint,
+        **stats,
+        "size": os.path.getsize(aaf_path),
+        "elapsed": round(time.perf_counter() - started, 4),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Structural fingerprint of each AAF's selected timeline")
+    parser.add_argument("paths", nargs="+", help="AAF files")
+    args = parser.parse_args(argv)
+    failed = False
+    for path in args.paths:
+        try:
+            print(f"{fingerprint_aaf(path)['fingerprint']}  {path}")
+        except Exception as e:
+            print(f"ERROR: {e}  {path}", file=sys.stderr)
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+synthetic_aaf.py — Small pyaaf2 helper for writing synthetic timelines
+
+Used by the tests (tests/conftest.py make_aaf fixture) and by the benchmark tools
+(src/tools/bench_builders.py --synthetic), so neither depends on the other.
+
+Usage:
+    with aaf2.open("cut.aaf", "w") as f:
+        aaf = SyntheticAAF(f)
+        a = aaf.master_clip("A", "file:///media/a.mov")
+        aaf.composition("cut.Exported.01", [aaf.clip(a, 0, 100), aaf.filler(10)])
+"""
+
+from __future__ import annotations
+
+
+class SyntheticAAF:
+    """Small pyaaf2 helper for building synthetic timelines inside tests."""
+
+    def __init__(self, f, rate: int = 25):
+        self.f = f
+        self.rate = rate
+        self._defs: dict[str, object] = {}
+
+    def master_clip(self, name: str, url: str | None = None, length: int = 1000):
+        """MasterMob → SourceMob(ImportDescriptor + NetworkLocator) chain; returns the MasterMob."""
+        f = self.f
+        source_mob = f.create.SourceMob(f"{name}.src")
+        descriptor = f.create.ImportDescriptor()
+        if url:
+            locator = f.create.NetworkLocator()
+            locator["URLString"].value = url
+            descriptor["Locator"].append(locator)
+        source_mob.descriptor = descriptor
+        f.content.mobs.append(source_mob)
+        src_slot = source_mob.create_empty_sequence_slot(self.rate, media_kind="picture")
+        src_slot.segment.components.append(f.create.Filler("picture", length))
+
+        master_mob = f.create.MasterMob(name)
+        f.content.mobs.append(master_mob)
+        master_slot = master_mob.create_timeline_slot(self.rate)
+        master_slot.segment = source_mob.create_source_clip(src_slot.slot_id, length=length)
+        return master_mob
+
+    def clip(self, mob, start: int = 0, length: int = 100):
+        return mob.create_source_clip(1, start=start, length=length)
+
+    def filler(self, length: int):
+        return self.f.create.Filler("picture", length)
+
+    def composition(self, name: str, components=()):
+        """CompositionMob with one picture Sequence slot holding `components`."""
+        mob = self.f.create.CompositionMob(name)
+        self.f.content.mobs.append(mob)
+        slot = mob.create_timeline_slot(self.rate)
+        slot.segment = self.f.create.Sequence("picture")
+        for component in components:
+            slot.segment.components.append(component)
+        return mob
+
+    def append(self, comp_mob, *components) -> None:
+        for component in components:
+            comp_mob.slots[0].segment.components.append(component)
+
+    def _parameter_def(self, name: str):
+        import uuid
+
+        from aaf2.auid import AUID
+
+        if name not in self._defs:
+            auid = AUID(int=uuid.uuid5(uuid.NAMESPACE_OID, name).int)
+            pdef = self.f.create.ParameterDef(auid, name, "", "Rational")
+            self.f.dictionary.register_def(pdef)
+            self._defs[name] = pdef
+        return self._defs[name]
+
+    def operation_group(self, op_name: str, length: int, inputs=(), constants=None, animated=None):
+        """OperationGroup with ConstantValue/VaryingValue(LinearInterp) parameters."""
+        import uuid
+
+        from aaf2.auid import AUID
+        from aaf2.misc import LinearInterp
+
+        f = self.f
+        key = f"op:{op_name}"
+        if key not in self._defs:
+            auid = AUID(int=uuid.uuid5(uuid.NAMESPACE_OID, key).int)
+            opdef = f.create.OperationDef(auid, op_name, "")
+            opdef.media_kind = "picture"
+            opdef["NumberInputs"].value = 1
+            f.dictionary.register_def(opdef)
+            self._defs[key] = opdef
+        if "interp:linear" not in self._defs:
+            interp = f.create.InterpolationDef(LinearInterp, "LinearInterp", "")
+            f.dictionary.register_def(interp)
+            self._defs["interp:linear"] = interp
+
+        op_group = f.create.OperationGroup(self._defs[key], length=length)
+        for segment in inputs:
+            op_group.segments.append(segment)
+        # pyaaf2's f.create is a shared factory: resolve defs before the create.X() lookup
+        for name, value in (constants or {}).items():
+            pdef = self._parameter_def(name)
+            op_group.parameters.append(f.create.ConstantValue(pdef, value))
+        for name, points in (animated or {}).items():
+            pdef = self._parameter_def(name)
+            varying = f.create.VaryingValue(pdef, "LinearInterp")
+            op_group.parameters.append(varying)
+            for t, v in points:
+                varying.add_keyframe(t, v)
+        return op_group
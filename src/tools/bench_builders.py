@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Builder Variant Benchmark and Output Diff
+
+Runs any set of canonical builder modules (src/build_canonical.py, the _fixed and
+_with_parameters variants, the timestamped .backup files, ...) over a corpus of AAFs
+and reports, per variant and file:
+- wall time (best of --repeat runs) and events per second
+- peak RSS of the process running the build
+- a structured diff of the canonical output against the baseline variant
+
+Each build runs in a fresh interpreter, so module globals and RSS are not shared
+between variants. Every variant must expose build_canonical_from_aaf(aaf_path).
+
+Not part of the main pipeline.
+
+Usage:
+    python src/tools/bench_builders.py tests/fixtures/aaf/ --synthetic 2000
+    python src/tools/bench_builders.py a.aaf --variants src/build_canonical.py src/build_canonical_fixed.py
+    python src/tools/bench_builders.py a.aaf --json report.json
+"""
+
+import argparse
+import glob
+import importlib.util
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from importlib.machinery import SourceFileLoader
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+ROOT = os.path.join(SRC, "..")
+
+# Timeline fields compared besides the clips
+_HEADER_FIELDS = ("name", "rate", "start")
+_MAX_EXAMPLES = 10
+
+
+def default_variants():
+    """Every build_canonical*.py module and .backup builder under src/, current builder first."""
+    current = os.path.normpath(os.path.join(SRC, "build_canonical.py"))
+    others = [os.path.normpath(p) for p in sorted(glob.glob(os.path.join(SRC, "build_canonical*.py*")))]
+    return [current] + [p for p in others if p != current]
+
+
+def load_builder(path):
+    """Import a builder module from any file name (including *.py.backup)."""
+    sys.path.insert(0, os.path.abspath(SRC))  # builders import their siblings absolutely
+    name = "builder_variant_" + os.path.basename(path).replace(".", "_")
+    loader = SourceFileLoader(name, path)
+    module = importlib.util.module_from_spec(importlib.util.spec_from_loader(name, loader))
+    sys.modules[name] = module  # as a normal import would; dataclasses look their module up here
+    loader.exec_module(module)
+    return module
+
+
+def _clips(canon):
+    return [clip for track in canon.get("timeline", {}).get("tracks", []) for clip in track.get("clips", [])]
+
+
+def diff_canonical(baseline, variant, max_examples=_MAX_EXAMPLES):
+    """
+    Structured diff of two canonical dicts (clips compared by position).
+
+    Returns:
+        {"equal", "header": {field: [baseline, variant]}, "events": [n_baseline, n_variant],
+         "changed_events", "fields": {field: count}, "examples": [{"index", "field", ...}]}
+    """
+    a_tl, b_tl = baseline.get("timeline", {}), variant.get("timeline", {})
+    header = {f: [a_tl.get(f), b_tl.get(f)] for f in _HEADER_FIELDS if a_tl.get(f) != b_tl.get(f)}
+    a_clips, b_clips = _clips(baseline), _clips(variant)
+
+    fields = Counter()
+    examples = []
+    changed = 0
+    for i in range(max(len(a_clips), len(b_clips))):
+        a = a_clips[i] if i < len(a_clips) else None
+        b = b_clips[i] if i < len(b_clips) else None
+        if a == b:
+            continue
+        changed += 1
+        if a is None or b is None:
+            diffs = ["(missing)" if b is None else "(extra)"]
+        else:
+            diffs = [k for k in dict.fromkeys([*a, *b]) if a.get(k) != b.get(k)]
+        fields.update(diffs)
+        for field in diffs:
+            if len(examples) < max_examples:
+                whole = a is None or b is None
+                examples.append({
+                    "index": i,
+                    "field": field,
+                    "baseline": a if whole else a.get(field),
+                    "variant": b if whole else b.get(field),
+                })
+
+    return {
+        "equal": baseline == variant,
+        "header": header,
+        "events": [len(a_clips), len(b_clips)],
+        "changed_events": changed,
+        "fields": dict(fields),
+        "examples": examples,
+    }
+
+
+def synthetic_corpus(directory, events):
+    """Write a synthetic timeline of ~`events` mixed components (clips, effects, fillers, nesting)."""
+    import aaf2
+
+    sys.path.insert(0, os.path.abspath(SRC))
+    from synthetic_aaf import SyntheticAAF
+
+    path = os.path.join(directory, f"synthetic_{events}.aaf")
+    with aaf2.open(path, "w") as f:
+        aaf = SyntheticAAF(f)
+        masters = [aaf.master_clip(f"Clip_{i:03d}", f"file:///media/reel_{i:03d}.mov") for i in range(40)]
+        inner = aaf.composition("nested", [aaf.clip(masters[0], 0, 50), aaf.clip(masters[1], 0, 50)])
+        top = aaf.composition(f"synthetic.{events}.Exported.01")
+        for i in range(events):
+            mob = masters[i % len(masters)]
+            if i % 10 == 9:
+                aaf.append(top, aaf.filler(12))
+            elif i % 10 == 5:
+                aaf.append(top, aaf.operation_group("Submaster", 24, [aaf.clip(mob, 0, 24)], constants={"Level": (i % 7) / 7}))
+            elif i % 50 == 25:
+                aaf.append(top, aaf.clip(inner, 0, 100))
+            else:
+                aaf.append(top, aaf.clip(mob, i % 500, 24))
+    return path
+
+
+def _run_worker(variant, aaf_path, out_path):
+    """Fresh-interpreter entrypoint: build once and write timing, RSS and output."""
+    module = load_builder(variant)
+    started = time.perf_counter()
+    try:
+        canon = module.build_canonical_from_aaf(aaf_path)
+        error = None
+    except Exception as e:
+        canon, error = None, f"{type(e).__name__}: {e}"
+    wall = time.perf_counter() - started
+    result = {
+        "wall": wall,
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "events": len(_clips(canon)) if canon else 0,
+        "error": error,
+        "canon": canon,
+    }
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+def run_variant(variant, aaf_path, repeat=1):
+    """Best-of-`repeat` result of one variant on one file, each run in a fresh interpreter."""
+    best = None
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "result.json")
+        for _ in range(max(1, repeat)):
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--worker", variant, aaf_path, out],
+                capture_output=True, text=True,
+            )
+            if proc.returncode != 0:
+                return {"wall": 0.0, "peak_rss_kb": 0, "events": 0, "canon": None,
+                        "error": (proc.stderr.strip().splitlines() or ["worker failed"])[-1]}
+            with open(out, encoding="utf-8") as f:
+                result = json.load(f)
+            if best is None or result["wall"] < best["wall"]:
+                best = result
+    return best
+
+
+def benchmark(variants, corpus, repeat=1, baseline=None):
+    """Run every variant over every file; diff outputs against the baseline variant (default: first)."""
+    baseline = baseline or variants[0]
+    report = []
+    for aaf_path in corpus:
+        results = {v: run_variant(v, aaf_path, repeat) for v in variants}
+        base_canon = results[baseline]["canon"]
+        for variant in variants:
+            r = results[variant]
+            diff = diff_canonical(base_canon, r["canon"]) if base_canon and r["canon"] else None
+            report.append({
+                "file": aaf_path,
+                "variant": variant,
+                "wall": round(r["wall"], 4),
+                "events": r["events"],
+                "events_per_sec": round(r["events"] / r["wall"], 1) if r["wall"] else 0.0,
+                "peak_rss_mb": round(r["peak_rss_kb"] / 1024, 1),
+                "error": r["error"],
+                "diff": diff,
+            })
+    return report
+
+
+def format_report(report, baseline):
+    lines = [f"baseline: {os.path.relpath(baseline)}"]
+    for aaf_path in dict.fromkeys(r["file"] for r in report):
+        lines.append("")
+        lines.append(os.path.basename(aaf_path))
+        lines.append(f"  {'variant':44} {'wall s':>8} {'events':>7} {'ev/s':>9} {'RSS MB':>7}  diff")
+        for r in (r for r in report if r["file"] == aaf_path):
+            if r["error"]:
+                status = f"ERROR {r['error']}"
+            elif r["diff"] is None:
+                status = "-"
+            elif r["diff"]["equal"]:
+                status = "identical"
+            else:
+                d = r["diff"]
+                fields = ", ".join(f"{k}:{v}" for k, v in sorted(d["fields"].items()))
+                status = f"{d['changed_events']} events differ ({fields})"
+                if d["header"]:
+                    status += f"; header {sorted(d['header'])}"
+            lines.append(
+                f"  {os.path.relpath(r['variant']):44} {r['wall']:8.3f} {r['events']:7d} "
+                f"{r['events_per_sec']:9.1f} {r['peak_rss_mb']:7.1f}  {status}"
+            )
+    return "\n".join(lines)
+
+
+def _expand_corpus(inputs):
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(sorted(glob.glob(os.path.join(item, "**", "*.aaf"), recursive=True)))
+        else:
+            paths.append(item)
+    return paths
+
+
+def main():
+    if len(sys.argv) == 5 and sys.argv[1] == "--worker":
+        _run_worker(*sys.argv[2:])
+        return 0
+
+    parser = argparse.ArgumentParser(description="Benchmark builder variants and diff their canonical outputs")
+    parser.add_argument("corpus", nargs="*", help="AAF files or directories (searched for *.aaf)")
+    parser.add_argument("--variants", nargs="+", help="Builder modules (default: every src/build_canonical* builder)")
+    parser.add_argument("--baseline", help="Variant the others are diffed against (default: the first)")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="Add a synthetic timeline of ~N components")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per variant and file; best wall time is kept")
+    parser.add_argument("--json", metavar="PATH", help="Also write the full report (with diffs) as JSON")
+    args = parser.parse_args()
+
+    variants = [os.path.normpath(v) for v in (args.variants or default_variants())]
+    baseline = os.path.normpath(args.baseline) if args.baseline else variants[0]
+    if baseline not in variants:
+        variants.insert(0, baseline)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = _expand_corpus(args.corpus)
+        if args.synthetic:
+            corpus.append(synthetic_corpus(tmp, args.synthetic))
+        if not corpus:
+            parser.error("no AAF files (pass paths or --synthetic N)")
+        report = benchmark(variants, corpus, args.repeat, baseline)
+
+    print(format_report(report, baseline))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"baseline": baseline, "results": report}, f, indent=2)
+    return 1 if any(r["error"] for r in report) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Event Memory Benchmark
+
+Measures bytes per event (tracemalloc) for the legacy nested-dict event shape versus
+the slotted Event/Source/Effect model in src/event_model.py, and the peak traced memory
+of the output step (Event.to_canonical over the whole timeline) when parameter sets are
+copied per event versus shared, and when events are released while converting.
+
+Events are synthesised with realistic per-event strings (distinct clip names and UMIDs,
+a small pool of source paths and effect names) so only the container overhead differs.
+
+Not part of the main pipeline.
+
+Usage:
+    python src/tools/bench_event_memory.py --events 50000
+"""
+
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from event_model import Effect, Event, FrozenParameters, Source, events_to_canonical  # noqa: E402
+
+
+def _fields(i):
+    name = f"Clip_{i:06d}"
+    umid = f"urn:smpte:umid:060a2b34.01010105.01010f20.13000000.{i:08x}"
+    path = f"/Volumes/Media/reel_{i % 40:03d}.mxf"
+    operation = "N/A" if i % 4 else "Avid Pan & Zoom"
+    parameters = {} if i % 4 else {"pan": 0.5, "zoom": 1.25}
+    return name, i * 24, i * 24 + 24, umid, path, operation, parameters
+
+
+def build_legacy(n):
+    events = []
+    for i in range(n):
+        name, t_in, t_out, umid, path, operation, parameters = _fields(i)
+        events.append(
+            {
+                "name": name,
+                "in": t_in,
+                "out": t_out,
+                "source_umid": umid,
+                "source_path": path,
+                "effect_params": {"operation": operation, "parameters": parameters},
+            }
+        )
+    return events
+
+
+def build_slotted(n):
+    events = []
+    for i in range(n):
+        name, t_in, t_out, umid, path, operation, parameters = _fields(i)
+        events.append(Event(name, t_in, t_out, Source(umid, path), Effect(operation, parameters)))
+    return events
+
+
+def build_shared(n):
+    """Slotted events whose parameter sets are hash-consed, as the builder emits them."""
+    sets = {}
+    events = []
+    for i in range(n):
+        name, t_in, t_out, umid, path, operation, parameters = _fields(i)
+        key = tuple(sorted(parameters.items()))
+        parameters = sets.setdefault(key, FrozenParameters(parameters))
+        events.append(Event(name, t_in, t_out, Source(umid, path), Effect(operation, parameters)))
+    return events
+
+
+def _copying_to_canonical(events):
+    # Output step before parameter sets were shared: one parameter dict per event
+    canonical = []
+    for event in events:
+        canon = event.to_canonical()
+        canon["effect_params"]["parameters"] = dict(event.effect.parameters)
+        canonical.append(canon)
+    return canonical
+
+
+def _shared_to_canonical(events):
+    return [event.to_canonical() for event in events]
+
+
+def measure_output(convert, n):
+    """Peak traced bytes above the built events while convert(events) produces the canonical clips."""
+    tracemalloc.start()
+    events = build_shared(n)
+    built = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    canonical = convert(events)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert len(canonical) == n
+    return peak - built
+
+
+def measure(builder, n):
+    """Traced bytes still allocated after builder(n) returns (the event list is kept alive)."""
+    tracemalloc.start()
+    events = builder(n)
+    total = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(events) == n
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="tracemalloc bytes-per-event: dict events vs slotted Event model")
+    parser.add_argument("--events", type=int, default=50000, help="Number of synthetic events (default: 50000)")
+    args = parser.parse_args()
+    n = args.events
+
+    legacy_total = measure(build_legacy, n)
+    slotted_total = measure(build_slotted, n)
+
+    print(f"events: {n}")
+    print(f"legacy nested dicts:      {legacy_total / n:8.1f} bytes/event")
+    print(f"slotted Event model:      {slotted_total / n:8.1f} bytes/event")
+    saved = legacy_total - slotted_total
+    print(f"saved:                    {saved / n:8.1f} bytes/event ({saved / legacy_total:.0%}, {saved / 2**20:.1f} MiB total)")
+
+    print("to_canonical peak (above the built events):")
+    for label, convert in (
+        ("copied parameter sets", _copying_to_canonical),
+        ("shared parameter sets", _shared_to_canonical),
+        ("shared, events released", events_to_canonical),
+    ):
+        peak = measure_output(convert, n)
+        print(f"  {label + ':':24}{peak / n:8.1f} bytes/event ({peak / 2**20:.1f} MiB peak)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+traversal_budget.py — Traversal budgets and cooperative cancellation
+
+Malformed AAFs (self-referencing chains, enormous nesting, huge PointLists) can keep
+the builder busy for minutes. A BudgetGuard is checked cooperatively inside the
+traversal loops of build_canonical and trips in one of two ways:
+
+- Hard limits (nodes visited, wall-clock time, CancellationToken) raise BudgetExceeded;
+  the builder catches it and returns the events emitted so far.
+- Per-item limits (chain depth, control points per parameter) truncate that one walk
+  or PointList and traversal continues. Chain depth bounds the SourceClip search
+  through nested segments (_find_nested_source_clip_deep), the walk every
+  OperationGroup and source mob goes through; the build resolves a clip's source from
+  its directly referenced mob, without a UMID-chain walk.
+
+Every trip is recorded as a structured "budget exceeded" diagnostic:
+    {"code": "BUDGET-EXCEEDED", "budget": "max_nodes", "limit": 1000, "observed": 1001,
+     "offset": 4200, "fatal": true, "count": 1}
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+BUDGET_EXCEEDED = "BUDGET-EXCEEDED"
+
+
+class CancellationToken:
+    """
+    Thread-safe flag a caller can set to stop a running build at the next checkpoint.
+
+    `event` may be any object with set()/is_set() — e.g. a multiprocessing Manager
+    Event — so a token can be triggered from another process.
+    """
+
+    def __init__(self, event: Any = None) -> None:
+        self._event = event if event is not None else threading.Event()
+        self.reason: Optional[str] = None
+
+    def cancel(self, reason: str = "cancelled by caller") -> None:
+        self.reason = reason
+        self._event.set()
+
+    @property
+    def process_shareable(self) -> bool:
+        """True when the event can be set from another process (not a threading.Event)."""
+        return not isinstance(self._event, threading.Event)
+
+    @property
+    def cancelled(self) -> bool:
+        if self._event.is_set():
+            if self.reason is None:
+                self.reason = "cancelled by caller"
+            return True
+        return False
+
+
+@dataclass
+class TraversalBudget:
+    """Configurable traversal limits; None disables a limit."""
+
+    max_nodes: Optional[int] = None
+    max_chain_depth: Optional[int] = None
+    max_control_points: Optional[int] = None
+    max_seconds: Optional[float] = None
+
+
+class BudgetExceeded(Exception):
+    """Raised by a hard budget; carries the diagnostic recorded for it."""
+
+    def __init__(self, diagnostic: Dict[str, Any]):
+        super().__init__(
+            f"{diagnostic['budget']} exceeded (limit {diagnostic['limit']}, observed {diagnostic['observed']})"
+        )
+        self.diagnostic = diagnostic
+
+
+class BudgetGuard:
+    """Per-build counters checked by the traversal loops."""
+
+    # Wall-clock and cancellation are polled every N nodes to keep the per-node cost low
+    CHECK_INTERVAL = 64
+
+    def __init__(
+        self,
+        budget: Optional[TraversalBudget] = None,
+        token: Optional[CancellationToken] = None,
+    ):
+        self.budget = budget or TraversalBudget()
+        self.token = token
+        self.nodes = 0
+        self.offset: Optional[int] = None  # current timeline offset, set by the builder
+        self.diagnostics: List[Dict[str, Any]] = []
+        self._started = time.monotonic()
+        self._deadline = (
+            self._started + self.budget.max_seconds if self.budget.max_seconds is not None else None
+        )
+
+    def _record(self, budget: str, limit: Any, observed: Any, fatal: bool) -> Dict[str, Any]:
+        # Per-item trips at the same offset collapse into one diagnostic with a count
+        if not fatal and self.diagnostics:
+            last = self.diagnostics[-1]
+            if last["budget"] == budget and last["offset"] == self.offset:
+                last["count"] += 1
+                last["observed"] = max(last["observed"], observed)
+                return last
+        diagnostic = {
+            "code": BUDGET_EXCEEDED,
+            "budget": budget,
+            "limit": limit,
+            "observed": observed,
+            "offset": self.offset,
+            "fatal": fatal,
+            "count": 1,
+        }
+        self.diagnostics.append(diagnostic)
+        return diagnostic
+
+    def check(self) -> None:
+        """Raise BudgetExceeded on cancellation or wall-clock overrun."""
+        if self.token is not None and self.token.cancelled:
+            raise BudgetExceeded(
+                self._record("cancelled", None, self.token.reason, fatal=True)
+            )
+        if self._deadline is not None:
+            now = time.monotonic()
+            if now > self._deadline:
+                elapsed = round(now - self._started, 3)
+                raise BudgetExceeded(
+                    self._record("max_seconds", self.budget.max_seconds, elapsed, fatal=True)
+                )
+
+    def visit(self) -> None:
+        """Count one traversed node; raises BudgetExceeded on a hard limit."""
+        self.nodes += 1
+        limit = self.budget.max_nodes
+        if limit is not None and self.nodes > limit:
+            raise BudgetExceeded(self._record("max_nodes", limit, self.nodes, fatal=True))
+        if self.nodes % self.CHECK_INTERVAL == 0:
+            self.check()
+
+    def allow_chain_depth(self, depth: int) -> bool:
+        """False (and a diagnostic) when a chain walk goes deeper than max_chain_depth."""
+        limit = self.budget.max_chain_depth
+        if limit is not None and depth > limit:
+            self._record("max_chain_depth", limit, depth, fatal=False)
+            return False
+        return True
+
+    def control_points(self, count: int) -> int:
+        """Number of control points to decode for a PointList of `count` entries."""
+        limit = self.budget.max_control_points
+        if limit is not None and count > limit:
+            self._record("max_control_points", limit, count, fatal=False)
+            return limit
+        return count
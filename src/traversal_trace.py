@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+traversal_trace.py — Opt-in node-level traversal tracer (Chrome trace-event JSON)
+
+Records begin/end events while build_canonical walks an AAF so a slow file can be
+opened in Perfetto (ui.perfetto.dev) or about://tracing and the hot subtree read
+off the flame chart.
+
+Key principles:
+- Off by default: when disabled, the builder only checks the tracer of its per-build
+  context (_BuildContext.tracer in the _build ContextVar) for None
+- Events follow the Chrome Trace Event Format ("B"/"E" duration events, µs timestamps)
+- Every event carries the current timeline offset plus caller-supplied args
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class TraversalTracer:
+    """Collects Chrome trace events for one build."""
+
+    def __init__(self, process_name: str = "build_canonical"):
+        self.events: List[Dict[str, Any]] = []
+        self.offset: Optional[int] = None  # current timeline offset, set by the builder
+        self._pid = os.getpid()
+        self._t0 = time.perf_counter_ns()
+        self._process_name = process_name
+
+    def _now_us(self) -> float:
+        return (time.perf_counter_ns() - self._t0) / 1000.0
+
+    def begin(self, name: str, cat: str, **args: Any) -> None:
+        if self.offset is not None:
+            args.setdefault("offset", self.offset)
+        self.events.append(
+            {
+                "name": name,
+                "cat": cat,
+                "ph": "B",
+                "ts": self._now_us(),
+                "pid": self._pid,
+                "tid": threading.get_ident(),
+                "args": args,
+            }
+        )
+
+    def end(self, name: str, cat: str, **args: Any) -> None:
+        event: Dict[str, Any] = {
+            "name": name,
+            "cat": cat,
+            "ph": "E",
+            "ts": self._now_us(),
+            "pid": self._pid,
+            "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    @contextmanager
+    def span(self, name: str, cat: str, **args: Any) -> Iterator[None]:
+        self.begin(name, cat, **args)
+        try:
+            yield
+        finally:
+            self.end(name, cat)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Return the trace as a Chrome trace-event JSON object."""
+        metadata = {
+            "name": "process_name",
+            "ph": "M",
+            "pid": self._pid,
+            "args": {"name": self._process_name},
+        }
+        return {"traceEvents": [metadata, *self.events], "displayTimeUnit": "ms"}
+
+    def write(self, out_path: str) -> None:
+        with open(out_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+    def summary(self, top: int = 10) -> List[Dict[str, Any]]:
+        """Inclusive time per event name (µs), largest first — a quick text view of the trace."""
+        totals: Dict[str, Dict[str, float]] = {}
+        stack: List[Dict[str, Any]] = []
+        for event in self.events:
+            if event["ph"] == "B":
+                stack.append(event)
+            elif event["ph"] == "E" and stack:
+                begin = stack.pop()
+                entry = totals.setdefault(begin["name"], {"count": 0, "total_us": 0.0})
+                entry["count"] += 1
+                entry["total_us"] += event["ts"] - begin["ts"]
+        ranked = sorted(totals.items(), key=lambda kv: kv[1]["total_us"], reverse=True)
+        return [{"name": name, **stats} for name, stats in ranked[:top]]
@@ -28,9 +28,29 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 import xml.etree.ElementTree as ET
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    from .canonical_tables import SOURCES, is_normalized, iter_expanded_events
+    from .string_pool import StringPool
+except ImportError:  # executed as a script: python src/write_fcpxml.py
+    from canonical_tables import SOURCES, is_normalized, iter_expanded_events
+    from string_pool import StringPool
+
+
+def load_canonical(path: str, pool: Optional[StringPool] = None) -> Dict[str, Any]:
+    """
+    Load canonical JSON with keys and string values interned through a StringPool.
+
+    Repeated source paths, UMIDs and effect names then share one str instance each,
+    and the per-event dict keys are shared across all events.
+    """
+    pool = pool if pool is not None else StringPool()
+    with open(path, encoding="utf-8") as f:
+        return json.load(f, object_pairs_hook=pool.json_object)
 
 
 def write_fcpxml_from_canonical(canon: Dict[str, Any], out_path: str) -> None:
@@ -44,6 +64,10 @@ def write_fcpxml_from_canonical(canon: Dict[str, Any], out_path: str) -> None:
     - Assets: Declare each unique source path
     - Spine: Place all events in sequence spine
 
+    Accepts both the expanded layout and the normalized layout (top-level "sources" /
+    "effect_templates" tables, see src/canonical_tables.py); with the latter, assets are
+    declared straight from the sources table.
+
     Args:
         canon: Canonical JSON dict per docs/data_model_json.md
         out_path: Output FCPXML file path
@@ -58,7 +82,7 @@ def write_fcpxml_from_canonical(canon: Dict[str, Any], out_path: str) -> None:
 
     timeline.get("name", "Untitled Timeline")
     start_tc_frames = timeline.get("start_tc_frames", 0)
-    events = timeline.get("events", [])
+    events = list(iter_expanded_events(canon))
 
     # Build FCPXML structure
     fcpxml = ET.Element("fcpxml", version="1.13")
@@ -82,7 +106,10 @@ def write_fcpxml_from_canonical(canon: Dict[str, Any], out_path: str) -> None:
         format_elem.set("tcFormat", "DF")
 
     # Create assets for unique source paths
-    assets, asset_map = create_assets(events, resources, edit_rate_fps)
+    if is_normalized(canon):
+        assets, asset_map = create_assets_from_table(canon.get(SOURCES, []), resources, edit_rate_fps)
+    else:
+        assets, asset_map = create_assets(events, resources, edit_rate_fps)
 
     # Library structure
     library = ET.SubElement(fcpxml, "library")
@@ -142,11 +169,23 @@ def create_assets(
     events: List[Dict[str, Any]], resources: ET.Element, fps: float
 ) -> tuple[List[ET.Element], Dict[str, str]]:
     """Create asset declarations for unique source paths."""
+    return _declare_assets((event.get("source") for event in events), resources, fps)
+
+
+def create_assets_from_table(
+    sources: List[Dict[str, Any]], resources: ET.Element, fps: float
+) -> tuple[List[ET.Element], Dict[str, str]]:
+    """Create asset declarations from a normalized "sources" table (rows are already unique)."""
+    return _declare_assets(sources, resources, fps)
+
+
+def _declare_assets(
+    sources: Iterable[Dict[str, Any] | None], resources: ET.Element, fps: float
+) -> tuple[List[ET.Element], Dict[str, str]]:
     unique_sources: Dict[str, Dict[str, Any]] = {}
 
     # Collect unique source paths
-    for event in events:
-        source = event.get("source")
+    for source in sources:
         if not source:
             continue
 
@@ -231,6 +270,10 @@ def create_spine_events(
                     ref=asset_ref,
                 )
 
+                source_range = event.get("source_range")
+                if source_range:
+                    add_time_map(clip, source_range, length_frames, fps)
+
                 # Add effects if not "(none)"
                 effect_name = effect.get("name", "(none)")
                 if effect_name != "(none)":
@@ -252,6 +295,28 @@ def create_spine_events(
             ET.SubElement(spine, "gap", name="Gap", duration=duration, offset=offset)
 
 
+def add_time_map(clip_elem: ET.Element, source_range: Dict[str, Any], length_frames: int, fps: float) -> None:
+    """
+    Retime a clip to play source frames source_range["in"] → ["out"] over its duration.
+
+    The clip starts at the source in-point and gets a two-point linear timeMap; source
+    positions are rounded to whole frames, and the curve shape of speed/position graph
+    retimes between the end points is not carried by the canonical JSON.
+    """
+    source_in = round(source_range["in"])
+    source_out = round(source_range["out"])
+    clip_elem.set("start", frames_to_time(source_in, fps))
+    time_map = ET.SubElement(clip_elem, "timeMap")
+    for time, value in ((source_in, source_in), (source_in + length_frames, source_out)):
+        ET.SubElement(
+            time_map,
+            "timept",
+            time=frames_to_time(time, fps),
+            value=frames_to_time(value, fps),
+            interp="linear",
+        )
+
+
 def add_effect_to_clip(clip_elem: ET.Element, effect: Dict[str, Any], fps: float) -> None:
     """Add effect to clip element (conservative mapping only)."""
     effect_name = effect.get("name", "")
@@ -307,13 +372,14 @@ def main(argv: List[str] | None = None) -> int:
 
     try:
         # Load canonical JSON
-        with open(args.canon_json, encoding="utf-8") as f:
-            canon = json.load(f)
+        pool = StringPool()
+        canon = load_canonical(args.canon_json, pool)
 
         # Write FCPXML
         write_fcpxml_from_canonical(canon, args.output)
 
         if args.verbose:
+            print(f"String pool: {pool.report()}", file=sys.stderr)
             print(f"FCPXML written to: {args.output}")
 
         return 0
@@ -324,6 +390,4 @@ def main(argv: List[str] | None = None) -> int:
 
 
 if __name__ == "__main__":
-    import sys
-
     raise SystemExit(main())
@@ -3,7 +3,25 @@ from __future__ import annotations
 import pathlib
 import sys
 
+import pytest
+
 # Add project root to sys.path so "import src...." works in tests
 ROOT = pathlib.Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+from src.synthetic_aaf import SyntheticAAF  # noqa: E402,F401  (re-exported for tests)
+
+
+@pytest.fixture
+def make_aaf(tmp_path):
+    """Factory: make_aaf(build_fn, name=...) writes a synthetic AAF and returns its path."""
+    aaf2 = pytest.importorskip("aaf2")
+
+    def _make(build, name: str = "synthetic.aaf") -> pathlib.Path:
+        path = tmp_path / name
+        with aaf2.open(str(path), "w") as f:
+            build(SyntheticAAF(f))
+        return path
+
+    return _make
@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import io
+import json
+
+import pytest
+
+from src import aaf_inspector as ai
+
+
+def _timeline(aaf):
+    a = aaf.master_clip("A", "file:///media/a.mov")
+    b = aaf.master_clip("B", "file:///media/b.mov")
+    aaf.composition(
+        "top.Exported.01",
+        [
+            aaf.clip(a, 0, 100),
+            aaf.filler(50),
+            aaf.operation_group("Submaster", 40, [aaf.clip(b, 0, 40)], constants={"Level": 0.5}),
+            aaf.clip(b, 10, 30),
+        ],
+    )
+
+
+def test_decode_possible_path():
+    utf16 = list("C:\\stills\\frame.png".encode("utf-16le"))
+    assert ai.decode_possible_path(utf16) == [{"encoding": "utf-16le", "kind": "path", "path": "C:\\stills\\frame.png"}]
+    assert ai.decode_possible_path("file:///a.mov")[0]["kind"] == "url"
+    assert ai.decode_possible_path([1, 2, 3]) == []
+
+
+@pytest.fixture
+def inspector(make_aaf):
+    pytest.importorskip("aaf2")
+    with ai.Inspector(str(make_aaf(_timeline)), page_size=2) as inspector:
+        yield inspector
+
+
+def _walk_to_sequence(inspector):
+    mobs = inspector.children(0, offset=0, limit=10)["items"]
+    top = next(m for m in mobs if m.get("name") == "top.Exported.01")
+    slot = inspector.children(top["id"])["items"][0]
+    return inspector.children(slot["id"], prop="Segment")["items"][0]
+
+
+def test_children_are_paged_and_cached(inspector):
+    first = inspector.children(0)
+    assert first["total"] == 5 and len(first["items"]) == 2
+    assert inspector.children(0) is first
+    ids = [item["id"] for page in (0, 2, 4) for item in inspector.children(0, offset=page)["items"]]
+    assert len(set(ids)) == 5
+    with pytest.raises(ai.InspectorError):
+        inspector.children(0, prop="Nope")
+
+
+def test_probes(inspector):
+    sequence = _walk_to_sequence(inspector)
+    assert sequence["class"] == "Sequence" and sequence["child_properties"] == {"Components": 4}
+    clip, filler, op = inspector.children(sequence["id"], offset=0, limit=3)["items"]
+
+    chain = inspector.resolve_chain(clip["id"])
+    assert chain["resolved"]["path"] == "file:///media/a.mov"
+    assert inspector.resolve_chain(clip["id"]) is chain  # cached per node
+
+    effect = inspector.extract_effect(op["id"])
+    assert effect["operation"] == "Image : Submaster"
+
+    fragment = inspector.preview_fragment(op["id"])
+    built = inspector.build_timeline()["timeline"]["tracks"][0]["clips"]
+    assert fragment == [dict(built[1], **{"in": 0, "out": 40})]
+    with pytest.raises(ai.InspectorError):
+        inspector.extract_effect(filler["id"])
+
+
+def test_rpc_and_shell(inspector):
+    rpc = ai.InspectorRPC(inspector)
+    ok = json.loads(rpc.handle_line(json.dumps({"jsonrpc": "2.0", "id": 1, "method": "children", "params": {"node": 0}})))
+    assert ok["id"] == 1 and ok["result"]["total"] == 5
+    assert rpc.handle({"jsonrpc": "2.0", "id": 2, "method": "close"})["error"]["code"] == -32601
+    assert rpc.handle({"jsonrpc": "2.0", "id": 3, "method": "describe", "params": [999]})["error"]["code"] == -32000
+    assert json.loads(rpc.handle_line("{nope"))["error"]["code"] == -32700
+
+    out = io.StringIO()
+    shell = ai.InspectorShell(inspector, stdout=out)
+    for line in ("ls", "more", "cd 1", "info", "cd ..", "chain 1"):
+        shell.onecmd(line)
+    text = out.getvalue()
+    assert "(2 of 5; more)" in text and "(4 of 5; more)" in text
+    assert "error: Node is a" in text
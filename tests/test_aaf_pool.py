@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+
+pytest.importorskip("aaf2")
+
+from src import aaf_pool  # noqa: E402
+from src import build_canonical as bc  # noqa: E402
+
+
+def _timeline(aaf):
+    a = aaf.master_clip("A", "file:///media/a.mov")
+    aaf.composition("top.Exported.01", [aaf.clip(a, 0, 10), aaf.filler(5), aaf.clip(a, 10, 10)])
+
+
+@pytest.fixture
+def count_opens(monkeypatch):
+    opens = []
+    original_open = aaf_pool.aaf2.open
+    monkeypatch.setattr(aaf_pool.aaf2, "open", lambda *a, **k: opens.append(a[1:2]) or original_open(*a, **k))
+    return opens
+
+
+def test_repeat_builds_reuse_the_open_handle(make_aaf, count_opens):
+    path = str(make_aaf(_timeline))
+    with aaf_pool.AAFHandlePool(max_open=2) as pool:
+        first = bc.build_canonical_from_aaf(path, handle_pool=pool)
+        second = bc.build_canonical_from_aaf(path, handle_pool=pool)
+        assert count_opens.count(("r",)) == 1
+        assert first == second == bc.build_canonical_from_aaf(path)
+        assert pool.stats()["hits"] == 1
+
+
+def test_changed_file_is_reopened(make_aaf):
+    path = str(make_aaf(_timeline))
+    pool = aaf_pool.AAFHandlePool()
+    with pool.open(path) as handle:
+        stale = handle
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    with pool.open(path) as handle:
+        assert handle is not stale
+    assert stale.retired and pool.stats()["reopens"] == 1
+    pool.close()
+
+
+def test_lru_eviction_defers_close_of_handles_in_use(make_aaf):
+    paths = [str(make_aaf(_timeline, name=f"t{i}.aaf")) for i in range(3)]
+    pool = aaf_pool.AAFHandlePool(max_open=2)
+    closed = []
+    with pool.open(paths[0]) as busy:
+        busy.close = lambda: closed.append(busy.path)
+        for p in paths[1:]:
+            with pool.open(p):
+                pass
+        # paths[0] was least recently used and is evicted, but still held here
+        assert paths[0] not in pool and len(pool) == 2
+        assert closed == []
+    assert closed == [os.path.realpath(paths[0])]
+    with pool.open(paths[2]):
+        pass
+    assert pool.stats() == {"open": 2, "hits": 1, "misses": 3, "reopens": 0, "evictions": 1}
+    pool.close()
+
+
+def test_slow_open_does_not_block_other_files(make_aaf, monkeypatch):
+    import threading
+
+    slow, fast = (str(make_aaf(_timeline, name=name)) for name in ("slow.aaf", "fast.aaf"))
+    pool = aaf_pool.AAFHandlePool()
+    with pool.open(fast):
+        pass
+
+    opening, finish = threading.Event(), threading.Event()
+    original_open = aaf_pool.aaf2.open
+
+    def blocking_open(path, mode="r"):
+        if path == os.path.realpath(slow):
+            opening.set()
+            finish.wait(5)
+        return original_open(path, mode)
+
+    def use(path):
+        with pool.open(path):
+            pass
+
+    monkeypatch.setattr(aaf_pool.aaf2, "open", blocking_open)
+    worker = threading.Thread(target=use, args=(slow,))
+    worker.start()
+    try:
+        assert opening.wait(5)
+        hit = threading.Thread(target=use, args=(fast,))
+        hit.start()
+        hit.join(2)
+        assert not hit.is_alive() and pool.stats()["hits"] == 1
+    finally:
+        finish.set()
+        worker.join(5)
+    pool.close()
+
+
+def test_concurrent_builds_keep_their_own_state(make_aaf):
+    import threading
+
+    def timeline(n):
+        def build(aaf):
+            a = aaf.master_clip("A", "file:///media/a.mov")
+            aaf.composition("top.Exported.01", [aaf.clip(a, i % 50, 10) for i in range(n)])
+        return build
+
+    small, large = str(make_aaf(timeline(300), "small.aaf")), str(make_aaf(timeline(1500), "large.aaf"))
+    results = {}
+    start = threading.Barrier(2)
+
+    def run(name, path, **options):
+        start.wait()
+        canon = bc.build_canonical_from_aaf(path, handle_pool=pool, **options)
+        results[name] = len(canon["timeline"]["tracks"][0]["clips"])
+
+    with aaf_pool.AAFHandlePool() as pool:
+        threads = [
+            threading.Thread(target=run, args=("budgeted", small), kwargs={"budget": bc.TraversalBudget(max_nodes=100)}),
+            threading.Thread(target=run, args=("unbudgeted", large)),
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    assert results == {"budgeted": 100, "unbudgeted": 1500}
+    assert bc._build.get().strings is None
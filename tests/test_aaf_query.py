@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import pytest
+
+from src import aaf_query as q
+
+
+def _timeline(aaf):
+    a = aaf.master_clip("A", "file:///media/a.mov")
+    b = aaf.master_clip("B", "file:///media/b.mov")
+    inner = aaf.composition("inner", [aaf.clip(b, 0, 30)])
+    aaf.composition(
+        "top.Exported.01",
+        [
+            aaf.clip(a, 0, 100),
+            aaf.filler(50),
+            aaf.operation_group("Submaster", 40, [aaf.clip(b, 0, 40)], constants={"Level": 0.5}),
+            aaf.operation_group("Submaster", 20, [aaf.clip(a, 0, 20)], constants={"Level": 0.25}),
+            aaf.clip(inner, 0, 30),
+        ],
+    )
+
+
+@pytest.mark.parametrize("text", ["OperationGroup", "//", "//SourceClip[@Length >]", "//X[@a = bogus]", "//X[@a"])
+def test_syntax_errors(text):
+    with pytest.raises(q.QuerySyntaxError):
+        q.compile_query(text)
+
+
+def test_compiled_steps():
+    query = q.compile_query('/CompositionMob[@Name~="Exp" and not @x]//OperationGroup[@AvidEffectID="EFF2_PAN_SCAN"]')
+    assert [(s.descendant, s.test) for s in query.steps] == [(False, "CompositionMob"), (True, "OperationGroup")]
+    assert query.steps[1].effect_id() == "EFF2_PAN_SCAN"
+
+
+def test_string_literals_keep_non_ascii():
+    strings = [v for kind, v in q._tokenize(r"""[@Name="Café \"1\" \\"][@Name='l\'été']""") if kind == "string"]
+    assert strings == ['Café "1" \\', "l'été"]
+
+
+def test_queries_share_one_indexed_walk(make_aaf, monkeypatch):
+    aaf2 = pytest.importorskip("aaf2")
+    path = make_aaf(_timeline)
+    # No AvidEffectID in synthetic groups: tag the Level 0.5 one as a Pan & Scan
+    monkeypatch.setattr(
+        q, "_effect_id",
+        lambda obj: "EFF2_PAN_SCAN" if any(float(p.value) == 0.5 for p in obj.parameters) else None,
+    )
+    with aaf2.open(str(path), "r") as f:
+        index = q.GraphIndex(f)
+        top = '/CompositionMob[@Name="top.Exported.01"]/TimelineMobSlot/Sequence'
+
+        assert [n.cls for n in index.evaluate(top + "/*")] == [
+            "SourceClip", "Filler", "OperationGroup", "OperationGroup", "SourceClip"
+        ]
+        pan = index.evaluate('//OperationGroup[@AvidEffectID="EFF2_PAN_SCAN"]')
+        assert [n.get("Length") for n in pan] == [40]
+        assert [n.get("Length") for n in index.evaluate("//OperationGroup[@param.Level < 0.3]")] == [20]
+        # chain ends without a locator: only the nested-composition reference
+        unresolved = index.evaluate(top + "/SourceClip[not @chain.path]")
+        assert [n.get("Length") for n in unresolved] == [30]
+        assert [n.get("chain.path") for n in index.evaluate(top + "//SourceClip")] == [
+            "file:///media/a.mov", "file:///media/b.mov", "file:///media/a.mov", None
+        ]
+        assert len(index.evaluate("//Sequence//SourceClip")) == 5  # inner comp, source mobs excluded
+        assert q.select(index, "//NetworkLocator")[0].path == "/SourceMob[A.src]/ImportDescriptor[1]/NetworkLocator[1]"
+        assert index.walks == 1
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+
+aaf2 = pytest.importorskip("aaf2")
+
+import analyze_effect_params  # noqa: E402
+from src import aaf_snapshot as snap  # noqa: E402
+from src import build_canonical as bc  # noqa: E402
+
+
+def _timeline(aaf):
+    a = aaf.master_clip("A", "file:///media/a.mov")
+    b = aaf.master_clip("B", "file:///media/b.mov")
+    inner = aaf.composition("inner", [aaf.clip(a, 0, 20), aaf.clip(b, 0, 30)])
+    aaf.composition(
+        "top.Exported.01",
+        [
+            aaf.clip(a, 10, 40),
+            aaf.filler(12),
+            aaf.operation_group("Submaster", 25, [aaf.clip(b, 5, 25)], constants={"Level": 0.5}),
+            aaf.operation_group("Submaster", 10, [], animated={"Level": [(0, 0.0), (9, 1.0)]}),
+            aaf.clip(inner, 0, 50),
+        ],
+    )
+
+
+@pytest.fixture
+def exported(make_aaf, tmp_path):
+    aaf_path = str(make_aaf(_timeline))
+    return aaf_path, snap.export_snapshot(aaf_path, str(tmp_path / "timeline.aafsnap"))
+
+
+def test_builder_output_identical_from_snapshot(exported):
+    aaf_path, snapshot_path = exported
+    assert snap.is_snapshot(snapshot_path) and not snap.is_snapshot(aaf_path)
+    assert bc.build_canonical_from_aaf(snapshot_path) == bc.build_canonical_from_aaf(aaf_path)
+
+
+def test_read_api_mirrors_pyaaf2_accessors(exported):
+    aaf_path, snapshot_path = exported
+    with aaf2.open(aaf_path, "r") as f, snap.open_snapshot(snapshot_path) as s:
+        real_top = bc.select_top_sequence(f)[0]
+        top = bc.select_top_sequence(s)[0]
+        assert (type(top).__name__, top.name, str(top.mob_id)) == ("CompositionMob", real_top.name, str(real_top.mob_id))
+        assert float(top.slots[0].edit_rate) == 25.0
+
+        real_components = list(real_top.slots[0].segment.components)
+        components = top.slots[0].segment.components
+        assert [type(c).__name__ for c in components] == [type(c).__name__ for c in real_components]
+        for real, copy in zip(real_components, components):
+            assert copy.length == real.length
+            for attr in ("start", "mob_id", "parameters", "segments"):
+                assert hasattr(copy, attr) == hasattr(real, attr)
+
+        clip = components[0]
+        assert clip.mob is s.content.mobs.get(clip.mob_id)
+        assert clip.mob.name == "A"
+
+        static, animated = components[2], components[3]
+        (constant,) = static.parameters
+        assert (constant.name, constant.value) == ("Level", 0.5)
+        (varying,) = animated.parameters
+        assert not hasattr(varying, "value")
+        assert varying.get("PointList") is not None and constant.get("PointList") is None
+        assert [float(p.time) for p in varying.pointlist] == [0.0, 9.0]
+
+        assert top.classdef.class_name == "CompositionMob"
+        assert top.classdef.parent.class_name == "Mob"
+        assert {m.name for m in s.content.mastermobs()} == {"A", "B"}
+
+
+def test_snapshot_is_current_tracks_the_source(exported, tmp_path):
+    aaf_path, snapshot_path = exported
+    assert snap.snapshot_is_current(snapshot_path, aaf_path)
+    st = os.stat(aaf_path)
+    os.utime(aaf_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert not snap.snapshot_is_current(snapshot_path, aaf_path)
+    assert not snap.snapshot_is_current(str(tmp_path / "missing.aafsnap"), aaf_path)
+
+    with pytest.raises(snap.SnapshotError):
+        snap.open_snapshot(aaf_path)
+
+
+def test_analyze_effect_params_reads_snapshots(exported):
+    aaf_path, snapshot_path = exported
+    real, real_types = analyze_effect_params.inventory_all_parameters(aaf_path)
+    copy, copy_types = analyze_effect_params.inventory_all_parameters(snapshot_path)
+    assert {k: (v["count"], v["values"], v["types"]) for k, v in copy.items()} == {
+        k: (v["count"], v["values"], v["types"]) for k, v in real.items()
+    }
+    assert copy_types == real_types
+
+
+def test_out_dir_mirrors_subdirectories(make_aaf, tmp_path):
+    corpus = tmp_path / "corpus"
+    for sub in ("a", "b"):
+        (corpus / sub).mkdir(parents=True)
+        os.replace(make_aaf(_timeline, name=f"{sub}.aaf"), corpus / sub / "cut.aaf")
+    out = tmp_path / "snaps"
+
+    assert snap.main(["export", str(corpus), "--out-dir", str(out)]) == 0
+    for sub in ("a", "b"):
+        assert snap.snapshot_is_current(str(out / sub / "cut.aafsnap"), str(corpus / sub / "cut.aaf"))
+
+    with pytest.raises(SystemExit):
+        snap.main(["export", str(corpus / "a" / "cut.aaf"), str(corpus / "b" / "cut.aaf"), "--out-dir", str(out)])
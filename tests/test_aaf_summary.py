@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+pytest.importorskip("aaf2")
+
+from src import aaf_summary  # noqa: E402
+from src import build_canonical as bc  # noqa: E402
+
+
+def _timeline(aaf):
+    a = aaf.master_clip("A", "file:///media/a.mov")
+    aaf.composition("Selects", [aaf.clip(a, 0, 5)])
+    aaf.composition(
+        "top.Exported.01",
+        [
+            aaf.clip(a, 0, 10),
+            aaf.filler(5),
+            aaf.operation_group("Submaster", 20, [aaf.clip(a, 0, 20)], constants={"Level": 0.5}),
+            aaf.clip(a, 0, 15),
+        ],
+    )
+
+
+def test_summary_matches_builder_header_without_resolution(make_aaf, monkeypatch):
+    path = str(make_aaf(_timeline))
+    canon = bc.build_canonical_from_aaf(path)
+
+    def forbidden(*args, **kwargs):
+        raise AssertionError("summary mode must not resolve sources or decode parameters")
+
+    for name in ("build_mob_map", "extract_source_info_from_mob", "extract_fcpxml_relevant_parameters"):
+        monkeypatch.setattr(bc, name, forbidden)
+
+    summary = aaf_summary.summarize_aaf(path)
+    assert summary["composition"] == canon["timeline"]["name"] == "top.Exported.01"
+    assert summary["rate"] == canon["timeline"]["rate"]
+    assert summary["start"] == canon["timeline"]["start"]
+    assert (summary["duration_frames"], summary["duration"]) == (50, "00:00:02:00")
+    assert (summary["tracks"], summary["components"]) == (1, 4)
+    assert (summary["source_clips"], summary["fillers"], summary["operation_groups"]) == (2, 1, 1)
+
+
+def _timeline_with_audio_and_timecode(aaf):
+    _timeline(aaf)
+    comp = next(mob for mob in aaf.f.content.compositionmobs() if mob.name == "top.Exported.01")
+    audio = comp.create_timeline_slot(aaf.rate)
+    audio.segment = aaf.f.create.Sequence("sound")
+    for _ in range(3):
+        audio.segment.components.append(aaf.f.create.Filler("sound", 10))
+    # Sequence-wrapped timecode that does not start at the head of its track
+    timecode = aaf.f.create.Timecode(aaf.rate, False)
+    timecode.start, timecode.length = 90000, 45
+    tc_slot = comp.create_timeline_slot(aaf.rate)
+    tc_slot.segment = aaf.f.create.Sequence("timecode")
+    tc_slot.segment.components.append(aaf.f.create.Filler("timecode", 5))
+    tc_slot.segment.components.append(timecode)
+
+
+def test_summary_header_and_counts_match_builder_selection(make_aaf):
+    path = str(make_aaf(_timeline_with_audio_and_timecode))
+    canon = bc.build_canonical_from_aaf(path)
+    summary = aaf_summary.summarize_aaf(path)
+
+    assert canon["timeline"]["start"] == "01:00:00:00"
+    assert (summary["composition"], summary["rate"], summary["start"]) == (
+        canon["timeline"]["name"], canon["timeline"]["rate"], canon["timeline"]["start"],
+    )
+    # Only the picture track the builder converts is counted
+    assert (summary["components"], summary["fillers"], summary["duration_frames"]) == (4, 1, 50)
+    assert summary["source_clips"] + summary["operation_groups"] == len(canon["timeline"]["tracks"][0]["clips"])
+
+
+def test_batch_cli_prints_table_and_json(make_aaf, tmp_path, capsys):
+    path = str(make_aaf(_timeline))
+    missing = str(tmp_path / "missing.aaf")
+
+    assert aaf_summary.main([path, missing]) == 1
+    table = capsys.readouterr().out.splitlines()
+    assert table[0].split()[:3] == ["file", "composition", "rate"]
+    assert "top.Exported.01" in table[1]
+    assert "ERROR" in table[2]
+
+    assert aaf_summary.main([str(tmp_path), "--json"]) == 0
+    rows = json.loads(capsys.readouterr().out)
+    assert [r["composition"] for r in rows] == ["top.Exported.01"]
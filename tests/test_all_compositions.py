@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("aaf2")
+
+from src import build_canonical as bc  # noqa: E402
+
+
+def _bin_export(aaf):
+    a = aaf.master_clip("A", "file:///media/a.mov")
+    b = aaf.master_clip("B", "file:///media/b.mov")
+    aaf.composition("Reel1.Exported.01", [aaf.clip(a, 0, 10), aaf.clip(b, 0, 5)])
+    aaf.composition("Reel2.Exported.01", [aaf.clip(b, 0, 20)])
+    aaf.composition("Reel3.Exported.01", [aaf.clip(a, 5, 5), aaf.filler(5), aaf.clip(a, 0, 5)])
+    aaf.composition("Selects", [aaf.clip(b, 10, 10)])
+
+
+def test_all_compositions_share_one_open(make_aaf, monkeypatch):
+    path = str(make_aaf(_bin_export))
+    opens = []
+    original_open = bc.aaf2.open
+    monkeypatch.setattr(bc.aaf2, "open", lambda *a, **k: opens.append(a) or original_open(*a, **k))
+
+    canons = bc.build_canonical_for_compositions(path)
+    assert len(opens) == 1
+    assert [c["timeline"]["name"] for c in canons] == [
+        "Reel1.Exported.01", "Reel2.Exported.01", "Reel3.Exported.01", "Selects"
+    ]
+    # the first composition matches what the single-timeline builder selects
+    assert canons[0] == bc.build_canonical_from_aaf(path)
+    assert [c["name"] for c in canons[2]["timeline"]["tracks"][0]["clips"]] == ["A", "A"]
+
+
+def test_select_regex_and_workers_match_serial(make_aaf):
+    path = str(make_aaf(_bin_export))
+    serial = bc.build_canonical_for_compositions(path, select=r"^Reel[23]")
+    assert [c["timeline"]["name"] for c in serial] == ["Reel2.Exported.01", "Reel3.Exported.01"]
+    assert bc.build_canonical_for_compositions(path, select=r"^Reel[23]", workers=2) == serial
+    assert bc.build_canonical_for_compositions(path, select="nothing") == []
+
+
+def test_workers_need_process_shared_cancel_token(make_aaf):
+    import multiprocessing
+
+    path = str(make_aaf(_bin_export))
+    with pytest.raises(ValueError, match="process-shared"):
+        bc.build_canonical_for_compositions(path, workers=2, cancel_token=bc.CancellationToken())
+
+    with multiprocessing.Manager() as manager:
+        token = bc.CancellationToken(manager.Event())
+        canons = bc.build_canonical_for_compositions(path, workers=2, cancel_token=token)
+        assert [c["timeline"]["name"] for c in canons][:1] == ["Reel1.Exported.01"]
+        token.cancel()
+        cancelled = bc.build_canonical_for_compositions(path, workers=2, cancel_token=token)
+    assert all(c["diagnostics"][0]["budget"] == "cancelled" for c in cancelled)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("aaf2")
+
+from src.async_convert import AsyncConverter  # noqa: E402
+from src.build_canonical import build_canonical_from_aaf  # noqa: E402
+
+
+def _timeline(aaf):
+    a = aaf.master_clip("A", "file:///media/a.mov")
+    aaf.composition("top.Exported.01", [aaf.clip(a, i * 10, 10) for i in range(20)])
+
+
+def test_convert_matches_sync_builder_and_streams_progress(make_aaf, tmp_path):
+    path = make_aaf(_timeline)
+
+    async def run():
+        async with AsyncConverter(max_workers=2) as converter:
+            job = converter.submit_aaf(str(path))
+            stages = [event["stage"] async for event in job.progress()]
+            canon = await job.result()
+            out = await converter.write_fcpxml(canon, str(tmp_path / "out.fcpxml"))
+            return stages, canon, out
+
+    stages, canon, out = asyncio.run(run())
+    assert stages[:2] == ["queued", "running"] and stages[-1] == "done"
+    assert set(stages[2:-1]) == {"progress"}
+    assert canon == build_canonical_from_aaf(str(path))
+    assert (tmp_path / "out.fcpxml").exists() and out.endswith("out.fcpxml")
+
+
+def test_concurrent_conversions_share_bounded_pool(make_aaf):
+    path = make_aaf(_timeline)
+
+    async def run():
+        async with AsyncConverter(max_workers=2) as converter:
+            results = await asyncio.gather(*(converter.convert_aaf(str(path)) for _ in range(5)))
+            return results, converter._loop_semaphore()._value
+
+    results, free_slots = asyncio.run(run())
+    assert len(results) == 5
+    assert all(r == results[0] for r in results)
+    assert free_slots == 2
+
+
+def test_converter_serves_successive_event_loops(make_aaf):
+    path = str(make_aaf(_timeline))
+    converter = AsyncConverter(max_workers=1)  # like get_converter(): outlives each asyncio.run()
+
+    async def run():
+        return await asyncio.gather(*(converter.convert_aaf(path) for _ in range(3)))
+
+    try:
+        first, second = asyncio.run(run()), asyncio.run(run())
+    finally:
+        converter.close()
+    assert len(first) == len(second) == 3
+    assert all(r == first[0] for r in first + second)
+
+
+def test_timeout_cancels_worker(make_aaf):
+    path = make_aaf(_timeline)
+
+    async def run():
+        async with AsyncConverter(max_workers=1) as converter:
+            job = converter.submit_aaf(str(path), timeout=0)
+            with pytest.raises(asyncio.TimeoutError):
+                await job.result()
+            stages = [event["stage"] async for event in job.progress()]
+            return stages, job._cancel_event.is_set()
+
+    stages, cancelled = asyncio.run(run())
+    assert cancelled
+    assert "cancelled" in stages
+
+
+def _long_timeline(aaf):
+    a = aaf.master_clip("A", "file:///media/a.mov")
+    aaf.composition("top.Exported.01", [aaf.clip(a, i * 10, 10) for i in range(1500)])
+
+
+def test_cancel_and_timeout_while_queued_end_progress(make_aaf):
+    path = make_aaf(_long_timeline)
+
+    async def drain(job):
+        return [event async for event in job.progress()]
+
+    async def run():
+        async with AsyncConverter(max_workers=1) as converter:
+            running = converter.submit_aaf(str(path))
+            cancelled = converter.submit_aaf(str(path))
+            timed_out = converter.submit_aaf(str(path), timeout=0.2)
+            await asyncio.sleep(0.05)
+            cancelled.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await cancelled.result()
+            with pytest.raises(asyncio.TimeoutError):
+                await timed_out.result()
+            events = [await asyncio.wait_for(drain(job), 5) for job in (cancelled, timed_out)]
+            await running.result()
+            return events, converter._loop_semaphore()._value
+
+    (cancelled, timed_out), free_slots = asyncio.run(run())
+    assert [e["stage"] for e in cancelled] == ["queued", "cancelled"]
+    assert cancelled[-1]["detail"] == {"reason": "cancelled", "queued": True}
+    assert [e["stage"] for e in timed_out] == ["queued", "cancelled"]
+    assert timed_out[-1]["detail"]["reason"] == "timeout"
+    assert free_slots == 1
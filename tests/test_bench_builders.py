@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import copy
+import os
+
+import pytest
+
+from src.tools import bench_builders as bb
+
+
+def _canon(clips):
+    return {"timeline": {"name": "T", "rate": 25, "start": "10:00:00:00", "tracks": [{"clips": clips}]}}
+
+
+def _clip(name, t_in, t_out):
+    return {"name": name, "in": t_in, "out": t_out, "source_umid": "u", "source_path": None,
+            "effect_params": {"operation": "N/A", "parameters": {}}}
+
+
+def test_diff_canonical_reports_changed_missing_and_header_fields():
+    base = _canon([_clip("A", 0, 10), _clip("B", 10, 20), _clip("C", 20, 30)])
+    variant = copy.deepcopy(base)
+    variant["timeline"]["rate"] = 24
+    variant["timeline"]["tracks"][0]["clips"][1]["out"] = 21
+    del variant["timeline"]["tracks"][0]["clips"][2]
+
+    d = bb.diff_canonical(base, variant)
+    assert not d["equal"]
+    assert d["header"] == {"rate": [25, 24]}
+    assert d["events"] == [3, 2]
+    assert d["changed_events"] == 2
+    assert d["fields"] == {"out": 1, "(missing)": 1}
+    assert d["examples"][0] == {"index": 1, "field": "out", "baseline": 20, "variant": 21}
+    assert bb.diff_canonical(base, copy.deepcopy(base))["equal"]
+
+
+def test_benchmark_runs_variants_in_fresh_interpreters(tmp_path):
+    pytest.importorskip("aaf2")
+    aaf_path = bb.synthetic_corpus(str(tmp_path), 30)
+    current = os.path.normpath(os.path.join(bb.SRC, "build_canonical.py"))
+    assert bb.default_variants()[0] == current
+
+    report = bb.benchmark([current, current], [aaf_path])
+    assert [r["error"] for r in report] == [None, None]
+    assert report[0]["events"] > 0 and report[0]["peak_rss_mb"] > 0
+    assert report[1]["diff"]["equal"]
+    assert "identical" in bb.format_report(report, current)
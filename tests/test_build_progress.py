@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import io
+import json
+
+import pytest
+
+from src.build_progress import ProgressReporter, json_lines_printer, progress_bar_printer
+
+aaf2 = pytest.importorskip("aaf2")
+
+from src import build_canonical as bc  # noqa: E402
+
+
+def _timeline(aaf):
+    a = aaf.master_clip("A", "file:///media/a.mov")
+    aaf.composition(
+        "top.Exported.01",
+        [
+            aaf.clip(a, 0, 10),
+            aaf.filler(5),
+            aaf.operation_group("Submaster", 20, [aaf.clip(a, 0, 20)], constants={"Level": 0.5}),
+            aaf.clip(a, 0, 15),
+        ],
+    )
+
+
+def test_estimate_counts_top_level_components_and_effects(make_aaf):
+    path = make_aaf(_timeline)
+    assert bc.estimate_aaf_work(str(path)) == {"components": 4, "operation_groups": 1, "total": 5}
+
+
+def test_builder_reports_start_and_final_progress(make_aaf):
+    path = make_aaf(_timeline)
+    updates = []
+    bc.build_canonical_from_aaf(str(path), progress=updates.append, progress_interval=0)
+
+    assert updates[0]["events"] == 0 and updates[0]["total"] == 5 and not updates[0]["final"]
+    final = updates[-1]
+    assert final["final"] is True
+    assert (final["events"], final["offset"], final["done"], final["fraction"]) == (3, 50, 5, 1.0)
+    # one update per top-level component when rate limiting is disabled
+    assert [u["done"] for u in updates[1:-1]] == [1, 2, 4, 5]
+
+
+def test_progress_callbacks_are_rate_limited():
+    updates = []
+    reporter = ProgressReporter(updates.append, min_interval=3600)
+    reporter.start({"total": 10})
+    for i in range(10):
+        reporter.advance(object(), i, i * 10)
+    reporter.finish(10, 100)
+    assert [u["final"] for u in updates] == [False, True]
+    assert updates[-1]["done"] == 10
+
+
+def test_cli_consumers_render_updates():
+    update = {"events": 3, "offset": 50, "elapsed": 0.2, "done": 5, "total": 5, "fraction": 1.0, "final": True}
+
+    bar = io.StringIO()
+    progress_bar_printer(bar, width=10)(update)
+    assert bar.getvalue() == "\r[##########] 100.0% 3 events @ frame 50 0.2s\n"
+
+    lines = io.StringIO()
+    json_lines_printer(lines)(update)
+    assert json.loads(lines.getvalue()) == {"progress": update}
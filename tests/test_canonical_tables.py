@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import json
+
+from src.canonical_tables import collapse_canonical, expand_canonical, is_normalized
+from src.write_fcpxml import write_fcpxml_from_canonical
+
+
+def _spec_canon(n=60):
+    events = []
+    for i in range(n):
+        reel = i % 3
+        events.append(
+            {
+                "id": f"ev_{i + 1:04d}",
+                "timeline_start_frames": i * 25,
+                "length_frames": 25,
+                "source": None
+                if i % 10 == 9
+                else {
+                    "path": f"//Share/Media/CamA/shot_{reel:03d}.mov",
+                    "umid_chain": [f"{{UMID-M{reel}}}", f"{{UMID-S{reel}}}"],
+                    "tape_id": None,
+                    "disk_label": "RADIANT01",
+                    "src_tc_start_frames": 86400,
+                    "src_rate_fps": 25.0,
+                    "src_drop": False,
+                    "orig_length_frames": 1500,
+                },
+                "effect": {
+                    "name": "AVX:PanZoom" if i % 10 == 9 else "(none)",
+                    "on_filler": i % 10 == 9,
+                    "parameters": {"Scale": 1.05} if i % 10 == 9 else {},
+                    "keyframes": {},
+                    "external_refs": [],
+                },
+            }
+        )
+    return {
+        "project": {"name": "EP1", "edit_rate_fps": 25.0, "tc_format": "NDF"},
+        "timeline": {"name": "EP1.Exported.01", "start_tc_frames": 3600, "events": events},
+    }
+
+
+def test_collapse_expand_round_trip_is_lossless():
+    canon = _spec_canon()
+    collapsed = collapse_canonical(canon)
+
+    assert is_normalized(collapsed) and not is_normalized(canon)
+    assert len(collapsed["sources"]) == 3 and len(collapsed["effect_templates"]) == 2
+    first = collapsed["timeline"]["events"][0]
+    assert list(first) == ["id", "timeline_start_frames", "length_frames", "source_ref", "effect_ref"]
+    assert collapsed["timeline"]["events"][9]["source_ref"] is None
+
+    expanded = expand_canonical(collapsed)
+    assert json.dumps(expanded) == json.dumps(canon)
+    assert len(json.dumps(canon)) > 3 * len(json.dumps(collapsed))
+    assert collapse_canonical(collapsed) is collapsed
+
+
+def test_builder_clip_layout_round_trip():
+    clip = {"name": "A", "in": 0, "out": 10, "source_umid": "u1", "source_path": "/a.mov",
+            "effect_params": {"operation": "N/A", "parameters": {}}}
+    canon = {"timeline": {"name": "t", "rate": 25, "start": "00:00:00:00",
+                          "tracks": [{"clips": [clip, dict(clip, **{"in": 10, "out": 20})]}]}}
+    collapsed = collapse_canonical(canon)
+    clips = collapsed["timeline"]["tracks"][0]["clips"]
+    assert clips[0] == {"name": "A", "in": 0, "out": 10, "source_ref": 0, "effect_ref": 0}
+    assert collapsed["sources"] == [{"source_umid": "u1", "source_path": "/a.mov"}]
+    assert json.dumps(expand_canonical(collapsed)) == json.dumps(canon)
+
+
+def test_writer_output_identical_for_both_layouts(tmp_path):
+    canon = _spec_canon()
+    expanded_out = tmp_path / "expanded.fcpxml"
+    normalized_out = tmp_path / "normalized.fcpxml"
+    write_fcpxml_from_canonical(canon, str(expanded_out))
+    write_fcpxml_from_canonical(collapse_canonical(canon), str(normalized_out))
+    assert expanded_out.read_bytes() == normalized_out.read_bytes()
+    assert expanded_out.read_text(encoding="utf-8").count("<asset ") == 3
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import itertools
+
+import pytest
+
+from src.conversion_cost import PRIOR_WEIGHTS, CostModel, lpt_order, makespan
+
+
+def test_model_learns_timings_and_persists(tmp_path):
+    path = str(tmp_path / "model.json")
+    model = CostModel.load(path)
+    assert model.weights == list(PRIOR_WEIGHTS)
+    small, large = {"size": 1 << 20, "objects": 500, "effects": 2}, {"size": 400 << 20, "objects": 90000, "effects": 800}
+    assert model.predict(large) > model.predict(small)
+
+    # this machine: 0.5s fixed, 2s per 1000 objects, size and effects free
+    for size, objects, effects in itertools.product((1, 50, 400), (200, 5000, 90000), (0, 40, 800)):
+        features = {"size": size << 20, "objects": objects, "effects": effects}
+        model.observe(features, 0.5 + 2.0 * objects / 1000)
+    assert model.predict(large) == pytest.approx(180.5, rel=0.01)
+    model.save()
+
+    reloaded = CostModel.load(path)
+    assert len(reloaded.samples) == 27
+    assert reloaded.predict(small) == pytest.approx(model.predict(small))
+
+
+def test_lpt_reduces_makespan():
+    costs = [1, 1, 1, 1, 1, 1, 12, 2, 2]    # the big conform last in directory order
+    order = lpt_order(costs)
+    assert order[0] == 6 and order[1:3] == [7, 8]
+    assert makespan(costs, 3) == 14
+    assert makespan(costs, 3, order) == 12
+
+
+def test_batch_converts_longest_first(make_aaf, monkeypatch, tmp_path):
+    from src import batch_convert
+
+    def timeline(n):
+        def build(aaf):
+            mob = aaf.master_clip("A", url="file:///media/a.mov")
+            aaf.composition("cut.Exported.01", [aaf.clip(mob, i, 10) for i in range(n)])
+        return build
+
+    paths = [str(make_aaf(timeline(n), name=f"reel{n:02d}.aaf")) for n in (2, 40, 10)]
+    started = []
+    convert_one = batch_convert._convert_one
+    monkeypatch.setattr(batch_convert, "_convert_one", lambda path, *a: started.append(path) or convert_one(path, *a))
+
+    results = batch_convert.BatchConverter(str(tmp_path / "out"), write_fcpxml=False).run(paths)
+    assert started == [paths[1], paths[2], paths[0]]
+    assert results[1]["predicted"] > results[2]["predicted"] > results[0]["predicted"]
+    model = CostModel.load(str(tmp_path / "out" / batch_convert.COST_MODEL_NAME))
+    assert len(model.samples) == 3 and model.samples[1][1] > model.samples[0][1]
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import dataclasses
+
+import pytest
+
+from src.event_model import Effect, Event, Source
+
+
+def test_to_canonical_matches_legacy_clip_shape():
+    params = {"pan": 0.5}
+    event = Event("A + Pan", 10, 34, Source("urn:umid", "/media/a.mov"), Effect("Avid Pan & Zoom", params))
+    canon = event.to_canonical()
+    assert canon == {
+        "name": "A + Pan",
+        "in": 10,
+        "out": 34,
+        "source_umid": "urn:umid",
+        "source_path": "/media/a.mov",
+        "effect_params": {"operation": "Avid Pan & Zoom", "parameters": {"pan": 0.5}},
+    }
+    # serialised parameters are a copy; the shared Effect stays untouched
+    canon["effect_params"]["parameters"]["pan"] = 1.0
+    assert params == {"pan": 0.5}
+
+
+def test_events_are_slotted_and_frozen():
+    event = Event("A", 0, 10, Source("u", None), Effect("N/A", {}))
+    assert not hasattr(event, "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        event.timeline_in = 5
+    moved = event.rebased(100, 105)
+    assert (moved.timeline_in, moved.timeline_out) == (100, 105)
+    assert moved.source is event.source and moved.effect is event.effect
+
+
+def test_builder_output_is_plain_dicts(make_aaf):
+    pytest.importorskip("aaf2")
+    from src import build_canonical as bc
+
+    def timeline(aaf):
+        a = aaf.master_clip("A", "file:///media/a.mov")
+        aaf.composition(
+            "top.Exported.01",
+            [aaf.clip(a, 0, 10), aaf.operation_group("Submaster", 5, [], constants={"Level": 0.5})],
+        )
+
+    clips = bc.build_canonical_from_aaf(str(make_aaf(timeline)))["timeline"]["tracks"][0]["clips"]
+    assert all(type(c) is dict and type(c["effect_params"]) is dict for c in clips)
+    assert [(c["name"], c["in"], c["out"]) for c in clips] == [("A", 0, 10), ("FX_ON_FILLER: Image : Submaster", 10, 15)]
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import pytest
+
+from src import retime_curves as rc
+from src.keyframe_bake import KeyframeBake, decimate
+
+aaf2 = pytest.importorskip("aaf2")
+
+from aaf2.interpolation import bezier_interpolate  # noqa: E402
+from aaf2.misc import BezierInterpolator  # noqa: E402
+
+from src import build_canonical as bc  # noqa: E402
+
+# keyframe (time, value) and ((in_dt, in_dv), (out_dt, out_dv)) handles
+KEYS = [(0.0, 0.0), (10.0, 8.0), (30.0, 2.0)]
+HANDLES = [((0.0, 0.0), (4.0, 6.0)), ((-2.0, -1.0), (15.0, 0.0)), ((-5.0, 3.0), (0.0, 0.0))]
+
+
+@pytest.mark.parametrize("use_numpy", [False, pytest.param(True, marks=pytest.mark.skipif(not rc.HAS_NUMPY, reason="numpy not installed"))])
+def test_bezier_curve_matches_pyaaf2(use_numpy):
+    curve = rc.Curve([t for t, _ in KEYS], [v for _, v in KEYS], "bezier", HANDLES)
+    frames = [f * 0.5 for f in range(61)]
+    expected = []
+    for f in frames:
+        i = 0 if f < 10 else 1
+        (t0, v0), (t3, v3) = KEYS[i], KEYS[i + 1]
+        out_h, in_h = HANDLES[i][1], HANDLES[i + 1][0]
+        if f in (t0, t3):
+            expected.append(v0 if f == t0 else v3)
+            continue
+        p1 = (t0 + out_h[0], v0 + out_h[1])
+        p2 = (t3 + in_h[0], v3 + in_h[1])
+        expected.append(bezier_interpolate((t0, v0), p1, p2, (t3, v3), f))
+    assert curve.evaluate(frames, use_numpy=use_numpy) == pytest.approx(expected, abs=1e-6)
+    assert rc.Curve([0, 1], [0, 1], "bezier").kind == "cubic"  # no handles
+
+
+def test_policy_modes_and_sample_counts():
+    with pytest.raises(ValueError):
+        KeyframeBake(default="smooth")
+    bake = KeyframeBake(parameters={"Level": "keep", "AFX_BLUR": "decimate"}, step=4)
+    assert bake.mode_for("AFX_X", "linear") == "keep"
+    assert bake.mode_for("AFX_X", "bezier") == "bake"
+    assert bake.mode_for("Level", "bezier") == "keep"
+
+    hold = rc.Curve([0, 10], [1.0, 5.0], "constant")
+    frames, values = bake.bake("AFX_X", hold, 20)
+    assert frames == [0, 4, 8, 12, 16, 19]
+    assert values == [1.0, 1.0, 1.0, 5.0, 5.0, 5.0]
+    assert bake.bake("Level", hold, 20) is None
+    assert bake.bake("AFX_BLUR", rc.Curve([0, 20], [0.0, 8.0], "linear"), 20) == ([0, 19], [0.0, pytest.approx(7.6)])
+
+    stats = bake.stats()
+    assert (stats["animated"], stats["baked"], stats["keyframes"], stats["samples"]) == (3, 2, 4, 8)
+    assert stats["samples_added"] == 4 and stats["decimated"] == 4
+    assert stats["by_parameter"]["AFX_BLUR"] == {"baked": 1, "keyframes": 2, "samples": 2}
+    assert "+4" in bake.report()
+
+
+def test_decimate_keeps_error_within_tolerance():
+    frames = list(range(100))
+    values = [(f / 10.0) ** 2 for f in frames]
+    keep = decimate(frames, values, 0.05)
+    assert keep[0] == 0 and keep[-1] == 99 and len(keep) < 40
+    kept = rc.Curve([frames[i] for i in keep], [values[i] for i in keep], "linear")
+    assert max(abs(a - b) for a, b in zip(kept.evaluate(frames, use_numpy=False), values)) <= 0.05
+
+
+def _timeline(aaf):
+    bezier = aaf.f.create.InterpolationDef(BezierInterpolator, "BezierInterpolator", "")
+    aaf.f.dictionary.register_def(bezier)
+    pdef = aaf._parameter_def("AFX_BLUR")
+    eased = aaf.operation_group("Blur", 20, [])
+    varying = aaf.f.create.VaryingValue(pdef, "BezierInterpolator")
+    eased.parameters.append(varying)
+    for t, v in ((0, 0.0), (1, 8.0)):
+        varying.add_keyframe(t, v)
+    linear = aaf.operation_group("Blur", 20, [], animated={"AFX_BLUR": [(0, 0.0), (0.5, 4.0), (1, 8.0)]})
+    aaf.composition("top.Exported.01", [eased, linear])
+
+
+def test_builder_bakes_unsupported_interpolations(make_aaf):
+    path = str(make_aaf(_timeline))
+    kept = bc.build_canonical_from_aaf(path, keyframe_bake=KeyframeBake(default="keep"))["timeline"]["tracks"][0]["clips"]
+    assert [len(c["effect_params"]["parameters"]["AFX_BLUR"]["keyframes"]) for c in kept] == [2, 3]
+
+    bake = KeyframeBake()
+    eased, linear = bc.build_canonical_from_aaf(path, keyframe_bake=bake)["timeline"]["tracks"][0]["clips"]
+    baked = eased["effect_params"]["parameters"]["AFX_BLUR"]
+    assert baked["baked"] == {"interpolation": "bezier", "keyframes": 2, "step": 1}
+    assert [k["normalized_time"] for k in baked["keyframes"]] == [f / 20 for f in range(20)]
+
+    with aaf2.open(path, "r") as f:
+        comp = bc.select_top_sequence(f)[0]
+        (varying,) = next(iter(comp.slots[0].segment.components)).parameters
+        expected = [varying.value_at(f / 20) for f in range(20)]
+    assert [k["value"] for k in baked["keyframes"]] == pytest.approx(expected, abs=1e-6)
+    assert linear["effect_params"]["parameters"]["AFX_BLUR"] == kept[1]["effect_params"]["parameters"]["AFX_BLUR"]
+    assert (bake.animated, bake.baked, bake.samples_added) == (2, 1, 18)
+
+
+def _animated_only(aaf):
+    a = aaf.master_clip("A", url="file:///media/a.mov")
+    blur = aaf.operation_group(
+        "Blur", 20, [aaf.clip(a, 0, 20)], constants={"Level": 0.5},
+        animated={"AFX_BLUR": [(0, 0.25), (0.5, 0.75), (1, 0.1)]},
+    )
+    plain = aaf.operation_group("Blur", 20, [aaf.clip(a, 0, 20)], constants={"Level": 0.5})
+    aaf.composition("top.Exported.01", [blur, plain])
+
+
+def test_default_output_includes_animated_parameters(make_aaf):
+    """Builds without keyframe_bake= emit keyframed parameters (CANONICAL_VERSION 2)."""
+    path = str(make_aaf(_animated_only))
+    blur, plain = bc.build_canonical_from_aaf(path)["timeline"]["tracks"][0]["clips"]
+
+    # before: {"Level": {"type": "static", "value": 0.5}} only, the VaryingValue was skipped
+    params = blur["effect_params"]["parameters"]
+    assert params["Level"] == {"type": "static", "value": 0.5}
+    assert params["AFX_BLUR"]["type"] == "animated"
+    assert [(k["normalized_time"], k["value"]) for k in params["AFX_BLUR"]["keyframes"]] == [
+        (0.0, 0.25), (0.5, 0.75), (1.0, 0.1),
+    ]
+    assert [k["time_seconds"] for k in params["AFX_BLUR"]["keyframes"]] == pytest.approx([0.0, 0.4, 0.8])
+    # unchanged: groups without keyframes, and their shared parameter set
+    assert plain["effect_params"]["parameters"] == {"Level": {"type": "static", "value": 0.5}}
+    assert bc.CANONICAL_VERSION >= 2
+
+
+def test_keyframe_labels_read_from_property_names(make_aaf):
+    """Time/Value come from the ControlPoint property names, not the rational heuristic."""
+    path = str(make_aaf(_animated_only))
+    with aaf2.open(path, "r") as f:
+        comp = bc.select_top_sequence(f)[0]
+        blur = next(iter(comp.slots[0].segment.components))
+        (varying,) = [p for p in blur.parameters if not hasattr(p, "value")]
+        keyframes = bc.extract_keyframe_timing_data(varying)["keyframes"]
+        # before: labels were read from propertydef.name ("PropertyDefinition") and never matched
+        assert [str(pr.propertydef.name) for pr in varying.pointlist[0].properties()][:1] == ["PropertyDefinition"]
+    assert [(k["normalized_time"], k["value"]) for k in keyframes] == [(0.0, 0.25), (0.5, 0.75), (1.0, 0.1)]
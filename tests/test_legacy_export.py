@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import gzip
+import io
+import json
+
+import pytest
+
+pytest.importorskip("aaf2")
+
+from src import legacy_export  # noqa: E402
+
+
+def _timeline(aaf):
+    a = aaf.master_clip("A", "file:///media/a.mov")
+    b = aaf.master_clip("B", "file:///media/b.mov")
+    inner = aaf.composition("inner", [aaf.clip(b, 0, 30)])
+    aaf.composition(
+        "top.Exported.01",
+        [
+            aaf.clip(a, 0, 100),
+            aaf.filler(50),
+            aaf.operation_group("Submaster", 40, [aaf.clip(b, 0, 40)], constants={"Level": 0.5}),
+            aaf.clip(inner, 0, 30),
+            aaf.clip(a, 100, 80),
+        ],
+    )
+
+
+def test_export_inlines_resolved_sources(make_aaf):
+    path = str(make_aaf(_timeline))
+    out = io.StringIO()
+    legacy_export.export_legacy_json(path, out)
+    doc = json.loads(out.getvalue())
+
+    assert doc["format"] == "legacy_compressed_json"
+    comp = doc["CompositionMob"]
+    assert comp["Name"] == "top.Exported.01"
+    clip, filler, op, nested, clip2 = comp["Slots"][0]["Segment"]["Components"]
+    assert clip["Resolved"]["path"] == "file:///media/a.mov"
+    assert clip["Resolved"]["clip_name"] == "A"
+    assert clip2["Resolved"] == clip["Resolved"]
+    assert filler == {"class": "Filler", "Length": 50}
+    assert op["Operation"] == "Image : Submaster"
+    assert op["Parameters"] == [{"Name": "Level", "Value": 0.5}]
+    assert op["InputSegments"][0]["Resolved"]["path"] == "file:///media/b.mov"
+    assert nested["Resolved"]["composition"] == "inner"
+
+
+def test_export_streams_in_bounded_writes(make_aaf, monkeypatch):
+    path = str(make_aaf(_timeline))
+    monkeypatch.setattr(legacy_export, "_WRITE_BUFFER", 256)
+    writes = []
+
+    class Recorder(io.StringIO):
+        def write(self, text):
+            writes.append(len(text))
+            return super().write(text)
+
+    out = Recorder()
+    written = legacy_export.export_legacy_json(path, out)
+    assert written == len(out.getvalue()) and len(writes) > 3
+    # each write is one buffer's worth plus at most one serialized component
+    assert max(writes) < 256 + 1024
+
+
+def test_cli_gzip_by_suffix(make_aaf, tmp_path):
+    path = str(make_aaf(_timeline))
+    out = tmp_path / "top.legacy.json.gz"
+    assert legacy_export.main([path, "-o", str(out)]) == 0
+    with gzip.open(out, "rt", encoding="utf-8") as f:
+        assert json.load(f)["CompositionMob"]["Name"] == "top.Exported.01"
+
+
+def test_export_releases_components_as_it_streams(make_aaf):
+    import gc
+
+    from aaf2.components import Component
+
+    def long_timeline(n):
+        def build(aaf):
+            a = aaf.master_clip("A", "file:///media/a.mov")
+            aaf.composition("top.Exported.01", [aaf.clip(a, i % 100, 10) for i in range(n)])
+        return build
+
+    def live_components_at_end(n):
+        with legacy_export.aaf2.open(str(make_aaf(long_timeline(n), name=f"long{n}.aaf")), "r") as f:
+            fragments = legacy_export.iter_legacy_json(f)
+            for text in fragments:
+                if text == "]}":  # the top Sequence's component array is closed
+                    break
+            gc.collect()
+            live = sum(isinstance(o, Component) for o in gc.get_objects())
+            fragments.close()
+        return live
+
+    # pyaaf2's own read cache keeps the last 512 objects; past that, nothing grows
+    short, long = live_components_at_end(600), live_components_at_end(1200)
+    assert long <= short + 5 < 600
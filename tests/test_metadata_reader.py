@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import os
+import wave
+
+import pytest
+
+aaf2 = pytest.importorskip("aaf2")
+
+from src import build_canonical as bc  # noqa: E402
+from src.metadata_reader import EssenceAccessError, ReadAccounting, open_metadata_only  # noqa: E402
+
+ESSENCE_SECONDS = 60
+
+
+@pytest.fixture
+def embedded_aaf(make_aaf, tmp_path):
+    """Timeline referencing a MasterMob whose audio essence (~5.8 MB) is embedded in the AAF."""
+    wav = tmp_path / "tone.wav"
+    with wave.open(str(wav), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(48000)
+        w.writeframes(os.urandom(48000 * 2 * ESSENCE_SECONDS))
+
+    def build(aaf):
+        embedded = aaf.f.create.MasterMob("Embedded")
+        aaf.f.content.mobs.append(embedded)
+        embedded.import_audio_essence(str(wav), aaf.rate)
+        linked = aaf.master_clip("Linked", "file:///media/linked.mov")
+        aaf.composition(
+            "top.Exported.01",
+            [
+                aaf.clip(linked, 0, 50),
+                aaf.operation_group("Submaster", 25, [aaf.clip(linked, 50, 25)], constants={"Level": 0.5}),
+                aaf.clip(embedded, 0, 100),
+            ],
+        )
+
+    return str(make_aaf(build, name="embedded.aaf"))
+
+
+def test_metadata_only_build_reads_a_fraction_of_the_file(embedded_aaf):
+    accounting = ReadAccounting()
+    canon = bc.build_canonical_from_aaf(embedded_aaf, read_accounting=accounting)
+
+    assert canon == bc.build_canonical_from_aaf(embedded_aaf)
+    stats = accounting.stats()
+    assert stats["file_size"] == os.path.getsize(embedded_aaf)
+    assert stats["essence_bytes"] == 0
+    assert accounting.fraction_read < 0.10
+    assert sum(row["file_bytes"] for row in accounting.breakdown()) == stats["file_bytes"]
+    assert "(structure)" in accounting.report()
+
+
+def test_essence_streams_refused_skipped_or_counted(embedded_aaf):
+    with open_metadata_only(embedded_aaf) as f:
+        essence = next(iter(f.content.essencedata))
+        with pytest.raises(EssenceAccessError):
+            essence.open()
+
+    skipping = ReadAccounting(essence="skip")
+    with open_metadata_only(embedded_aaf, skipping) as f:
+        assert next(iter(f.content.essencedata)).open().read() == b""
+    assert skipping.stats()["essence_skipped"] == 1
+    assert skipping.essence_bytes == 0
+
+    allowing = ReadAccounting(essence="allow")
+    with open_metadata_only(embedded_aaf, allowing) as f:
+        data = next(iter(f.content.essencedata)).open().read()
+    assert len(data) >= 48000 * 2 * ESSENCE_SECONDS
+    assert allowing.essence_bytes >= len(data)
+    assert allowing.fraction_read > 0.9
+
+
+def test_read_accounting_rejects_unknown_policy_and_pooled_builds(embedded_aaf):
+    with pytest.raises(ValueError):
+        ReadAccounting(essence="stream")
+    with pytest.raises(ValueError):
+        bc.build_canonical_from_aaf(embedded_aaf, read_accounting=ReadAccounting(), handle_pool=object())
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("aaf2")
+
+from src import build_canonical as bc  # noqa: E402
+
+
+def _clips(canon: dict) -> list[dict]:
+    return canon["timeline"]["tracks"][0]["clips"]
+
+
+def _spans(canon: dict) -> list[tuple[str, int, int]]:
+    return [(c["name"], c["in"], c["out"]) for c in _clips(canon)]
+
+
+def _nested_timeline(aaf):
+    a = aaf.master_clip("A", "file:///media/a.mov")
+    b = aaf.master_clip("B", "file:///media/b.mov")
+    nest = aaf.composition("nest", [aaf.clip(a, 0, 50), aaf.filler(20), aaf.clip(b, 0, 30)])
+    aaf.composition(
+        "top.Exported.01",
+        [
+            aaf.clip(b, 0, 40),
+            nest.create_source_clip(1, start=5, length=60),  # trimmed in-point and out-point
+            nest.create_source_clip(1, start=0, length=100),
+        ],
+    )
+
+
+def test_nested_composition_is_flattened_and_rebased(make_aaf):
+    path = make_aaf(_nested_timeline)
+    canon = bc.build_canonical_from_aaf(str(path))
+    assert _spans(canon) == [
+        ("B", 0, 40),
+        ("A", 40, 85),  # nested [5, 50) shifted by +35
+        ("A", 100, 150),
+        ("B", 170, 200),
+    ]
+
+
+def test_nested_composition_expanded_once(make_aaf, monkeypatch):
+    path = make_aaf(_nested_timeline)
+    calls = []
+    original = bc._process_sequence
+
+    def counting(segment, clips, *args, **kwargs):
+        calls.append(segment)
+        return original(segment, clips, *args, **kwargs)
+
+    monkeypatch.setattr(bc, "_process_sequence", counting)
+    bc.build_canonical_from_aaf(str(path))
+    # top-level sequence + one expansion of "nest" despite two references
+    assert len(calls) == 2
+
+
+def test_nested_expansion_can_be_disabled(make_aaf):
+    path = make_aaf(_nested_timeline)
+    canon = bc.build_canonical_from_aaf(str(path), expand_nested=False)
+    assert [name for name, _, _ in _spans(canon)] == ["B", "nest", "nest"]
+
+
+def test_nested_cycle_and_depth_limit(make_aaf):
+    def build(aaf):
+        a = aaf.master_clip("A", "file:///media/a.mov")
+        loop = aaf.composition("loop", [aaf.clip(a, 0, 10)])
+        aaf.append(loop, loop.create_source_clip(1, start=0, length=10))
+        aaf.composition("top.Exported.01", [loop.create_source_clip(1, start=0, length=20)])
+
+    path = make_aaf(build)
+    canon = bc.build_canonical_from_aaf(str(path))
+    # the self-reference is emitted as a plain clip event instead of recursing
+    assert _spans(canon) == [("A", 0, 10), ("loop", 10, 20)]
+
+    shallow = bc.build_canonical_from_aaf(str(path), nested_max_depth=0)
+    assert _spans(shallow) == [("loop", 0, 20)]
+
+
+def test_expansion_cut_by_depth_limit_is_not_reused_shallower(make_aaf):
+    def build(aaf):
+        a = aaf.master_clip("A", "file:///media/a.mov")
+        inner = aaf.composition("inner", [aaf.clip(a, 0, 10)])
+        mid = aaf.composition("mid", [inner.create_source_clip(1, start=0, length=10)])
+        outer = aaf.composition("outer", [mid.create_source_clip(1, start=0, length=10)])
+        # mid is first reached at depth 2 (inner cut off), then directly at depth 1
+        aaf.composition(
+            "top.Exported.01",
+            [outer.create_source_clip(1, start=0, length=10), mid.create_source_clip(1, start=0, length=10)],
+        )
+
+    canon = bc.build_canonical_from_aaf(str(make_aaf(build)), nested_max_depth=2)
+    assert _spans(canon) == [("inner", 0, 10), ("A", 10, 20)]
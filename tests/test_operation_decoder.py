@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import pytest
+
+aaf2 = pytest.importorskip("aaf2")
+
+from src import build_canonical as bc  # noqa: E402
+
+
+def _timeline(aaf):
+    a = aaf.master_clip("A", "file:///media/a.mov")
+    aaf.composition(
+        "top.Exported.01",
+        [
+            aaf.operation_group("Submaster", 10, [aaf.clip(a, 0, 10)], constants={"Level": 0.5}),
+            aaf.operation_group("Submaster", 20, [aaf.clip(a, 10, 20)], animated={"Level": [(0, 0.0), (19, 1.0)]}),
+            aaf.operation_group("Submaster", 5, [], constants={"Level": 0.25}),
+        ],
+    )
+
+
+def _operation_groups(f):
+    comp = bc.select_top_sequence(f)[0]
+    segment = next(iter(comp.slots)).segment
+    return [c for c in segment.components if "OperationGroup" in type(c).__name__]
+
+
+class _CountingGroup:
+    """Proxy counting how often an OperationGroup's parameters are enumerated."""
+
+    def __init__(self, op):
+        self._op = op
+        self.enumerations = 0
+
+    @property
+    def parameters(self):
+        return _CountingParameters(self)
+
+    def __getattr__(self, name):
+        return getattr(self._op, name)
+
+
+class _CountingParameters:
+    def __init__(self, group):
+        self._group = group
+
+    def __iter__(self):
+        self._group.enumerations += 1
+        return iter(self._group._op.parameters)
+
+
+def test_decoder_matches_separate_extractors(make_aaf):
+    path = str(make_aaf(_timeline))
+    with aaf2.open(path, "r") as f:
+        groups = _operation_groups(f)
+        assert len(groups) == 3
+        for op in groups:
+            decoded = bc.decode_operation_group(op)
+            assert decoded.effect_name == bc.extract_effect_name_from_operation_group(op)
+            assert decoded.parameters == bc.extract_fcpxml_relevant_parameters(op)
+            assert decoded.input_clip is bc._find_nested_source_clip_deep(op)
+        assert [bc.decode_operation_group(op).on_filler for op in groups] == [False, False, True]
+        static = bc.decode_operation_group(groups[0])
+        assert static.effect_name == "Image : Submaster"
+        assert static.parameters == {"Level": {"type": "static", "value": 0.5}}
+        assert static.keyframe_tracks == {}
+
+
+def test_parameters_are_enumerated_once(make_aaf):
+    path = str(make_aaf(_timeline))
+    with aaf2.open(path, "r") as f:
+        for op in _operation_groups(f):
+            counting = _CountingGroup(op)
+            bc.decode_operation_group(counting)
+            assert counting.enumerations == 1
+
+
+def test_external_refs_decoded_from_utf16_byte_arrays():
+    raw = list("C:\\Stills\\logo_matte.png".encode("utf-16le"))
+    assert bc._external_ref("AFX_MatteFile", raw) == {"kind": "matte", "path": "C:\\Stills\\logo_matte.png"}
+    assert bc._external_ref("AFX_File", list("/s/a.tif".encode("utf-16le")))["kind"] == "image"
+    assert bc._external_ref("AFX_Name", list("not a file".encode("utf-16le"))) is None
+    assert bc._external_ref("Level", 0.5) is None
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import json
+import pickle
+
+import pytest
+
+pytest.importorskip("aaf2")
+
+from src import build_canonical as bc  # noqa: E402
+
+
+def _timeline(aaf):
+    a = aaf.master_clip("A", "file:///media/a.mov")
+    aaf.composition(
+        "top.Exported.01",
+        [
+            aaf.operation_group("Submaster", 10, [aaf.clip(a, 0, 10)], constants={"Level": 0.5}),
+            aaf.operation_group("Submaster", 20, [aaf.clip(a, 10, 20)], constants={"Level": 0.5}),
+            aaf.operation_group("Submaster", 5, [], constants={"Level": 0.5}),
+            aaf.operation_group("Submaster", 10, [aaf.clip(a, 30, 10)], constants={"Level": 0.75}),
+        ],
+    )
+
+
+def test_identical_parameter_sets_are_decoded_once(make_aaf, monkeypatch):
+    path = str(make_aaf(_timeline))
+    caches = []
+    original = bc.ParameterSetCache
+
+    def recording():
+        cache = original()
+        caches.append(cache)
+        return cache
+
+    monkeypatch.setattr(bc, "ParameterSetCache", recording)
+    shared = bc.build_canonical_from_aaf(path)
+    unshared = bc.build_canonical_from_aaf(path, share_parameter_sets=False)
+
+    assert shared == unshared
+    assert len(caches) == 1
+    assert caches[0].stats() == {"unique": 2, "hits": 2, "misses": 2, "uncacheable": 0}
+    assert bc._build.get().param_sets is None
+
+
+def test_shared_parameter_sets_are_read_only(make_aaf):
+    path = str(make_aaf(_timeline))
+    with bc._build_state(None, None, None, bc.ParameterSetCache()), bc.aaf2.open(path, "r") as f:
+        groups = [c for c in next(f.content.compositionmobs()).slots[0].segment.components]
+        first = bc.extract_fcpxml_relevant_parameters(groups[0])
+        second = bc.extract_fcpxml_relevant_parameters(groups[1])
+    assert first is second
+    with pytest.raises(TypeError):
+        first["Level"] = {}
+
+
+def test_output_shares_parameter_sets_without_copying(make_aaf):
+    canon = bc.build_canonical_from_aaf(str(make_aaf(_timeline)))
+    params = [clip["effect_params"]["parameters"] for clip in canon["timeline"]["tracks"][0]["clips"]]
+    assert params[0] is params[1] and params[0] == params[2] != params[3]
+    assert json.loads(json.dumps(canon)) == canon
+    assert pickle.loads(pickle.dumps(canon)) == canon
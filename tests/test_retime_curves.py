@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from fractions import Fraction
+
+import pytest
+
+from src import retime_curves as rc
+from src.event_model import NO_EFFECT, Event, Source, SourceRange
+
+needs_numpy = pytest.mark.skipif(not rc.HAS_NUMPY, reason="numpy not installed")
+
+
+@pytest.mark.parametrize("kind", rc.CURVE_KINDS)
+def test_curve_kinds_hit_keyframes_and_hold_outside(kind):
+    curve = rc.Curve([10, 0, 20], [5.0, 0.0, 10.0], kind)
+    assert curve.evaluate([-5, 0, 10, 20, 30], use_numpy=False) == [0.0, 0.0, 5.0, 10.0, 10.0]
+
+
+def test_curve_interpolation_between_keyframes():
+    frames = [2.5, 7.5]
+    assert rc.Curve([0, 10], [0.0, 10.0], "constant").evaluate(frames, use_numpy=False) == [0.0, 0.0]
+    assert rc.Curve([0, 10], [0.0, 10.0], "linear").evaluate(frames, use_numpy=False) == [2.5, 7.5]
+    eased = rc.Curve([0, 10, 20], [0.0, 0.0, 10.0], "cubic").evaluate([5, 15], use_numpy=False)
+    assert eased[0] < 0.0 < eased[1] < 10.0  # Catmull-Rom overshoots into the ramp
+
+
+@needs_numpy
+@pytest.mark.parametrize("kind", rc.CURVE_KINDS)
+def test_numpy_and_python_paths_agree(kind):
+    curve = rc.Curve([0, 12, 30, 31, 60], [1.0, 2.5, -0.5, 0.75, 1.0], kind)
+    frames = [f * 0.5 for f in range(-4, 130)]
+    assert curve.evaluate(frames, use_numpy=True) == pytest.approx(curve.evaluate(frames, use_numpy=False))
+    for retime in (rc.Retime.speed(curve), rc.Retime.position(curve), rc.Retime.constant(0.5)):
+        assert retime.source_positions(60, 7.0, use_numpy=True) == pytest.approx(
+            retime.source_positions(60, 7.0, use_numpy=False)
+        )
+
+
+def test_retime_kinds_map_timeline_frames_to_source_frames():
+    assert rc.Retime.constant(0.5).source_positions(4, 100.0, use_numpy=False) == [100.0, 100.5, 101.0, 101.5, 102.0]
+    assert rc.Retime.constant(-1).source_positions(2, 10.0, use_numpy=False) == [10.0, 9.0, 8.0]
+    ramp = rc.Retime.speed(rc.Curve([0, 10], [1.0, 0.0], "linear"))
+    assert ramp.source_positions(10, 0.0, use_numpy=False)[-1] == pytest.approx(5.0)
+    hold = rc.Retime.position(rc.Curve([0, 4], [0.0, 8.0], "constant"))
+    assert hold.source_positions(4, 50.0, use_numpy=False) == [50.0, 50.0, 50.0, 50.0, 58.0]
+    with pytest.raises(ValueError):
+        rc.Retime("speed", ratio=1.0)
+
+
+def test_interpolation_kind_from_defs_and_auids():
+    class Def:
+        def __init__(self, name, auid=""):
+            self.name, self.auid = name, auid
+
+    assert rc.interpolation_kind(Def("ConstantInterp")) == "constant"
+    assert rc.interpolation_kind(Def("BSplineInterp")) == "cubic"
+    assert rc.interpolation_kind(Def("Custom", "5B6C85A5-0EDE-11D3-80A9-006008143E6F")) == "constant"
+    assert rc.interpolation_kind(None) == rc.interpolation_kind("PowerInterp") == "linear"
+
+
+def test_clipped_events_slice_their_source_range():
+    positions = [100.0 + 0.5 * i for i in range(11)]
+    event = Event("A + Motion Effect", 50, 60, Source("umid", None), NO_EFFECT, SourceRange.from_positions(positions, "ratio"))
+    assert event.to_canonical()["source_range"] == {"in": 100.0, "out": 105.0, "retime": "ratio"}
+
+    tail = event.clipped(54, 60, -50)
+    assert (tail.timeline_in, tail.timeline_out) == (4, 10)
+    assert tail.to_canonical()["source_range"] == {"in": 102.0, "out": 105.0, "retime": "ratio"}
+    assert event.clipped(50, 60, 10).source_range is event.source_range
+    assert "source_range" not in Event("B", 0, 5, Source("u", None), NO_EFFECT).to_canonical()
+
+
+def test_builder_resolves_retimed_source_ranges(make_aaf):
+    bc = pytest.importorskip("src.build_canonical")
+
+    def build(aaf):
+        a = aaf.master_clip("A", "file:///media/a.mov")
+        aaf.composition(
+            "top.Exported.01",
+            [
+                aaf.clip(a, 0, 10),
+                aaf.operation_group("Motion Effect", 20, [aaf.clip(a, 100, 10)], constants={"SpeedRatio": Fraction(1, 2)}),
+                aaf.operation_group(
+                    "Timewarp", 10, [aaf.clip(a, 200, 10)],
+                    animated={"PARAM_SPEED_MAP_U": [(0, 100), (Fraction(1, 2), 100), (1, 300)]},
+                ),
+            ],
+        )
+
+    clips = bc.build_canonical_from_aaf(str(make_aaf(build)))["timeline"]["tracks"][0]["clips"]
+    plain, motion, timewarp = clips
+    assert "source_range" not in plain
+    assert (motion["in"], motion["out"]) == (10, 30)
+    assert motion["source_range"] == {"in": 100.0, "out": 110.0, "retime": "ratio"}
+    assert (timewarp["in"], timewarp["out"]) == (30, 40)
+    # 1x for five frames, then ramping linearly to 3x: 5 + 5 * 2 = 15 source frames
+    assert timewarp["source_range"] == {"in": 200.0, "out": 215.0, "retime": "speed"}
+
+    windowed = bc.build_canonical_from_aaf(str(make_aaf(build, name="w.aaf")), time_range=(20, 35))
+    motion_tail = windowed["timeline"]["tracks"][0]["clips"][0]
+    assert (motion_tail["in"], motion_tail["out"]) == (20, 30)
+    assert motion_tail["source_range"] == {"in": 105.0, "out": 110.0, "retime": "ratio"}
+
+
+def test_writer_maps_source_range_to_clip_start_and_time_map(tmp_path):
+    import xml.etree.ElementTree as ET
+
+    from src.write_fcpxml import write_fcpxml_from_canonical
+
+    source = {"path": "file:///media/a.mov"}
+    canon = {
+        "project": {"name": "retime", "edit_rate_fps": 25.0, "tc_format": "NDF"},
+        "timeline": {
+            "name": "retime.Exported.01",
+            "start_tc_frames": 0,
+            "events": [
+                {"id": "ev_0001", "timeline_start_frames": 0, "length_frames": 10, "source": source, "effect": {"name": "(none)"}},
+                {
+                    "id": "ev_0002", "timeline_start_frames": 10, "length_frames": 20, "source": source,
+                    "effect": {"name": "(none)"}, "source_range": {"in": 100.0, "out": 110.0, "retime": "ratio"},
+                },
+            ],
+        },
+    }
+    out = tmp_path / "retime.fcpxml"
+    write_fcpxml_from_canonical(canon, str(out))
+
+    plain, retimed = ET.parse(out).getroot().iter("clip")
+    assert plain.find("timeMap") is None and "start" not in plain.attrib
+    assert (retimed.get("start"), retimed.get("duration")) == ("100/25s", "20/25s")
+    points = [(p.get("time"), p.get("value")) for p in retimed.find("timeMap")]
+    assert points == [("100/25s", "100/25s"), ("120/25s", "110/25s")]
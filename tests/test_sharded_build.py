@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+pytest.importorskip("aaf2")
+
+from src import build_canonical as bc  # noqa: E402
+
+
+def _timeline(aaf):
+    a = aaf.master_clip("A", "file:///media/a.mov")
+    b = aaf.master_clip("B", "file:///media/b.mov")
+    inner = aaf.composition("inner", [aaf.clip(b, 0, 30)])
+    aaf.composition(
+        "top.Exported.01",
+        [
+            aaf.clip(a, 0, 100),
+            aaf.operation_group("Submaster", 20, [aaf.clip(b, 0, 20)], constants={"Level": 0.25}),
+            aaf.filler(50),
+            aaf.clip(inner, 0, 30),
+            aaf.operation_group("Submaster", 40, [aaf.clip(b, 0, 40)], constants={"Level": 0.5}),
+            aaf.clip(a, 100, 80),
+            aaf.clip(b, 50, 10),
+        ],
+    )
+
+
+@pytest.mark.parametrize("shards", [1, 3, 7])
+def test_sharded_build_is_byte_identical_to_serial(make_aaf, shards):
+    path = str(make_aaf(_timeline))
+    serial = bc.build_canonical_from_aaf(path)
+    assert len(serial["timeline"]["tracks"][0]["clips"]) >= 5
+    assert json.dumps(bc.build_canonical_sharded(path, shards=shards)) == json.dumps(serial)
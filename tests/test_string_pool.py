@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from src.string_pool import StringPool
+from src.write_fcpxml import load_canonical
+
+
+def test_intern_returns_shared_instance_and_counts():
+    pool = StringPool()
+    a = pool.intern("".join(["/media/", "a.mov"]))
+    b = pool.intern("".join(["/media/", "a.mov"]))
+    assert a is b
+    assert pool.intern(None) is None
+    assert pool.intern(42) == "42"
+    stats = pool.stats()
+    assert (stats["total"], stats["unique"], stats["duplicates"]) == (3, 2, 1)
+    assert stats["saved_bytes"] > 0
+    assert "2 unique of 3 strings" in pool.report()
+
+
+def test_load_canonical_interns_keys_and_values(tmp_path):
+    clip = {"name": "A", "source_path": "/media/a.mov", "effect_params": {"operation": "N/A", "parameters": {}}}
+    path = tmp_path / "canon.json"
+    path.write_text(json.dumps({"timeline": {"tracks": [{"clips": [clip, dict(clip)]}]}}), encoding="utf-8")
+
+    pool = StringPool()
+    canon = load_canonical(str(path), pool)
+    first, second = canon["timeline"]["tracks"][0]["clips"]
+    assert first == second == clip
+    assert first["source_path"] is second["source_path"]
+    assert pool.stats()["duplicates"] > 0
+
+
+def test_builder_shares_repeated_strings(make_aaf):
+    pytest.importorskip("aaf2")
+    from src import build_canonical as bc
+
+    def timeline(aaf):
+        a = aaf.master_clip("A", "file:///media/a.mov")
+        aaf.composition("top.Exported.01", [aaf.clip(a, i * 10, 10) for i in range(5)])
+
+    pool = StringPool()
+    clips = bc.build_canonical_from_aaf(str(make_aaf(timeline)), string_pool=pool)["timeline"]["tracks"][0]["clips"]
+    assert len(clips) == 5
+    assert all(c["source_path"] is clips[0]["source_path"] for c in clips)
+    assert all(c["source_umid"] is clips[0]["source_umid"] for c in clips)
+    assert pool.stats()["unique"] < pool.stats()["total"]
+    assert bc._build.get().strings is None
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import itertools
+import json
+import os
+
+import pytest
+
+aaf2 = pytest.importorskip("aaf2")
+
+from aaf2.mobid import MobID  # noqa: E402
+
+from src.batch_convert import CONVERTED, MANIFEST_NAME, REUSED, UNCHANGED, BatchConverter  # noqa: E402
+from src.structural_fingerprint import fingerprint_aaf  # noqa: E402
+
+
+@pytest.fixture
+def export(make_aaf, monkeypatch):
+    """export(name, **timeline kwargs): Avid keeps MobIDs across re-exports, so ids restart per file."""
+
+    def _export(name, length=50, url="file:///media/a.mov", extra_mob=False):
+        counter = itertools.count(1)
+        monkeypatch.setattr(MobID, "new", staticmethod(lambda: MobID(int=next(counter))))
+
+        def build(aaf):
+            a = aaf.master_clip("A", url=url)
+            b = aaf.master_clip("B", url="file:///media/b.mov")
+            aaf.composition("cut.Exported.01", [aaf.clip(a, 10, length), aaf.filler(5), aaf.clip(b, 0, 40)])
+            if extra_mob:
+                aaf.master_clip("unused", url="file:///media/unused.mov")
+
+        return str(make_aaf(build, name=name))
+
+    return _export
+
+
+def test_fingerprint_ignores_export_noise_only(export):
+    base = fingerprint_aaf(export("a.aaf"))
+    assert base["composition"] == "cut.Exported.01" and base["mobs"] == 5
+
+    reexport = export("b.aaf", extra_mob=True)
+    with open(export("a_copy.aaf"), "rb") as f1, open(reexport, "rb") as f2:
+        assert f1.read() != f2.read()
+    assert fingerprint_aaf(reexport)["fingerprint"] == base["fingerprint"]
+
+    assert fingerprint_aaf(export("len.aaf", length=51))["fingerprint"] != base["fingerprint"]
+    assert fingerprint_aaf(export("url.aaf", url="file:///media/a_v2.mov"))["fingerprint"] != base["fingerprint"]
+
+
+def test_batch_skips_converted_fingerprints(export, tmp_path):
+    first, same = export("reel1.aaf"), export("reel1_reexport.aaf", extra_mob=True)
+    changed = export("reel2.aaf", length=60)
+    out = tmp_path / "out"
+
+    results = BatchConverter(str(out)).run([first, same, changed])
+    assert [r["status"] for r in results] == [CONVERTED, REUSED, CONVERTED]
+    assert results[0]["fingerprint"] == results[1]["fingerprint"] != results[2]["fingerprint"]
+    with open(results[0]["canonical"]) as f1, open(results[1]["canonical"]) as f2:
+        assert json.load(f1) == json.load(f2)
+    assert os.path.exists(out / "reel2.fcpxml") and os.path.exists(out / MANIFEST_NAME)
+
+    again = BatchConverter(str(out)).run([first, same, changed])
+    assert [r["status"] for r in again] == [UNCHANGED] * 3
+
+    forced = BatchConverter(str(out), force=True).run([first])
+    assert forced[0]["status"] == CONVERTED
+    other_options = BatchConverter(str(out), write_fcpxml=False).run([first])
+    assert other_options[0]["status"] == CONVERTED
+
+
+def test_same_named_inputs_keep_separate_outputs(export, tmp_path):
+    drop = tmp_path / "drop"
+    for sub, length in (("a", 30), ("b", 70)):
+        (drop / sub).mkdir(parents=True)
+        os.replace(export(f"{sub}.aaf", length=length), drop / sub / "cut.aaf")
+    out = tmp_path / "out"
+
+    results = BatchConverter(str(out), write_fcpxml=False).run([str(drop)])
+    assert [r["status"] for r in results] == [CONVERTED, CONVERTED]
+    assert [os.path.relpath(r["canonical"], out) for r in results] == [
+        os.path.join("a", "cut.canonical.json"), os.path.join("b", "cut.canonical.json"),
+    ]
+    lengths = []
+    for r in results:
+        with open(r["canonical"]) as f:
+            lengths.append(json.load(f)["timeline"]["tracks"][0]["clips"][0]["out"])
+    assert lengths[0] != lengths[1]
+
+    with pytest.raises(ValueError, match="cut"):
+        BatchConverter(str(out), write_fcpxml=False).run([str(drop / "a" / "cut.aaf"), str(drop / "b" / "cut.aaf")])
+
+
+def test_builder_version_change_converts_again(export, tmp_path, monkeypatch):
+    from src import batch_convert
+
+    path, out = export("reel1.aaf"), str(tmp_path / "out")
+    assert BatchConverter(out).run([path])[0]["status"] == CONVERTED
+    assert BatchConverter(out).run([path])[0]["status"] == UNCHANGED
+    monkeypatch.setattr(batch_convert, "CANONICAL_VERSION", batch_convert.CANONICAL_VERSION + 1)
+    assert BatchConverter(out).run([path])[0]["status"] == CONVERTED
+
+
+def test_watch_waits_for_stable_files(export, tmp_path):
+    drop = tmp_path / "drop"
+    drop.mkdir()
+    os.replace(export("reel1.aaf"), drop / "reel1.aaf")
+    converter = BatchConverter(str(tmp_path / "out"), write_fcpxml=False)
+    batches = list(converter.watch(str(drop), interval=0, max_polls=3, sleep=lambda s: None))
+    assert [[r["status"] for r in batch] for batch in batches] == [[CONVERTED]]
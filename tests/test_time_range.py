@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+pytest.importorskip("aaf2")
+
+from src import build_canonical as bc  # noqa: E402
+from src import offset_index  # noqa: E402
+
+
+def _timeline(aaf):
+    a = aaf.master_clip("A", "file:///media/a.mov")
+    b = aaf.master_clip("B", "file:///media/b.mov")
+    inner = aaf.composition("inner", [aaf.clip(b, 0, 30)])
+    aaf.composition(
+        "top.Exported.01",
+        [
+            aaf.clip(a, 0, 100),                       # 0-100
+            aaf.filler(50),                            # 100-150
+            aaf.operation_group("Submaster", 40, [aaf.clip(b, 0, 40)], constants={"Level": 0.5}),  # 150-190
+            aaf.clip(inner, 0, 30),                    # 190-220 (nested composition)
+            aaf.clip(a, 100, 80),                      # 220-300
+        ],
+    )
+
+
+def _spans(canon):
+    return [(c["name"], c["in"], c["out"]) for c in canon["timeline"]["tracks"][0]["clips"]]
+
+
+@pytest.fixture(autouse=True)
+def _fresh_index_cache():
+    offset_index.clear_memory_cache()
+    yield
+    offset_index.clear_memory_cache()
+
+
+def test_range_clips_events_and_skips_outside_components(make_aaf, monkeypatch):
+    path = str(make_aaf(_timeline))
+    full = bc.build_canonical_from_aaf(path)
+    assert [s[1:] for s in _spans(full)] == [(0, 100), (150, 190), (190, 220), (220, 300)]
+
+    visited = []
+    original = bc._process_component
+    monkeypatch.setattr(bc, "_process_component", lambda seg, *a, **k: visited.append(a[2]) or original(seg, *a, **k))
+
+    canon = bc.build_canonical_from_aaf(path, time_range=(160, 200))
+    assert _spans(canon) == [("B + Image : Submaster", 160, 190), ("B", 190, 200)]
+    assert canon["timeline"]["range"] == {"start": 160, "end": 200, "rebased": False}
+    # only the two intersecting top-level components were visited (then the nested
+    # composition's own relative traversal at 0); the clips at 0 and 220 were skipped
+    assert visited == [150, 190, 0]
+
+    rebased = bc.build_canonical_from_aaf(path, time_range="160-200", rebase_range=True)
+    assert [s[1:] for s in _spans(rebased)] == [(0, 30), (30, 40)]
+
+
+def test_timecode_range_is_relative_to_timeline_start(make_aaf):
+    path = str(make_aaf(_timeline))
+    start = bc.build_canonical_from_aaf(path)["timeline"]["start"]
+    assert start == "10:00:00:00"
+    canon = bc.build_canonical_from_aaf(path, time_range="10:00:04:00-10:00:06:00")
+    assert canon["timeline"]["range"] == {"start": 100, "end": 150, "rebased": False}
+    assert _spans(canon) == []  # filler only
+    with pytest.raises(ValueError):
+        bc.parse_time_range("200-100", 25.0)
+
+
+def test_offset_index_sidecar_gives_same_result(make_aaf, tmp_path):
+    path = str(make_aaf(_timeline))
+    sidecar = str(tmp_path / "offsets.json")
+    first = bc.build_canonical_from_aaf(path, time_range=(90, 230), offset_sidecar=sidecar)
+    data = json.loads(open(sidecar, encoding="utf-8").read())
+    assert list(data["sequences"].values())[0]["lengths"] == [100, 50, 40, 30, 80]
+
+    offset_index.clear_memory_cache()
+    again = bc.build_canonical_from_aaf(path, time_range=(90, 230), offset_sidecar=sidecar)
+    assert again == first
+    assert [s[1:] for s in _spans(first)] == [(90, 100), (150, 190), (190, 220), (220, 230)]
+
+
+def test_component_range_bisects_window():
+    index = offset_index.SequenceOffsetIndex([100, 50, 0, 40, 30])
+    assert list(index.component_range(0, 10)) == [0]
+    assert list(index.component_range(100, 150)) == [1]
+    assert list(index.component_range(120, 160)) == [1, 2, 3]  # zero-length at 150 included
+    assert list(index.component_range(300, 400)) == []
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import pytest
+
+from src.traversal_budget import BudgetExceeded, BudgetGuard, CancellationToken, TraversalBudget
+
+aaf2 = pytest.importorskip("aaf2")
+
+from src import build_canonical as bc  # noqa: E402
+
+
+def _long_timeline(aaf):
+    a = aaf.master_clip("A", "file:///media/a.mov")
+    aaf.composition(
+        "top.Exported.01",
+        [aaf.clip(a, i * 10, 10) for i in range(200)]
+        + [aaf.operation_group("Blur", 20, [], animated={"AFX_BLUR": [(0, 0.0), (0.5, 4.0), (1, 8.0)]})],
+    )
+
+
+def _clips(canon: dict) -> list[dict]:
+    return canon["timeline"]["tracks"][0]["clips"]
+
+
+def test_node_budget_returns_partial_events_with_diagnostic(make_aaf):
+    path = make_aaf(_long_timeline)
+    canon = bc.build_canonical_from_aaf(str(path), budget=TraversalBudget(max_nodes=50))
+
+    assert len(_clips(canon)) == 50
+    (diag,) = canon["diagnostics"]
+    assert diag["code"] == "BUDGET-EXCEEDED"
+    assert diag["budget"] == "max_nodes"
+    assert diag["fatal"] is True
+    assert diag["offset"] == 500
+
+
+def test_cancelled_token_stops_before_traversal(make_aaf):
+    path = make_aaf(_long_timeline)
+    token = CancellationToken()
+    token.cancel("shutting down")
+    canon = bc.build_canonical_from_aaf(str(path), cancel_token=token)
+
+    assert _clips(canon) == []
+    assert canon["diagnostics"][0]["budget"] == "cancelled"
+    assert canon["diagnostics"][0]["observed"] == "shutting down"
+
+
+def test_no_budget_leaves_output_unchanged(make_aaf):
+    path = make_aaf(_long_timeline)
+    canon = bc.build_canonical_from_aaf(str(path))
+    assert "diagnostics" not in canon
+    assert len(_clips(canon)) == 201
+
+
+def test_chain_depth_budget_applies_to_the_build_source_clip_search(make_aaf):
+    def nested_effects(aaf):
+        a = aaf.master_clip("A", "file:///media/a.mov")
+        segment = aaf.clip(a, 0, 20)
+        for _ in range(4):
+            segment = aaf.operation_group("Blur", 20, [segment])
+        aaf.composition("top.Exported.01", [segment])
+
+    path = str(make_aaf(nested_effects))
+    assert _clips(bc.build_canonical_from_aaf(path))[0]["source_umid"] != "Unresolved"
+    canon = bc.build_canonical_from_aaf(path, budget=TraversalBudget(max_chain_depth=2))
+    assert canon["diagnostics"][0]["budget"] == "max_chain_depth"
+    assert canon["diagnostics"][0]["fatal"] is False
+
+
+def test_chain_depth_and_control_point_budgets_are_per_item():
+    guard = BudgetGuard(TraversalBudget(max_chain_depth=2, max_control_points=3))
+    guard.offset = 100
+    assert guard.allow_chain_depth(2)
+    assert not guard.allow_chain_depth(3)
+    assert not guard.allow_chain_depth(4)
+    assert guard.control_points(10) == 3
+    assert guard.control_points(2) == 2
+
+    depth, points = guard.diagnostics
+    assert (depth["budget"], depth["count"], depth["observed"], depth["fatal"]) == (
+        "max_chain_depth",
+        2,
+        4,
+        False,
+    )
+    assert (points["budget"], points["observed"]) == ("max_control_points", 10)
+
+
+def test_wall_clock_budget_raises():
+    guard = BudgetGuard(TraversalBudget(max_seconds=0.0))
+    with pytest.raises(BudgetExceeded) as exc:
+        guard.check()
+    assert exc.value.diagnostic["budget"] == "max_seconds"
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+pytest.importorskip("aaf2")
+
+from src import build_canonical as bc  # noqa: E402
+from src.traversal_trace import TraversalTracer  # noqa: E402
+
+
+def _timeline(aaf):
+    a = aaf.master_clip("A", "file:///media/a.mov")
+    aaf.composition(
+        "top.Exported.01",
+        [
+            aaf.clip(a, 0, 25),
+            aaf.filler(10),
+            aaf.operation_group("Submaster", 40, [aaf.clip(a, 0, 40)], constants={"Level": 0.5}),
+        ],
+    )
+
+
+def test_trace_records_balanced_spans_per_category(make_aaf, tmp_path):
+    path = make_aaf(_timeline)
+    tracer = TraversalTracer()
+    bc.build_canonical_from_aaf(str(path), tracer=tracer)
+
+    begins = [e for e in tracer.events if e["ph"] == "B"]
+    ends = [e for e in tracer.events if e["ph"] == "E"]
+    assert len(begins) == len(ends) > 0
+    assert {e["cat"] for e in begins} >= {"component", "operation_group", "chain_walk", "parameter"}
+
+    og = next(e for e in begins if e["cat"] == "operation_group")
+    assert og["name"] == "OperationGroup"
+    assert og["args"] == {"length": 40, "offset": 35}
+
+    out = tmp_path / "trace.json"
+    tracer.write(str(out))
+    doc = json.loads(out.read_text(encoding="utf-8"))
+    assert doc["traceEvents"][0]["ph"] == "M"
+    ts = [e["ts"] for e in doc["traceEvents"][1:]]
+    assert ts == sorted(ts)
+
+
+def test_tracing_is_off_by_default(make_aaf):
+    path = make_aaf(_timeline)
+    bc.build_canonical_from_aaf(str(path))
+    assert bc._build.get().tracer is None
+
+
+def test_summary_ranks_inclusive_time():
+    tracer = TraversalTracer()
+    with tracer.span("outer", "component"):
+        with tracer.span("inner", "parameter"):
+            pass
+    names = [row["name"] for row in tracer.summary()]
+    assert names == ["outer", "inner"]